@@ -0,0 +1,122 @@
+"""add_archive_surrogate_ids
+
+Revision ID: add_archive_surrogate_ids
+Revises: add_sent_reminders
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_archive_surrogate_ids'
+down_revision: Union[str, None] = 'add_sent_reminders'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PROJECT_COLUMNS = "title, description, status, priority, category, deadline, created_at, updated_at, user_id, archived_at"
+TASK_COLUMNS = "title, description, status, priority, due_date, created_at, updated_at, project_id, user_id, archived_at"
+
+
+def _archived_projects_table(name: str, surrogate: bool) -> None:
+    op.create_table(
+        name,
+        sa.Column('id', sa.Integer(), autoincrement=surrogate, nullable=False),
+        *([sa.Column('original_id', sa.Integer(), nullable=False)] if surrogate else []),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('priority', sa.String(length=20), nullable=True),
+        sa.Column('category', sa.String(length=100), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=surrogate,
+    )
+
+
+def _archived_tasks_table(name: str, surrogate: bool) -> None:
+    op.create_table(
+        name,
+        sa.Column('id', sa.Integer(), autoincrement=surrogate, nullable=False),
+        *([sa.Column('original_id', sa.Integer(), nullable=False)] if surrogate else []),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('priority', sa.String(length=20), nullable=False),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=surrogate,
+    )
+
+
+def _drop_archive_tables() -> None:
+    op.drop_index('ix_archived_tasks_project_id', table_name='archived_tasks', if_exists=True)
+    op.drop_index('ix_archived_tasks_original_id', table_name='archived_tasks', if_exists=True)
+    op.drop_index('ix_archived_tasks_user_id', table_name='archived_tasks', if_exists=True)
+    op.drop_table('archived_tasks')
+    op.drop_index('ix_archived_projects_original_id', table_name='archived_projects', if_exists=True)
+    op.drop_index('ix_archived_projects_user_id', table_name='archived_projects', if_exists=True)
+    op.drop_table('archived_projects')
+
+
+def _create_indexes(surrogate: bool) -> None:
+    op.create_index('ix_archived_projects_user_id', 'archived_projects', ['user_id', 'id'], unique=False)
+    op.create_index('ix_archived_tasks_user_id', 'archived_tasks', ['user_id', 'id'], unique=False)
+    op.create_index('ix_archived_tasks_project_id', 'archived_tasks', ['project_id'], unique=False)
+    if surrogate:
+        op.create_index('ix_archived_projects_original_id', 'archived_projects', ['original_id'], unique=False)
+        op.create_index('ix_archived_tasks_original_id', 'archived_tasks', ['original_id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Id propio en las tablas de archivo: SQLite reutiliza el id más alto de tasks/projects
+    # tras borrarlo, y archivar dos veces el mismo id chocaba con la clave primaria
+    _archived_projects_table('archived_projects_new', surrogate=True)
+    _archived_tasks_table('archived_tasks_new', surrogate=True)
+    # Se copian en orden de archivado, así los ids nuevos conservan el orden del cursor
+    op.execute(
+        f"INSERT INTO archived_projects_new (original_id, {PROJECT_COLUMNS}) "
+        f"SELECT id, {PROJECT_COLUMNS} FROM archived_projects ORDER BY archived_at, id"
+    )
+    op.execute(
+        f"INSERT INTO archived_tasks_new (original_id, {TASK_COLUMNS}) "
+        f"SELECT id, {TASK_COLUMNS} FROM archived_tasks ORDER BY archived_at, id"
+    )
+    _drop_archive_tables()
+    op.rename_table('archived_projects_new', 'archived_projects')
+    op.rename_table('archived_tasks_new', 'archived_tasks')
+    _create_indexes(surrogate=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Sin id propio no caben dos archivos del mismo id: se conserva el más reciente
+    _archived_projects_table('archived_projects_old', surrogate=False)
+    _archived_tasks_table('archived_tasks_old', surrogate=False)
+    op.execute(
+        f"INSERT INTO archived_projects_old (id, {PROJECT_COLUMNS}) "
+        f"SELECT original_id, {PROJECT_COLUMNS} FROM archived_projects "
+        f"WHERE id IN (SELECT MAX(id) FROM archived_projects GROUP BY original_id)"
+    )
+    op.execute(
+        f"INSERT INTO archived_tasks_old (id, {TASK_COLUMNS}) "
+        f"SELECT original_id, {TASK_COLUMNS} FROM archived_tasks "
+        f"WHERE id IN (SELECT MAX(id) FROM archived_tasks GROUP BY original_id)"
+    )
+    _drop_archive_tables()
+    op.rename_table('archived_projects_old', 'archived_projects')
+    op.rename_table('archived_tasks_old', 'archived_tasks')
+    _create_indexes(surrogate=False)
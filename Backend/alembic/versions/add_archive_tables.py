@@ -0,0 +1,108 @@
+"""add_archive_tables
+
+Revision ID: add_archive_tables
+Revises: add_scheduler_state
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_archive_tables'
+down_revision: Union[str, None] = 'add_scheduler_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Deben coincidir con COMPLETED_TASK_CONDITION y FINISHED_PROJECT_CONDITION de los modelos
+COMPLETED_TASK_CONDITION = "status = 'completada'"
+FINISHED_PROJECT_CONDITION = "status = 'terminado'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tablas de archivo: conservan los ids originales y el usuario dueño
+    op.create_table(
+        'archived_projects',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('priority', sa.String(length=20), nullable=True),
+        sa.Column('category', sa.String(length=100), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_archived_projects_user_id', 'archived_projects', ['user_id', 'id'], unique=False,
+                    if_not_exists=True)
+
+    op.create_table(
+        'archived_tasks',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('priority', sa.String(length=20), nullable=False),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_archived_tasks_user_id', 'archived_tasks', ['user_id', 'id'], unique=False,
+                    if_not_exists=True)
+    op.create_index('ix_archived_tasks_project_id', 'archived_tasks', ['project_id'], unique=False,
+                    if_not_exists=True)
+
+    # Candidatos a archivar por antigüedad, solo entre lo terminado
+    op.create_index(
+        'ix_tasks_completed_updated',
+        'tasks',
+        ['updated_at'],
+        unique=False,
+        sqlite_where=sa.text(COMPLETED_TASK_CONDITION),
+        postgresql_where=sa.text(COMPLETED_TASK_CONDITION),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_projects_finished_updated',
+        'projects',
+        ['updated_at'],
+        unique=False,
+        sqlite_where=sa.text(FINISHED_PROJECT_CONDITION),
+        postgresql_where=sa.text(FINISHED_PROJECT_CONDITION),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Devolver lo archivado a las tablas calientes antes de borrar las de archivo
+    op.execute(
+        "INSERT INTO projects (id, title, description, status, priority, category, deadline, created_at, "
+        "updated_at, user_id) SELECT id, title, description, status, priority, category, deadline, "
+        "created_at, updated_at, user_id FROM archived_projects"
+    )
+    op.execute(
+        "INSERT INTO tasks (id, title, description, status, priority, due_date, created_at, updated_at, "
+        "project_id) SELECT id, title, description, status, priority, due_date, created_at, updated_at, "
+        "project_id FROM archived_tasks"
+    )
+    op.drop_index('ix_projects_finished_updated', table_name='projects', if_exists=True)
+    op.drop_index('ix_tasks_completed_updated', table_name='tasks', if_exists=True)
+    op.drop_index('ix_archived_tasks_project_id', table_name='archived_tasks', if_exists=True)
+    op.drop_index('ix_archived_tasks_user_id', table_name='archived_tasks', if_exists=True)
+    op.drop_table('archived_tasks', if_exists=True)
+    op.drop_index('ix_archived_projects_user_id', table_name='archived_projects', if_exists=True)
+    op.drop_table('archived_projects', if_exists=True)
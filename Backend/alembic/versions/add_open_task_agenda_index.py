@@ -0,0 +1,44 @@
+"""add_open_task_agenda_index
+
+Revision ID: add_open_task_agenda_index
+Revises: add_user_listing_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_open_task_agenda_index'
+down_revision: Union[str, None] = 'add_user_listing_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Debe coincidir con OPEN_TASK_CONDITION en app/models/task.py
+OPEN_TASK_CONDITION = "status <> 'completada'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Proyectos de un usuario: punto de partida de la agenda
+    op.create_index('ix_projects_user_id', 'projects', ['user_id'], unique=False, if_not_exists=True)
+
+    # Índice parcial de tareas abiertas por proyecto y fecha límite (agenda)
+    op.create_index(
+        'ix_tasks_open_project_due',
+        'tasks',
+        ['project_id', 'due_date'],
+        unique=False,
+        sqlite_where=sa.text(OPEN_TASK_CONDITION),
+        postgresql_where=sa.text(OPEN_TASK_CONDITION),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_open_project_due', table_name='tasks', if_exists=True)
+    op.drop_index('ix_projects_user_id', table_name='projects', if_exists=True)
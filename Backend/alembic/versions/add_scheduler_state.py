@@ -0,0 +1,62 @@
+"""add_scheduler_state
+
+Revision ID: add_scheduler_state
+Revises: add_open_task_agenda_index
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_scheduler_state'
+down_revision: Union[str, None] = 'add_open_task_agenda_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Deben coincidir con OPEN_TASK_CONDITION y OPEN_PROJECT_CONDITION de los modelos
+OPEN_TASK_CONDITION = "status <> 'completada'"
+OPEN_PROJECT_CONDITION = "status <> 'terminado'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Marca de agua de los procesos de fondo (recordatorios de fechas límite)
+    op.create_table(
+        'scheduler_state',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+        if_not_exists=True,
+    )
+
+    # Próximas fechas límite de tareas abiertas y proyectos no terminados
+    op.create_index(
+        'ix_tasks_open_due',
+        'tasks',
+        ['due_date'],
+        unique=False,
+        sqlite_where=sa.text(OPEN_TASK_CONDITION),
+        postgresql_where=sa.text(OPEN_TASK_CONDITION),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_projects_open_deadline',
+        'projects',
+        ['deadline'],
+        unique=False,
+        sqlite_where=sa.text(OPEN_PROJECT_CONDITION),
+        postgresql_where=sa.text(OPEN_PROJECT_CONDITION),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_open_deadline', table_name='projects', if_exists=True)
+    op.drop_index('ix_tasks_open_due', table_name='tasks', if_exists=True)
+    op.drop_table('scheduler_state', if_exists=True)
@@ -0,0 +1,44 @@
+"""add_sent_reminders
+
+Revision ID: add_sent_reminders
+Revises: add_archive_tables
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_sent_reminders'
+down_revision: Union[str, None] = 'add_archive_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Reclamos de recordatorios: con varios workers cada aviso se emite una sola vez
+    op.create_table(
+        'sent_reminders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('due_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('entity', 'entity_id', 'kind', 'due_at', name='uq_sent_reminders_key'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_sent_reminders_id', 'sent_reminders', ['id'], unique=False, if_not_exists=True)
+    op.create_index('ix_sent_reminders_due_at', 'sent_reminders', ['due_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sent_reminders_due_at', table_name='sent_reminders', if_exists=True)
+    op.drop_index('ix_sent_reminders_id', table_name='sent_reminders', if_exists=True)
+    op.drop_table('sent_reminders', if_exists=True)
@@ -0,0 +1,35 @@
+"""add_task_workload_index
+
+Revision ID: add_task_workload_index
+Revises: clean_default_user_data
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_task_workload_index'
+down_revision: Union[str, None] = 'clean_default_user_data'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índice compuesto para contar tareas por proyecto, estado y fecha límite
+    op.create_index(
+        'ix_tasks_project_status_due',
+        'tasks',
+        ['project_id', 'status', 'due_date'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_project_status_due', table_name='tasks', if_exists=True)
@@ -0,0 +1,42 @@
+"""add_user_listing_indexes
+
+Revision ID: add_user_listing_indexes
+Revises: add_task_workload_index
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_user_listing_indexes'
+down_revision: Union[str, None] = 'add_task_workload_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filtro por rango de fecha de alta en el listado paginado
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False, if_not_exists=True)
+
+    # Búsqueda por prefijo de username (LIKE 'abc%') en PostgreSQL
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_users_username_pattern',
+            'users',
+            ['username'],
+            unique=False,
+            postgresql_ops={'username': 'text_pattern_ops'},
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_username_pattern', table_name='users', if_exists=True)
+    op.drop_index('ix_users_created_at', table_name='users', if_exists=True)
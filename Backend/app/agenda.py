@@ -0,0 +1,140 @@
+"""
+Agenda del usuario: tareas vencidas, de hoy y de la semana
+Los rangos se calculan en la zona horaria del dispositivo ("hoy" empieza a medianoche
+local, también en los cambios de horario) y se convierten a UTC, que es como se guardan
+las fechas. La consulta recorre solo el índice parcial de tareas abiertas
+(ix_tasks_open_project_due) de los proyectos del usuario: su coste no depende de cuántas
+tareas completadas acumule. El resultado se cachea por usuario hasta que cambian sus
+tareas o proyectos.
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from .cache import UserScopedCache
+from .datetime_utils import UTC
+from .events import subscribe
+from .models.project import Project
+from .models.task import OPEN_TASK_CONDITION, Task
+
+AGENDA_RANGES = ("today", "week", "overdue")
+WEEK_DAYS = 7
+
+# Aunque no haya escrituras, con el tiempo las tareas pasan a estar vencidas
+AGENDA_CACHE_TTL = 60.0
+
+agenda_cache = UserScopedCache(ttl=AGENDA_CACHE_TTL)
+subscribe(agenda_cache.invalidate)
+
+
+def resolve_timezone(name: Optional[str]) -> ZoneInfo:
+    """
+    Zona horaria IANA del dispositivo (por defecto UTC)
+
+    Raises:
+        ValueError: Si la zona no existe
+    """
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Zona horaria inválida: {name}") from None
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    # Las columnas DateTime se guardan sin zona, en UTC
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def range_bounds(range_name: str, tz: ZoneInfo, now: Optional[datetime] = None) -> Tuple[Optional[datetime], datetime]:
+    """
+    Límites [inicio, fin) de un rango, en UTC sin zona
+
+    Args:
+        range_name: "today" (día local), "week" (hoy y los 6 días siguientes) u "overdue" (antes de ahora)
+        tz: Zona horaria del dispositivo
+        now: Instante de referencia (por defecto ahora)
+
+    Returns:
+        Tuple[Optional[datetime], datetime]: Inicio (None = sin límite) y fin del rango
+    """
+    if range_name not in AGENDA_RANGES:
+        raise ValueError(f"Rango inválido: {range_name}. Debe ser uno de: {list(AGENDA_RANGES)}")
+    now = (now or datetime.now(UTC)).astimezone(tz)
+    if range_name == "overdue":
+        return None, _to_utc_naive(now)
+    today = now.date()
+    days = 1 if range_name == "today" else WEEK_DAYS
+    start = datetime.combine(today, time.min, tzinfo=tz)
+    end = datetime.combine(today + timedelta(days=days), time.min, tzinfo=tz)
+    return _to_utc_naive(start), _to_utc_naive(end)
+
+
+def query_agenda(db: Session, user_id: int, range_name: str, tz: ZoneInfo,
+                 now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Tareas abiertas del usuario que vencen en el rango, por fecha límite
+
+    Args:
+        db: Sesión de base de datos
+        user_id: Usuario
+        range_name: Rango de AGENDA_RANGES
+        tz: Zona horaria del dispositivo
+        now: Instante de referencia (por defecto ahora)
+
+    Returns:
+        List[Dict]: Tareas serializadas con to_dict()
+    """
+    start, end = range_bounds(range_name, tz, now)
+    stmt = (
+        select(Task)
+        .join(Project, Task.project_id == Project.id)
+        .where(Project.user_id == user_id)
+        # Misma condición que el índice parcial, escrita literal para que el planificador lo use
+        .where(text(f"tasks.{OPEN_TASK_CONDITION}"))
+        .where(Task.due_date < end)
+        .order_by(Task.due_date, Task.id)
+    )
+    if start is not None:
+        stmt = stmt.where(Task.due_date >= start)
+    else:
+        stmt = stmt.where(Task.due_date.is_not(None))
+    return [task.to_dict() for task in db.scalars(stmt)]
+
+
+def get_agenda(db: Session, user_id: int, range_name: str, tz_name: Optional[str] = None,
+               now: Optional[datetime] = None) -> Dict:
+    """
+    Agenda del usuario desde la caché, recalculándola si caducó o cambiaron sus datos
+
+    Args:
+        db: Sesión de base de datos
+        user_id: Usuario
+        range_name: Rango de AGENDA_RANGES
+        tz_name: Zona horaria IANA del dispositivo (por defecto UTC)
+        now: Instante de referencia (por defecto ahora)
+
+    Returns:
+        Dict: Rango, zona, límites en UTC y tareas
+
+    Raises:
+        ValueError: Si el rango o la zona horaria no son válidos
+    """
+    tz = resolve_timezone(tz_name)
+    start, end = range_bounds(range_name, tz, now)
+
+    def build() -> Dict:
+        return {
+            "range": range_name,
+            "timezone": tz.key,
+            "start": start.replace(tzinfo=UTC).isoformat() if start else None,
+            "end": end.replace(tzinfo=UTC).isoformat(),
+            "tasks": query_agenda(db, user_id, range_name, tz, now),
+        }
+
+    # "hoy" y "semana" dependen del día local; "vencidas" se renueva con el TTL
+    key = (range_name, tz.key, start)
+    return agenda_cache.get_or_set(user_id, build, key=key)
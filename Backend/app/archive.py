@@ -0,0 +1,336 @@
+"""
+Archivo de trabajo terminado
+Las tareas completadas y los proyectos terminados hace más de ARCHIVE_AFTER_DAYS días se
+mueven de tasks/projects a archived_tasks/archived_projects, así los listados, índices y
+joinedload de las tablas calientes solo recorren trabajo activo. Un proyecto terminado se
+archiva con todas sus tareas; de los proyectos activos se archivan solo las completadas.
+
+El movimiento es por lotes de ARCHIVE_BATCH_SIZE filas: cada lote copia y borra en una sola
+transacción, así que interrumpirlo no deja filas a medias y la siguiente ejecución sigue
+donde quedó (los candidatos salen de los índices parciales por antigüedad). El fin de cada
+ejecución completa se guarda en scheduler_state: tras reiniciar no se repite antes de
+ARCHIVE_INTERVAL_HOURS. Con varios workers, cada uno reclama la ejecución con un UPDATE
+condicional sobre esa fila y solo el que lo consigue archiva en ese intervalo; si falla,
+se reintenta en el siguiente.
+
+Los cambios de estado aún en el buffer de escritura (app.write_buffer) se vuelcan antes de
+empezar, y las tareas que vuelvan a tener uno pendiente durante la ejecución se saltan.
+
+Con ARCHIVE_AFTER_DAYS=0 (por defecto) el archivado está desactivado.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import DateTime, delete, insert, literal, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import db as database
+from .datetime_utils import UTC
+from .events import publish_change
+from .models.archive import ArchivedProject, ArchivedTask
+from .models.project import FINISHED_PROJECT_CONDITION, Project
+from .models.scheduler_state import SchedulerState
+from .models.task import COMPLETED_TASK_CONDITION, Task
+from .write_buffer import status_buffer
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", 0))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", 24))
+SCHEDULER_NAME = "archive_mover"
+
+# Columnas copiadas tal cual; el id original va a original_id (el archivo tiene su propio id)
+TASK_COLUMNS = ("title", "description", "status", "priority", "due_date", "created_at", "updated_at", "project_id")
+PROJECT_COLUMNS = ("title", "description", "status", "priority", "category", "deadline", "created_at", "updated_at")
+
+
+class ArchiveMover:
+    """Mueve por lotes el trabajo terminado a las tablas de archivo"""
+
+    def __init__(self, after_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+                 interval: timedelta = timedelta(hours=ARCHIVE_INTERVAL_HOURS),
+                 session_factory: Optional[Callable[[], Session]] = None,
+                 now: Callable[[], datetime] = lambda: datetime.now(UTC),
+                 name: str = SCHEDULER_NAME):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.session_factory = session_factory
+        self._now = now
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.after_days > 0
+
+    def now(self) -> datetime:
+        # Las columnas DateTime se guardan sin zona, en UTC
+        return self._now().astimezone(UTC).replace(tzinfo=None)
+
+    def cutoff(self) -> datetime:
+        return self.now() - timedelta(days=self.after_days)
+
+    def _archived_at(self):
+        return literal(self.now(), DateTime)
+
+    def archive_projects_batch(self, db: Session) -> Dict[int, int]:
+        """
+        Archiva un lote de proyectos terminados antes del corte, con todas sus tareas
+
+        Los candidatos se bloquean (FOR UPDATE SKIP LOCKED en PostgreSQL) y la condición se
+        repite al copiar y al borrar: un proyecto reabierto entre medias se queda en projects.
+
+        Returns:
+            Dict[int, int]: Proyectos archivados por usuario
+        """
+        cutoff = self.cutoff()
+        project_ids = db.scalars(
+            select(Project.id)
+            .where(text(f"projects.{FINISHED_PROJECT_CONDITION}"))
+            .where(Project.updated_at < cutoff)
+            .order_by(Project.updated_at, Project.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not project_ids:
+            return {}
+        # Sus tareas también: una edición concurrente esperará al borrado en vez de perderse
+        tasks = db.execute(
+            select(Task.id, Task.project_id).where(Task.project_id.in_(project_ids)).with_for_update()
+        ).all()
+        # Un proyecto con un cambio de estado sin volcar en alguna tarea espera a la siguiente ejecución
+        buffered = {project_id for task_id, project_id in tasks if status_buffer.pending_status(task_id)}
+        project_ids = [project_id for project_id in project_ids if project_id not in buffered]
+        if not project_ids:
+            db.commit()  # libera los bloqueos
+            return {}
+        finished = (
+            select(Project.id)
+            .where(Project.id.in_(project_ids), text(f"projects.{FINISHED_PROJECT_CONDITION}"))
+            .where(Project.updated_at < cutoff)
+        )
+        archived_at = self._archived_at()
+
+        db.execute(insert(ArchivedTask).from_select(
+            ["original_id", *TASK_COLUMNS, "user_id", "archived_at"],
+            select(Task.id, *(getattr(Task, column) for column in TASK_COLUMNS), Project.user_id, archived_at)
+            .join(Project, Task.project_id == Project.id)
+            .where(Task.project_id.in_(finished)),
+        ))
+        db.execute(insert(ArchivedProject).from_select(
+            ["original_id", *PROJECT_COLUMNS, "user_id", "archived_at"],
+            select(Project.id, *(getattr(Project, column) for column in PROJECT_COLUMNS), Project.user_id, archived_at)
+            .where(Project.id.in_(finished)),
+        ))
+        db.execute(delete(Task).where(Task.project_id.in_(finished)))
+        owners = db.scalars(delete(Project).where(Project.id.in_(finished)).returning(Project.user_id)).all()
+        db.commit()
+        return _count_by_user(owners)
+
+    def archive_tasks_batch(self, db: Session) -> Dict[int, int]:
+        """
+        Archiva un lote de tareas completadas antes del corte
+
+        Como con los proyectos, las candidatas se bloquean y la condición se repite al copiar
+        y al borrar, así una tarea reabierta entre medias no se archiva.
+
+        Returns:
+            Dict[int, int]: Tareas archivadas por usuario
+        """
+        cutoff = self.cutoff()
+        rows = db.execute(
+            select(Task.id, Project.user_id)
+            .join(Project, Task.project_id == Project.id)
+            .where(text(f"tasks.{COMPLETED_TASK_CONDITION}"))
+            .where(Task.updated_at < cutoff)
+            .order_by(Task.updated_at, Task.id)
+            .limit(self.batch_size)
+            .with_for_update(of=Task, skip_locked=True)
+        ).all()
+        if not rows:
+            return {}
+        owners = {task_id: user_id for task_id, user_id in rows if not status_buffer.pending_status(task_id)}
+        if not owners:
+            db.commit()  # libera los bloqueos
+            return {}
+        completed = (
+            select(Task.id)
+            .where(Task.id.in_(owners), text(f"tasks.{COMPLETED_TASK_CONDITION}"))
+            .where(Task.updated_at < cutoff)
+        )
+
+        db.execute(insert(ArchivedTask).from_select(
+            ["original_id", *TASK_COLUMNS, "user_id", "archived_at"],
+            select(Task.id, *(getattr(Task, column) for column in TASK_COLUMNS), Project.user_id, self._archived_at())
+            .join(Project, Task.project_id == Project.id)
+            .where(Task.id.in_(completed)),
+        ))
+        archived_ids = db.scalars(delete(Task).where(Task.id.in_(completed)).returning(Task.id)).all()
+        db.commit()
+        return _count_by_user(owners[task_id] for task_id in archived_ids)
+
+    def run(self, db: Optional[Session] = None, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Archiva lotes hasta que no queden candidatos (o hasta max_batches)
+
+        Args:
+            db: Sesión (si no, se abre una propia)
+            max_batches: Límite de lotes en esta ejecución (None = sin límite)
+
+        Returns:
+            Dict[str, int]: Proyectos, tareas y lotes procesados
+        """
+        own_session = db is None
+        if own_session:
+            db = (self.session_factory or database.SessionLocal)()
+        totals = {"projects": 0, "tasks": 0, "batches": 0}
+        try:
+            status_buffer.flush_all(db)
+            for entity, archive_batch in (("project", self.archive_projects_batch), ("task", self.archive_tasks_batch)):
+                while max_batches is None or totals["batches"] < max_batches:
+                    if self._stop.is_set():
+                        return totals
+                    try:
+                        archived = archive_batch(db)
+                    except Exception:
+                        db.rollback()
+                        raise
+                    if not archived:
+                        break
+                    totals["batches"] += 1
+                    totals[f"{entity}s"] += sum(archived.values())
+                    for user_id in archived:
+                        publish_change(user_id, entity, "archive")
+                else:
+                    return totals
+            self._save_last_run(db)
+        finally:
+            if own_session:
+                db.close()
+        return totals
+
+    # -- ejecución en segundo plano
+
+    def _save_last_run(self, db: Session):
+        state = db.get(SchedulerState, self.name)
+        if state is None:
+            db.add(SchedulerState(name=self.name, watermark=self.now()))
+        else:
+            state.watermark = self.now()
+        db.commit()
+
+    def claim_run(self, db: Session) -> bool:
+        """
+        Reclama la ejecución de este intervalo para el worker actual
+
+        UPDATE condicional sobre scheduler_state: solo prospera si la última ejecución (o
+        reclamo) tiene más de un intervalo, así que entre varios workers gana uno.
+
+        Returns:
+            bool: True si este worker debe archivar ahora
+        """
+        now = self.now()
+        if db.get(SchedulerState, self.name, populate_existing=True) is None:
+            db.add(SchedulerState(name=self.name, watermark=now))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Otro worker la creó a la vez
+                db.rollback()
+                return False
+            return True
+        result = db.execute(
+            update(SchedulerState)
+            .where(SchedulerState.name == self.name, SchedulerState.watermark <= now - self.interval)
+            .values(watermark=now)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def seconds_until_due(self, db: Session) -> float:
+        """Segundos hasta la próxima ejecución según la última completada (0 = ya toca)"""
+        state = db.get(SchedulerState, self.name)
+        if state is None:
+            return 0.0
+        return max(0.0, (state.watermark + self.interval - self.now()).total_seconds())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with (self.session_factory or database.SessionLocal)() as db:
+                    wait = self.seconds_until_due(db)
+                    claimed = wait <= 0 and self.claim_run(db)
+                if wait > 0:
+                    self._stop.wait(wait)
+                    continue
+                if not claimed:
+                    continue  # otro worker se adelantó: la espera se recalcula con su reclamo
+                totals = self.run()
+                if totals["batches"]:
+                    logger.info(f"🗄️ Archivados {totals['projects']} proyectos y {totals['tasks']} tareas "
+                                f"en {totals['batches']} lotes")
+            except Exception as e:
+                logger.error(f"❌ Error al archivar trabajo terminado: {str(e)}")
+                self._stop.wait(60)
+
+    def start(self) -> "ArchiveMover":
+        if self.enabled and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="archive-mover", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el hilo; el lote en curso termina (o se revierte) entero"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def purge_user_archive(db: Session, user_id: int):
+    """
+    Borra el archivo de un usuario (en la transacción que lo elimina)
+
+    Las tablas de archivo no tienen clave foránea a users: sin esto, SQLite podría dar el
+    id del usuario borrado a uno nuevo y éste vería el archivo ajeno.
+    """
+    db.execute(delete(ArchivedTask).where(ArchivedTask.user_id == user_id))
+    db.execute(delete(ArchivedProject).where(ArchivedProject.user_id == user_id))
+
+
+def purge_project_archive(db: Session, user_id: int, project_id: int):
+    """
+    Borra las tareas archivadas de un proyecto activo que se elimina
+
+    Se conservan las de un proyecto archivado del usuario con ese mismo id original (el id
+    pudo reutilizarse tras archivarlo): pertenecen a ese proyecto, no al que se borra.
+    """
+    archived_project = (
+        select(ArchivedProject.id)
+        .where(ArchivedProject.user_id == user_id, ArchivedProject.original_id == project_id)
+    )
+    db.execute(
+        delete(ArchivedTask)
+        .where(ArchivedTask.user_id == user_id, ArchivedTask.project_id == project_id)
+        .where(~archived_project.exists())
+    )
+
+
+def _count_by_user(user_ids) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for user_id in user_ids:
+        counts[user_id] = counts.get(user_id, 0) + 1
+    return counts
+
+
+# Proceso de archivado (se arranca desde el lifespan si ARCHIVE_AFTER_DAYS > 0)
+archive_mover = ArchiveMover()
@@ -0,0 +1,93 @@
+"""
+Caché en memoria con valores por usuario
+Cada entrada caduca tras ``ttl`` segundos y todas las de un usuario se pueden invalidar
+de una vez cuando cambian sus datos (ver app.events).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class UserScopedCache:
+    """Caché {user_id: {clave: valor}} con caducidad y límite de usuarios"""
+
+    def __init__(self, ttl: float = 60.0, max_users: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._clock = clock
+        self._entries: Dict[int, Dict[Hashable, Tuple[float, Any]]] = {}
+        # Contador de invalidaciones por usuario: evita guardar un valor calculado antes de una escritura.
+        # Solo se guarda mientras el usuario tiene cálculos en curso (_inflight), así no crece sin límite
+        self._generations: Dict[int, int] = {}
+        self._inflight: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key: Hashable = None, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[user_id][key]
+                return default
+            return value
+
+    def set(self, user_id: int, value: Any, key: Hashable = None, generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self._generations.get(user_id, 0):
+                return
+            if user_id not in self._entries and len(self._entries) >= self.max_users:
+                # Expulsar al usuario insertado hace más tiempo
+                self._entries.pop(next(iter(self._entries)))
+            self._entries.setdefault(user_id, {})[key] = (self._clock() + self.ttl, value)
+
+    def get_or_set(self, user_id: int, factory: Callable[[], Any], key: Hashable = None) -> Any:
+        """
+        Valor cacheado o, si no existe o caducó, el resultado de factory()
+
+        Args:
+            user_id: Usuario dueño del valor
+            factory: Función que calcula el valor
+            key: Clave dentro del usuario
+
+        Returns:
+            Any: Valor cacheado o recién calculado
+        """
+        value = self.get(user_id, key, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                generation = self._generations.setdefault(user_id, 0)
+                self._inflight[user_id] = self._inflight.get(user_id, 0) + 1
+            try:
+                value = factory()
+                self.set(user_id, value, key, generation=generation)
+            finally:
+                with self._lock:
+                    remaining = self._inflight.pop(user_id) - 1
+                    if remaining:
+                        self._inflight[user_id] = remaining
+                    else:
+                        del self._generations[user_id]
+        return value
+
+    def invalidate(self, user_id: int, *_args):
+        """Borra todas las entradas de un usuario (firma compatible con app.events)"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            # Sin cálculos en curso no hay nada que descartar después
+            if user_id in self._inflight:
+                self._generations[user_id] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            # Los cálculos en curso no pueden guardar lo que calcularon antes de vaciar
+            for user_id in self._generations:
+                self._generations[user_id] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,330 @@
+"""
+Difusión de cambios a los dispositivos conectados (Server-Sent Events)
+Cada commit de las rutas de proyectos y tareas publica un aviso (app.events). Este módulo
+lo reenvía a las conexiones abiertas de ese usuario en /lifeplanner/stream, así la app
+puede dejar de consultar get_projects/get_tasks periódicamente.
+
+Brokers:
+- LocalBroker (por defecto): reparto en proceso; basta con un worker.
+- RedisBroker (STREAM_BROKER=redis): publica en Redis y un hilo por worker reenvía lo
+  recibido al LocalBroker de ese worker, así un cambio hecho en un worker llega a las
+  conexiones abiertas en los demás. Los hilos no sobreviven al fork: con preload_app el
+  módulo se importa en el maestro de gunicorn, así que el hilo se arranca en cada worker
+  (desde el lifespan o, como muy tarde, en la primera suscripción del proceso).
+
+Cada usuario guarda los últimos eventos: al reconectar con Last-Event-ID se reenvían los
+perdidos o, si ya no están, se manda un evento "resync" para que la app recargue. El
+historial de un usuario sin conexiones se descarta tras STREAM_REPLAY_SECONDS sin cambios
+(y como mucho se guardan REPLAY_USERS usuarios); cada conexión envía al empezar su posición
+(un "id:" sin evento), así un cliente sin cambios reconecta con un id reciente.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+from .events import subscribe
+
+logger = logging.getLogger(__name__)
+
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+# Las conexiones se cierran cada cierto tiempo: el cliente reconecta (con Last-Event-ID)
+# y los proxies y workers reparten de nuevo la carga
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", 300))
+STREAM_RETRY_MS = 5000
+SUBSCRIBER_QUEUE_SIZE = 100
+REPLAY_EVENTS = 50
+# Historial de usuarios sin conexiones: más que STREAM_MAX_SECONDS + reintento
+STREAM_REPLAY_SECONDS = float(os.getenv("STREAM_REPLAY_SECONDS", 600))
+REPLAY_USERS = 10_000
+REDIS_CHANNEL = "lifeplanner:changes"
+
+Event = Dict[str, Any]
+
+
+class Subscription:
+    """Cola de eventos de una conexión, alimentada desde cualquier hilo"""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _put(self, event: Event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: se descartan eventos y se le pide recargar
+            self.overflowed = True
+
+    def deliver(self, event: Event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # el bucle de la conexión ya se cerró; se dará de baja al terminar
+
+    async def get(self) -> Event:
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return {"event": "resync", "user_id": self.user_id}
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Reparte eventos entre las conexiones del proceso"""
+
+    def __init__(self, replay: int = REPLAY_EVENTS, replay_seconds: float = STREAM_REPLAY_SECONDS,
+                 max_users: int = REPLAY_USERS, clock: Callable[[], float] = time.monotonic):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        # Ordenado por último cambio: los primeros son los candidatos a descartar
+        self._recent: "OrderedDict[int, Deque[Event]]" = OrderedDict()
+        self._recent_at: Dict[int, float] = {}
+        self._replay = replay
+        self._replay_seconds = replay_seconds
+        self._max_users = max_users
+        self._clock = clock
+        # Id más nuevo de un historial descartado: un Last-Event-ID anterior pudo perder eventos
+        self._evicted_until = 0
+        self._lock = threading.Lock()
+        self._last_id = 0
+
+    def next_id(self) -> int:
+        # Creciente y basado en el reloj, así los ids siguen siendo válidos tras reiniciar
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            return self._last_id
+
+    def subscribe(self, user_id: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(user_id, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self, user_id: Optional[int] = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def deliver(self, event: Event):
+        """Entrega un evento ya numerado a las conexiones locales de su usuario"""
+        user_id = event["user_id"]
+        with self._lock:
+            now = self._clock()
+            self._recent.setdefault(user_id, deque(maxlen=self._replay)).append(event)
+            self._recent.move_to_end(user_id)
+            self._recent_at[user_id] = now
+            self._evict(now)
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def _evict(self, now: float):
+        """Descarta historiales viejos de usuarios sin conexiones (con el lock tomado)"""
+        for _ in range(len(self._recent)):
+            user_id = next(iter(self._recent))
+            over_limit = len(self._recent) > self._max_users
+            if not over_limit and now - self._recent_at[user_id] <= self._replay_seconds:
+                break
+            if not over_limit and user_id in self._subscribers:
+                # Conectado: su historial se conserva y se revisa en la siguiente vuelta
+                self._recent.move_to_end(user_id)
+                continue
+            events = self._recent.pop(user_id)
+            del self._recent_at[user_id]
+            if events:
+                self._evicted_until = max(self._evicted_until, events[-1]["id"])
+
+    def history_size(self) -> int:
+        with self._lock:
+            return len(self._recent)
+
+    def publish(self, user_id: int, entity: str, action: str):
+        self.publish_event(self.build_event(user_id, entity, action))
+
+    def publish_event(self, event: Event):
+        """Difunde un evento ya numerado (cambio, recordatorio...) a las conexiones de su usuario"""
+        self.deliver(event)
+
+    def build_event(self, user_id: int, entity: str, action: str) -> Event:
+        return {"id": self.next_id(), "event": "change", "user_id": user_id, "entity": entity, "action": action}
+
+    def missed_since(self, user_id: int, last_event_id: int) -> Optional[List[Event]]:
+        """
+        Eventos posteriores a last_event_id
+
+        Returns:
+            Optional[List[Event]]: Eventos perdidos, o None si ya no se conservan (hay que recargar)
+        """
+        with self._lock:
+            recent = list(self._recent.get(user_id, ()))
+            evicted_until = self._evicted_until
+        # Historial lleno y el evento más antiguo es posterior: pudo perderse alguno
+        if len(recent) == self._replay and recent[0]["id"] > last_event_id:
+            return None
+        # Historiales descartados después de last_event_id: el de este usuario pudo ser uno
+        if last_event_id < evicted_until and (not recent or recent[0]["id"] > last_event_id):
+            return None
+        return [event for event in recent if event["id"] > last_event_id]
+
+    def start(self) -> "LocalBroker":
+        """Nada que arrancar: el reparto es en proceso"""
+        return self
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._recent_at.clear()
+            self._evicted_until = 0
+
+
+class RedisBroker(LocalBroker):
+    """
+    Reparto entre workers a través de Redis pub/sub
+
+    publish() envía el evento a Redis; un hilo suscrito al canal lo entrega a las
+    conexiones locales de cada worker (incluido el que publicó).
+    """
+
+    def __init__(self, client, channel: str = REDIS_CHANNEL, replay: int = REPLAY_EVENTS):
+        super().__init__(replay)
+        self.client = client
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        # Proceso que arrancó el hilo: tras un fork el hilo ya no existe en el hijo
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def publish_event(self, event: Event):
+        self.client.publish(self.channel, json.dumps(event))
+
+    def _listen(self):
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                self.deliver(json.loads(message["data"]))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Evento de cambios inválido en Redis: {str(e)}")
+
+    def subscribe(self, user_id: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        self.start()
+        return super().subscribe(user_id, loop)
+
+    def start(self) -> "RedisBroker":
+        """Arranca el hilo suscrito al canal en este proceso (si no lo tiene ya)"""
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._listen, name="change-stream-redis", daemon=True)
+                self._thread.start()
+        return self
+
+
+def create_broker(backend: Optional[str] = None) -> LocalBroker:
+    """Broker según STREAM_BROKER ("local" o "redis", con REDIS_URL)"""
+    backend = (backend or os.getenv("STREAM_BROKER", "local")).lower()
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.warning("⚠️ STREAM_BROKER=redis pero el paquete redis no está instalado; se usa el broker local")
+            return LocalBroker()
+        # Sin arrancar: el hilo se crea en cada worker, no en el maestro que importa el módulo
+        return RedisBroker(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    return LocalBroker()
+
+
+broker = create_broker()
+
+
+@subscribe
+def _forward_change(user_id: int, entity: str, action: str):
+    """Cada commit publicado en app.events se difunde a las conexiones del usuario"""
+    broker.publish(user_id, entity, action)
+
+
+def format_sse(event: Event) -> str:
+    """Serializa un evento en el formato text/event-stream"""
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event.get('event', 'change')}")
+    data = {key: value for key, value in event.items() if key not in ("id", "event")}
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(
+    source: LocalBroker,
+    user_id: int,
+    is_disconnected: Callable[[], Any],
+    last_event_id: Optional[str] = None,
+    heartbeat: float = STREAM_HEARTBEAT_SECONDS,
+    max_seconds: float = STREAM_MAX_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Genera el cuerpo SSE de una conexión hasta que el cliente se desconecta o vence max_seconds
+
+    La suscripción se crea dentro del generador: si el cliente se va antes de que empiece
+    el cuerpo no queda ninguna suscripción colgada. Se suscribe antes de leer el historial,
+    así un evento publicado entre ambos pasos llega por la cola (y no se envía dos veces).
+
+    Args:
+        source: Broker de la conexión
+        user_id: Usuario autenticado
+        is_disconnected: Corrutina que indica si el cliente cerró (Request.is_disconnected)
+        last_event_id: Cabecera Last-Event-ID al reconectar (inválida = pedir recarga)
+        heartbeat: Segundos entre comentarios keep-alive
+        max_seconds: Duración máxima de la conexión
+    """
+    deadline = time.monotonic() + max_seconds
+    subscription = source.subscribe(user_id)
+    try:
+        position = source.next_id()
+        replay: Optional[List[Event]] = []
+        if last_event_id is not None:
+            try:
+                replay = source.missed_since(user_id, int(last_event_id))
+            except ValueError:
+                replay = None
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        replayed: Set[int] = set()
+        if replay is None:
+            yield format_sse({"event": "resync", "user_id": user_id})
+        else:
+            for event in replay:
+                replayed.add(event["id"])
+                yield format_sse(event)
+        # Posición sin evento: EventSource la guarda como Last-Event-ID
+        yield f"id: {max([position, *replayed])}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or await is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event.get("id") in replayed:
+                continue
+            yield format_sse(event)
+    finally:
+        source.unsubscribe(subscription)
@@ -0,0 +1,118 @@
+"""
+Manifiesto de assets de los chibis con huella de contenido
+Al arrancar se calcula un hash de cada archivo de static/chibis/ y las URLs pasan a ser
+``nombre.<hash>.png``. Esas rutas se sirven con caché inmutable de un año: si la imagen
+cambia, cambia el hash y por tanto la URL.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from starlette.responses import Response
+
+CHIBI_STATIC_DIR = Path(__file__).resolve().parent.parent / "static" / "chibis"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Archivos que entran en el manifiesto
+ASSET_EXTENSIONS = {".png", ".webp", ".jpg", ".jpeg", ".svg"}
+
+HASH_LENGTH = 12
+
+_FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$" % HASH_LENGTH)
+
+
+def file_hash(path: Path) -> str:
+    """Hash SHA-256 (truncado) del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class ChibiAssetManifest:
+    """Relaciona cada archivo de chibi con su nombre con huella de contenido"""
+
+    def __init__(self):
+        self.files: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+        # Aumenta en cada build/clear: permite invalidar lo que dependa de las URLs
+        self.version = 0
+
+    def build(self, directory: Path = CHIBI_STATIC_DIR) -> Dict[str, str]:
+        """
+        Recalcula el manifiesto a partir de los archivos del directorio
+
+        Args:
+            directory: Directorio de los chibis
+
+        Returns:
+            Dict[str, str]: Nombre original → nombre con huella
+        """
+        files: Dict[str, str] = {}
+        hashes: Dict[str, str] = {}
+        directory = Path(directory)
+        if directory.is_dir():
+            for path in sorted(directory.iterdir()):
+                if not path.is_file() or path.suffix.lower() not in ASSET_EXTENSIONS:
+                    continue
+                content_hash = file_hash(path)
+                hashes[path.name] = content_hash
+                files[path.name] = f"{path.stem}.{content_hash}{path.suffix}"
+        # Reemplazo de una sola vez para que los lectores nunca vean un manifiesto a medias
+        self.files, self.hashes = files, hashes
+        self.version += 1
+        return files
+
+    def clear(self):
+        self.files, self.hashes = {}, {}
+        self.version += 1
+
+    def fingerprinted(self, filename: str) -> str:
+        """Nombre con huella, o el original si el archivo no está en el manifiesto"""
+        return self.files.get(filename, filename)
+
+    def content_hash(self, filename: str) -> Optional[str]:
+        return self.hashes.get(filename)
+
+    def resolve(self, requested: str) -> Tuple[str, bool]:
+        """
+        Traduce una ruta pedida al archivo real
+
+        Args:
+            requested: Nombre pedido (con o sin huella)
+
+        Returns:
+            Tuple[str, bool]: (archivo real, True si la huella coincide con el contenido actual)
+        """
+        match = _FINGERPRINT_RE.match(requested)
+        if not match:
+            return requested, False
+        original = f"{match.group('stem')}{match.group('ext')}"
+        if original not in self.hashes:
+            return requested, False
+        return original, self.hashes[original] == match.group("hash")
+
+
+# Manifiesto compartido por ChibiManager y el montaje de estáticos
+manifest = ChibiAssetManifest()
+
+
+class ChibiStaticFiles(StaticFiles):
+    """StaticFiles que entiende nombres con huella y los sirve con caché inmutable"""
+
+    def __init__(self, *args, asset_manifest: ChibiAssetManifest = manifest, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.asset_manifest = asset_manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        original, current = self.asset_manifest.resolve(path)
+        response = await super().get_response(original, scope)
+        if current and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
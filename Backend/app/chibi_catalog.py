@@ -0,0 +1,168 @@
+"""
+Catálogo precalculado de chibis
+Las respuestas de /chibis/types, /chibis/emotional-states, /chibis/preview y
+/chibis/content son estáticas por despliegue: se construyen y serializan una sola vez
+(al arrancar) y se sirven como bytes con ETag. Solo se recalculan si cambia el
+manifiesto de assets, porque la vista previa incluye URLs con huella.
+"""
+
+import random
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .chibi_assets import manifest as chibi_manifest
+from .chibi_config import (
+    ChibiConfig, DEFAULT_MOTIVATIONAL_MESSAGES, DEFAULT_STUDY_TIPS, MOTIVATIONAL_MESSAGES, STUDY_TIPS, SchoolSubject
+)
+from .chibi_manager import ChibiManager, ChibiType
+from .http_cache import CachedPayload
+
+PROJECT_STATUSES = ["activo", "en_pausa", "terminado"]
+TASK_STATUSES = ["pendiente", "en_progreso", "completada"]
+PRIORITIES = ["alta", "media", "baja", None]
+
+
+def build_chibi_types() -> Dict[str, str]:
+    return ChibiManager.get_all_chibi_types()
+
+
+def build_emotional_states() -> Dict[str, str]:
+    return {
+        chibi_type.value: ChibiManager.get_emotional_state_description(chibi_type)
+        for chibi_type in ChibiType
+    }
+
+
+def _preview_entry(status: str, priority: Optional[str], chibi_filename: str, chibi_type: ChibiType) -> Dict[str, str]:
+    return {
+        "chibi_filename": chibi_filename,
+        "chibi_url": ChibiManager.get_chibi_url(chibi_filename),
+        "status": status,
+        "priority": priority or "sin_prioridad",
+        "emotional_state": chibi_type.value,
+        "emotional_description": ChibiManager.get_emotional_state_description(chibi_type),
+    }
+
+
+def build_chibi_preview() -> Dict[str, List[Dict[str, str]]]:
+    """
+    Vista previa de todos los chibis organizados por proyectos y tareas
+
+    Returns:
+        Dict[str, List[Dict[str, str]]]: Chibis de cada combinación estado/prioridad
+    """
+    project_chibis = []
+    for status in PROJECT_STATUSES:
+        for priority in PRIORITIES:
+            chibi_type = ChibiManager.PROJECT_CHIBIS.get((status, priority), ChibiType.HAPPY_STUDYING)
+            project_chibis.append(
+                _preview_entry(status, priority, ChibiManager.get_project_chibi(status, priority), chibi_type)
+            )
+
+    task_chibis = []
+    for status in TASK_STATUSES:
+        for priority in PRIORITIES:
+            chibi_type = ChibiManager.TASK_CHIBIS.get((status, priority), ChibiType.CONFIDENT_READY)
+            task_chibis.append(
+                _preview_entry(status, priority, ChibiManager.get_task_chibi(status, priority), chibi_type)
+            )
+
+    return {"projects": project_chibis, "tasks": task_chibis}
+
+
+def build_chibi_content() -> Dict[str, object]:
+    """
+    Todos los mensajes motivacionales y consejos de estudio en una sola respuesta
+
+    Returns:
+        Dict[str, object]: Mensajes por estado emocional, consejos por materia y valores por defecto
+    """
+    return {
+        "motivational_messages": {state: list(messages) for state, messages in MOTIVATIONAL_MESSAGES.items()},
+        "default_motivational_messages": list(DEFAULT_MOTIVATIONAL_MESSAGES),
+        "study_tips": {
+            subject.value: list(STUDY_TIPS.get(subject, DEFAULT_STUDY_TIPS)) for subject in SchoolSubject
+        },
+        "default_study_tips": list(DEFAULT_STUDY_TIPS),
+    }
+
+
+CATALOG_BUILDERS: Dict[str, Callable[[], object]] = {
+    "types": build_chibi_types,
+    "emotional-states": build_emotional_states,
+    "preview": build_chibi_preview,
+    "content": build_chibi_content,
+}
+
+# nombre → (versión del manifiesto, respuesta serializada)
+_payloads: Dict[str, Tuple[int, CachedPayload]] = {}
+
+
+def get_payload(name: str) -> CachedPayload:
+    """
+    Respuesta serializada de un catálogo, construyéndola si no existe o está desfasada
+
+    Args:
+        name: Clave de CATALOG_BUILDERS
+
+    Returns:
+        CachedPayload: Cuerpo JSON y su ETag
+    """
+    cached = _payloads.get(name)
+    if cached is not None and cached[0] == chibi_manifest.version:
+        return cached[1]
+    payload = CachedPayload.from_json(CATALOG_BUILDERS[name]())
+    _payloads[name] = (chibi_manifest.version, payload)
+    return payload
+
+
+def warm() -> int:
+    """Precalcula todos los catálogos (se llama al arrancar tras construir el manifiesto)"""
+    for name in CATALOG_BUILDERS:
+        get_payload(name)
+    return len(CATALOG_BUILDERS)
+
+
+@lru_cache(maxsize=1024)
+def daily_quote_payload(day: date, user_key: Optional[str] = None) -> CachedPayload:
+    """
+    Respuesta serializada de la frase del día (una por fecha y usuario)
+
+    Args:
+        day: Fecha UTC
+        user_key: Identificador del usuario, o None para la frase común
+
+    Returns:
+        CachedPayload: Cuerpo JSON y su ETag
+    """
+    return CachedPayload.from_json({
+        "quote": ChibiConfig.get_daily_quote(day, user_key),
+        "source": "Sistema de motivación de Sakura",
+        "date": day.isoformat(),
+    })
+
+
+def random_state_payload(seed: int) -> CachedPayload:
+    """
+    Estado emocional elegido con un generador propio sembrado con seed
+
+    Args:
+        seed: Semilla del generador
+
+    Returns:
+        CachedPayload: Cuerpo JSON (incluye la semilla) y su ETag
+    """
+    chibi_type = random.Random(seed).choice(list(ChibiType))
+    return CachedPayload.from_json({
+        "emotional_state": chibi_type.value,
+        "emotional_description": ChibiManager.get_emotional_state_description(chibi_type),
+        "chibi_filename": f"{chibi_type.value}.png",
+        "chibi_url": ChibiManager.get_chibi_url(f"{chibi_type.value}.png"),
+        "seed": seed,
+    })
+
+
+def clear():
+    _payloads.clear()
+    daily_quote_payload.cache_clear()
@@ -3,9 +3,15 @@ Configuración específica para la colegiala chibi
 Define características, personalidad y preferencias de la colegiala
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from datetime import date
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+import hashlib
+
+from .datetime_utils import utc_today
 
 class SchoolSubject(Enum):
     """Materias escolares que puede estar estudiando la colegiala"""
@@ -107,55 +113,135 @@ class ChibiAppearance:
         "thoughtful": "Cejas arqueadas, expresión pensativa"
     }
 
+# Tablas de solo lectura construidas una vez al importar el módulo
+STUDY_TIPS: Mapping[SchoolSubject, Tuple[str, ...]] = MappingProxyType({
+    SchoolSubject.MATH: (
+        "Hacer muchos ejercicios prácticos",
+        "Usar colores para fórmulas importantes",
+        "Crear tarjetas de memoria",
+        "Practicar con problemas del mundo real"
+    ),
+    SchoolSubject.SCIENCE: (
+        "Hacer experimentos en casa",
+        "Crear diagramas y mapas conceptuales",
+        "Ver videos educativos",
+        "Relacionar conceptos con la vida diaria"
+    ),
+    SchoolSubject.LITERATURE: (
+        "Leer en voz alta",
+        "Subrayar pasajes importantes",
+        "Escribir resúmenes",
+        "Discutir con compañeros"
+    ),
+    SchoolSubject.HISTORY: (
+        "Crear líneas de tiempo",
+        "Hacer mapas mentales",
+        "Relacionar eventos históricos",
+        "Ver documentales"
+    ),
+    SchoolSubject.ART: (
+        "Practicar técnicas básicas",
+        "Observar obras de arte",
+        "Experimentar con diferentes materiales",
+        "Mantener un sketchbook"
+    )
+})
+
+DEFAULT_STUDY_TIPS: Tuple[str, ...] = ("Estudiar con constancia", "Hacer resúmenes", "Practicar regularmente")
+
+# Índice inverso valor → materia ("matemáticas" → SchoolSubject.MATH)
+SUBJECTS_BY_VALUE: Mapping[str, SchoolSubject] = MappingProxyType({subject.value: subject for subject in SchoolSubject})
+
 class StudySession:
     """Configuración para sesiones de estudio"""
     
     @staticmethod
     def get_study_tips_by_subject(subject) -> List[str]:
         """Obtiene consejos de estudio específicos por materia"""
-        tips = {
-            SchoolSubject.MATH: [
-                "Hacer muchos ejercicios prácticos",
-                "Usar colores para fórmulas importantes",
-                "Crear tarjetas de memoria",
-                "Practicar con problemas del mundo real"
-            ],
-            SchoolSubject.SCIENCE: [
-                "Hacer experimentos en casa",
-                "Crear diagramas y mapas conceptuales",
-                "Ver videos educativos",
-                "Relacionar conceptos con la vida diaria"
-            ],
-            SchoolSubject.LITERATURE: [
-                "Leer en voz alta",
-                "Subrayar pasajes importantes",
-                "Escribir resúmenes",
-                "Discutir con compañeros"
-            ],
-            SchoolSubject.HISTORY: [
-                "Crear líneas de tiempo",
-                "Hacer mapas mentales",
-                "Relacionar eventos históricos",
-                "Ver documentales"
-            ],
-            SchoolSubject.ART: [
-                "Practicar técnicas básicas",
-                "Observar obras de arte",
-                "Experimentar con diferentes materiales",
-                "Mantener un sketchbook"
-            ]
-        }
-        
         # Si es un string, buscar por valor
         if isinstance(subject, str):
-            for enum_value in SchoolSubject:
-                if enum_value.value == subject:
-                    return tips.get(enum_value, ["Estudiar con constancia", "Hacer resúmenes", "Practicar regularmente"])
-            # Si no se encuentra, devolver consejos genéricos
-            return ["Estudiar con constancia", "Hacer resúmenes", "Practicar regularmente"]
-        
-        # Si es un enum, usar directamente
-        return tips.get(subject, ["Estudiar con constancia", "Hacer resúmenes", "Practicar regularmente"])
+            subject = SUBJECTS_BY_VALUE.get(subject)
+        return list(STUDY_TIPS.get(subject, DEFAULT_STUDY_TIPS))
+
+MOTIVATIONAL_MESSAGES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "happy_excited": (
+        "¡Sigue así! Tu entusiasmo es contagioso",
+        "Tu energía positiva te llevará lejos",
+        "¡Eres increíble! Mantén esa actitud"
+    ),
+    "focused_determined": (
+        "Tu concentración es admirable",
+        "Cada paso cuenta, sigue adelante",
+        "Tu determinación te hará alcanzar tus metas"
+    ),
+    "tired_but_determined": (
+        "Aunque estés cansada, no te rindes",
+        "Tu perseverancia es inspiradora",
+        "Descansa un poco, pero no te detengas"
+    ),
+    "nervous_uncertain": (
+        "Respira profundo, tú puedes con esto",
+        "La incertidumbre es parte del crecimiento",
+        "Confía en ti misma, eres más fuerte de lo que crees"
+    ),
+    "proud_accomplished": (
+        "¡Felicidades! Te lo mereces",
+        "Tu esfuerzo ha dado frutos",
+        "Eres un ejemplo de dedicación"
+    ),
+    "happy_calm": (
+        "Tu tranquilidad es admirable",
+        "Disfruta del momento presente",
+        "Tu paz interior te ayuda a avanzar"
+    ),
+    "happy_studying": (
+        "¡Qué bien se ve estudiando!",
+        "El aprendizaje es un regalo",
+        "Disfruta cada momento de estudio"
+    ),
+    "focused_stressed": (
+        "Respira profundo, tú puedes",
+        "La presión te hace más fuerte",
+        "Mantén la calma, todo saldrá bien"
+    ),
+    "tired_overwhelmed": (
+        "Es normal sentirse así a veces",
+        "Tómate un descanso, te lo mereces",
+        "Mañana será un nuevo día"
+    ),
+    "excited_achievement": (
+        "¡Felicidades por tu logro!",
+        "Tu esfuerzo ha valido la pena",
+        "¡Eres increíble!"
+    ),
+    "thoughtful_planning": (
+        "La planificación es clave",
+        "Cada paso cuenta",
+        "Tu organización te llevará lejos"
+    ),
+    "confident_ready": (
+        "¡Tú puedes con todo!",
+        "Tu confianza te hace invencible",
+        "Estás lista para cualquier desafío"
+    ),
+    "relaxed_break": (
+        "Disfruta tu descanso",
+        "Recarga energías",
+        "Volverás con más fuerza"
+    ),
+    "energized_motivated": (
+        "¡Tu energía es contagiosa!",
+        "¡Nada puede detenerte!",
+        "¡Eres una fuerza de la naturaleza!"
+    ),
+    "determined_challenge": (
+        "¡Enfrenta el desafío!",
+        "Tu determinación es admirable",
+        "¡Tú puedes con esto!"
+    )
+})
+
+DEFAULT_MOTIVATIONAL_MESSAGES: Tuple[str, ...] = ("Sigue adelante", "Tú puedes", "Eres capaz")
 
 class MotivationSystem:
     """Sistema de motivación para la colegiala"""
@@ -163,84 +249,7 @@ class MotivationSystem:
     @staticmethod
     def get_motivational_messages(emotional_state: str) -> List[str]:
         """Obtiene mensajes motivacionales según el estado emocional"""
-        messages = {
-            "happy_excited": [
-                "¡Sigue así! Tu entusiasmo es contagioso",
-                "Tu energía positiva te llevará lejos",
-                "¡Eres increíble! Mantén esa actitud"
-            ],
-            "focused_determined": [
-                "Tu concentración es admirable",
-                "Cada paso cuenta, sigue adelante",
-                "Tu determinación te hará alcanzar tus metas"
-            ],
-            "tired_but_determined": [
-                "Aunque estés cansada, no te rindes",
-                "Tu perseverancia es inspiradora",
-                "Descansa un poco, pero no te detengas"
-            ],
-            "nervous_uncertain": [
-                "Respira profundo, tú puedes con esto",
-                "La incertidumbre es parte del crecimiento",
-                "Confía en ti misma, eres más fuerte de lo que crees"
-            ],
-            "proud_accomplished": [
-                "¡Felicidades! Te lo mereces",
-                "Tu esfuerzo ha dado frutos",
-                "Eres un ejemplo de dedicación"
-            ],
-            "happy_calm": [
-                "Tu tranquilidad es admirable",
-                "Disfruta del momento presente",
-                "Tu paz interior te ayuda a avanzar"
-            ],
-            "happy_studying": [
-                "¡Qué bien se ve estudiando!",
-                "El aprendizaje es un regalo",
-                "Disfruta cada momento de estudio"
-            ],
-            "focused_stressed": [
-                "Respira profundo, tú puedes",
-                "La presión te hace más fuerte",
-                "Mantén la calma, todo saldrá bien"
-            ],
-            "tired_overwhelmed": [
-                "Es normal sentirse así a veces",
-                "Tómate un descanso, te lo mereces",
-                "Mañana será un nuevo día"
-            ],
-            "excited_achievement": [
-                "¡Felicidades por tu logro!",
-                "Tu esfuerzo ha valido la pena",
-                "¡Eres increíble!"
-            ],
-            "thoughtful_planning": [
-                "La planificación es clave",
-                "Cada paso cuenta",
-                "Tu organización te llevará lejos"
-            ],
-            "confident_ready": [
-                "¡Tú puedes con todo!",
-                "Tu confianza te hace invencible",
-                "Estás lista para cualquier desafío"
-            ],
-            "relaxed_break": [
-                "Disfruta tu descanso",
-                "Recarga energías",
-                "Volverás con más fuerza"
-            ],
-            "energized_motivated": [
-                "¡Tu energía es contagiosa!",
-                "¡Nada puede detenerte!",
-                "¡Eres una fuerza de la naturaleza!"
-            ],
-            "determined_challenge": [
-                "¡Enfrenta el desafío!",
-                "Tu determinación es admirable",
-                "¡Tú puedes con esto!"
-            ]
-        }
-        return messages.get(emotional_state, ["Sigue adelante", "Tú puedes", "Eres capaz"])
+        return list(MOTIVATIONAL_MESSAGES.get(emotional_state, DEFAULT_MOTIVATIONAL_MESSAGES))
 
 class ChibiConfig:
     """Configuración principal de la colegiala chibi"""
@@ -275,18 +284,31 @@ class ChibiConfig:
         ]
     }
     
+    # Frases del día (el orden importa: el índice se deriva de la fecha)
+    DAILY_QUOTES = (
+        "La educación es el arma más poderosa que puedes usar para cambiar el mundo. - Nelson Mandela",
+        "El éxito no es final, el fracaso no es fatal: lo que cuenta es el coraje para continuar. - Winston Churchill",
+        "La mente es como un paracaídas, solo funciona si se abre. - Albert Einstein",
+        "El aprendizaje es un tesoro que seguirá a su dueño a todas partes. - Proverbio chino",
+        "La educación no es preparación para la vida; la educación es la vida misma. - John Dewey"
+    )
+    
     @staticmethod
-    def get_daily_quote() -> str:
-        """Obtiene una frase motivacional del día"""
-        quotes = [
-            "La educación es el arma más poderosa que puedes usar para cambiar el mundo. - Nelson Mandela",
-            "El éxito no es final, el fracaso no es fatal: lo que cuenta es el coraje para continuar. - Winston Churchill",
-            "La mente es como un paracaídas, solo funciona si se abre. - Albert Einstein",
-            "El aprendizaje es un tesoro que seguirá a su dueño a todas partes. - Proverbio chino",
-            "La educación no es preparación para la vida; la educación es la vida misma. - John Dewey"
-        ]
-        import random
-        return random.choice(quotes)
+    def get_daily_quote(day: Optional[date] = None, user_key: Optional[str] = None) -> str:
+        """
+        Obtiene la frase motivacional del día
+        
+        La frase es una función determinista de la fecha (y opcionalmente del usuario):
+        todas las peticiones del mismo día devuelven la misma, así que es cacheable.
+        
+        Args:
+            day: Fecha (por defecto hoy en UTC)
+            user_key: Identificador para dar a cada usuario su propia frase del día
+            
+        Returns:
+            str: Frase y autor
+        """
+        return _daily_quote(day or utc_today(), user_key)
     
     @staticmethod
     def get_study_break_activities() -> List[str]:
@@ -300,4 +322,9 @@ class ChibiConfig:
             "Hablar con un amigo por teléfono",
             "Dibujar o colorear",
             "Leer algo divertido"
-        ] 
\ No newline at end of file
+        ] 
+
+@lru_cache(maxsize=1024)
+def _daily_quote(day: date, user_key: Optional[str]) -> str:
+    digest = hashlib.sha256(f"{day.isoformat()}:{user_key or ''}".encode("utf-8")).digest()
+    return ChibiConfig.DAILY_QUOTES[int.from_bytes(digest[:8], "big") % len(ChibiConfig.DAILY_QUOTES)]
@@ -0,0 +1,219 @@
+"""
+Variantes redimensionadas de los chibis bajo demanda
+Cada combinación (imagen, ancho, formato) se genera una sola vez con Pillow y se guarda
+en una caché en disco limitada por tamaño (LRU por fecha de último acceso). Las
+peticiones siguientes leen el contenido de ese archivo bajo el lock de la caché, así
+una expulsión concurrente nunca deja al endpoint con una ruta ya borrada.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional
+
+from .chibi_assets import CHIBI_STATIC_DIR, file_hash, manifest as chibi_manifest
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él el endpoint responde 503
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+CHIBI_CACHE_DIR = Path(os.getenv("CHIBI_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache" / "chibis"))
+CHIBI_CACHE_MAX_BYTES = int(os.getenv("CHIBI_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+MIN_WIDTH = 16
+MAX_WIDTH = 1024
+
+# formato pedido → (formato de Pillow, media type, opciones de guardado)
+OUTPUT_FORMATS = {
+    "png": ("PNG", "image/png", {"optimize": True}),
+    "webp": ("WEBP", "image/webp", {"quality": 85, "method": 4}),
+}
+
+
+def pillow_available() -> bool:
+    return Image is not None
+
+
+class DiskLRUCache:
+    """Caché de archivos en disco que expulsa los menos usados al superar max_bytes"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key
+
+    def read(self, key: str) -> Optional[bytes]:
+        """
+        Contenido del archivo cacheado, actualizando su fecha de acceso
+
+        Se lee con el lock tomado: evict no puede borrarlo a mitad de la lectura.
+
+        Args:
+            key: Nombre del archivo dentro de la caché
+
+        Returns:
+            Optional[bytes]: Contenido si existe, None si no
+        """
+        path = self.path_for(key)
+        with self._lock:
+            try:
+                os.utime(path)
+                return path.read_bytes()
+            except FileNotFoundError:
+                return None
+
+    def put(self, key: str, data: bytes) -> Path:
+        """
+        Guarda un archivo de forma atómica y aplica el límite de tamaño
+
+        Args:
+            key: Nombre del archivo dentro de la caché
+            data: Contenido
+
+        Returns:
+            Path: Ruta del archivo guardado
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        # Escritura a un temporal + os.replace: un lector nunca ve un archivo a medias
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict(keep=key)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Borra los archivos con acceso más antiguo hasta quedar bajo max_bytes
+
+        Args:
+            keep: Clave que no debe expulsarse (la recién escrita)
+
+        Returns:
+            int: Número de archivos eliminados
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.is_file() or entry.name.startswith(".tmp-"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+                total += stat.st_size
+            removed = 0
+            for _, name, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                try:
+                    os.unlink(self.directory / name)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+    def size(self) -> int:
+        if not self.directory.is_dir():
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def clear(self):
+        if self.directory.is_dir():
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    os.unlink(entry.path)
+
+
+# Caché compartida por el endpoint /chibis/image
+variant_cache = DiskLRUCache(CHIBI_CACHE_DIR, CHIBI_CACHE_MAX_BYTES)
+
+# Un lock por variante: dos peticiones simultáneas de la misma variante la generan una vez
+_render_locks: Dict[str, threading.Lock] = {}
+_render_locks_guard = threading.Lock()
+
+
+def source_hash(filename: str, source_dir: Path = CHIBI_STATIC_DIR) -> str:
+    """Hash del original: del manifiesto si está construido, si no del archivo"""
+    return chibi_manifest.content_hash(filename) or file_hash(Path(source_dir) / filename)
+
+
+def variant_key(name: str, content_hash: str, width: Optional[int], fmt: str) -> str:
+    size = f"w{width}" if width else "orig"
+    return f"{name}.{content_hash}.{size}.{fmt}"
+
+
+def render_variant(source: Path, width: Optional[int], fmt: str) -> bytes:
+    """
+    Redimensiona una imagen manteniendo la proporción y la codifica
+
+    Args:
+        source: Ruta de la imagen original
+        width: Ancho destino (None mantiene el original; nunca se amplía)
+        fmt: Formato de salida ('png' o 'webp')
+
+    Returns:
+        bytes: Imagen codificada
+    """
+    pil_format, _, options = OUTPUT_FORMATS[fmt]
+    with Image.open(source) as img:
+        img = img.convert("RGBA")
+        if width and width < img.width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def get_variant(name: str, width: Optional[int], fmt: str, cache: DiskLRUCache = None,
+                source_dir: Path = CHIBI_STATIC_DIR) -> bytes:
+    """
+    Contenido de la variante pedida, generándola si aún no existe
+
+    Pensada para ejecutarse en el threadpool: lee, redimensiona y escribe en disco.
+
+    Args:
+        name: Nombre del chibi sin extensión (valor de ChibiType)
+        width: Ancho destino o None
+        fmt: Formato de salida
+        cache: Caché de variantes (por defecto la compartida)
+        source_dir: Directorio de los originales
+
+    Returns:
+        bytes: Imagen codificada
+    """
+    cache = cache or variant_cache
+    filename = f"{name}.png"
+    key = variant_key(name, source_hash(filename, source_dir), width, fmt)
+    data = cache.read(key)
+    if data is not None:
+        return data
+    with _render_locks_guard:
+        lock = _render_locks.setdefault(key, threading.Lock())
+    with lock:
+        data = cache.read(key)
+        if data is None:
+            # Se devuelven los bytes generados aunque otra petición expulse el archivo enseguida
+            data = render_variant(Path(source_dir) / filename, width, fmt)
+            cache.put(key, data)
+            logger.info(f"🖼️ Variante de chibi generada: {key}")
+    with _render_locks_guard:
+        _render_locks.pop(key, None)
+    return data
@@ -1,5 +1,6 @@
 from typing import Dict, Literal, Optional
 from enum import Enum
+from .chibi_assets import manifest as chibi_manifest
 
 class ChibiType(Enum):
     # Estados emocionales de la colegiala
@@ -19,6 +20,44 @@ class ChibiType(Enum):
     ENERGIZED_MOTIVATED = "energized_motivated" # Energizada y motivada
     DETERMINED_CHALLENGE = "determined_challenge" # Determinada ante desafío
 
+# Descripciones estáticas: se construyen una vez al importar el módulo
+CHIBI_TYPE_DESCRIPTIONS: Dict[str, str] = {
+    # Estados emocionales generales
+    "happy_excited": "Colegiala feliz y emocionada",
+    "happy_calm": "Colegiala feliz y tranquila",
+    "happy_studying": "Colegiala feliz estudiando",
+    "focused_determined": "Colegiala concentrada y determinada",
+    "focused_stressed": "Colegiala concentrada pero estresada",
+    "tired_but_determined": "Colegiala cansada pero determinada",
+    "tired_overwhelmed": "Colegiala cansada y abrumada",
+    "excited_achievement": "Colegiala emocionada por logro",
+    "proud_accomplished": "Colegiala orgullosa de logro",
+    "thoughtful_planning": "Colegiala pensativa planificando",
+    "confident_ready": "Colegiala confiada y lista",
+    "nervous_uncertain": "Colegiala nerviosa e incierta",
+    "relaxed_break": "Colegiala relajada en descanso",
+    "energized_motivated": "Colegiala energizada y motivada",
+    "determined_challenge": "Colegiala determinada ante desafío",
+}
+
+EMOTIONAL_STATE_DESCRIPTIONS: Dict[ChibiType, str] = {
+    ChibiType.HAPPY_EXCITED: "¡Está muy emocionada! Sus ojos brillan con entusiasmo y tiene una sonrisa radiante.",
+    ChibiType.HAPPY_CALM: "Se ve tranquila y contenta, disfrutando del momento con una sonrisa suave.",
+    ChibiType.HAPPY_STUDYING: "Está estudiando con alegría, disfrutando del proceso de aprendizaje.",
+    ChibiType.FOCUSED_DETERMINED: "Concentrada en su objetivo, muestra determinación y enfoque.",
+    ChibiType.FOCUSED_STRESSED: "Está trabajando duro pero se nota algo de tensión en su expresión.",
+    ChibiType.TIRED_BUT_DETERMINED: "Aunque está cansada, mantiene su determinación y sigue adelante.",
+    ChibiType.TIRED_OVERWHELMED: "Se ve agotada y un poco abrumada, necesita un descanso.",
+    ChibiType.EXCITED_ACHIEVEMENT: "¡Está súper emocionada por su logro! Sus ojos brillan de felicidad.",
+    ChibiType.PROUD_ACCOMPLISHED: "Se ve orgullosa y satisfecha con lo que ha logrado.",
+    ChibiType.THOUGHTFUL_PLANNING: "Está pensando y planificando su siguiente paso con cuidado.",
+    ChibiType.CONFIDENT_READY: "Se ve segura de sí misma y lista para enfrentar cualquier desafío.",
+    ChibiType.NERVOUS_UNCERTAIN: "Se nota un poco nerviosa e insegura sobre lo que viene.",
+    ChibiType.RELAXED_BREAK: "Está relajada, tomándose un merecido descanso.",
+    ChibiType.ENERGIZED_MOTIVATED: "¡Está llena de energía y motivación! Lista para cualquier cosa.",
+    ChibiType.DETERMINED_CHALLENGE: "Se ve decidida a enfrentar el desafío que tiene por delante.",
+}
+
 class ChibiManager:
     """Maneja la lógica para determinar qué chibi de colegiala mostrar según el estado y prioridad"""
     
@@ -102,11 +141,42 @@ class ChibiManager:
             
         return f"{chibi_type.value}.png"
     
+    # Reglas de ánimo según la carga de trabajo: se aplica la primera que se cumpla
+    MOOD_RULES = (
+        (lambda s: s["overdue"] >= 3, ChibiType.TIRED_OVERWHELMED),
+        (lambda s: s["overdue"] >= 1, ChibiType.FOCUSED_STRESSED),
+        (lambda s: s["due_soon"] >= 3, ChibiType.NERVOUS_UNCERTAIN),
+        (lambda s: s["completed_today"] >= 3, ChibiType.ENERGIZED_MOTIVATED),
+        (lambda s: s["completed_today"] >= 1, ChibiType.PROUD_ACCOMPLISHED),
+        (lambda s: s["due_soon"] >= 1, ChibiType.FOCUSED_DETERMINED),
+        (lambda s: s["open"] == 0, ChibiType.RELAXED_BREAK),
+    )
+    
+    @staticmethod
+    def get_mood_chibi(signals: Dict[str, int]) -> ChibiType:
+        """
+        Determina el ánimo de la colegiala a partir de la carga de trabajo del usuario
+        
+        Args:
+            signals: Conteos 'overdue' (vencidas), 'due_soon' (vencen en 24h),
+                'completed_today' (completadas hoy) y 'open' (sin completar)
+                
+        Returns:
+            ChibiType: Estado emocional correspondiente
+        """
+        for matches, chibi_type in ChibiManager.MOOD_RULES:
+            if matches(signals):
+                return chibi_type
+        return ChibiType.HAPPY_CALM
+    
     @staticmethod
     def get_chibi_url(chibi_filename: str, base_url: str = "/static/chibis/") -> str:
         """
         Genera la URL completa para el chibi
         
+        Si el manifiesto de assets está construido (al arrancar la app), la URL lleva la
+        huella del contenido (``happy_calm.<hash>.png``) y se sirve con caché inmutable.
+        
         Args:
             chibi_filename: Nombre del archivo del chibi
             base_url: URL base donde se almacenan los chibis
@@ -114,7 +184,7 @@ class ChibiManager:
         Returns:
             str: URL completa del chibi
         """
-        return f"{base_url.rstrip('/')}/{chibi_filename}"
+        return f"{base_url.rstrip('/')}/{chibi_manifest.fingerprinted(chibi_filename)}"
     
     @staticmethod
     def get_all_chibi_types() -> Dict[str, str]:
@@ -124,24 +194,7 @@ class ChibiManager:
         Returns:
             Dict[str, str]: Diccionario con tipo de chibi y descripción
         """
-        return {
-            # Estados emocionales generales
-            "happy_excited": "Colegiala feliz y emocionada",
-            "happy_calm": "Colegiala feliz y tranquila",
-            "happy_studying": "Colegiala feliz estudiando",
-            "focused_determined": "Colegiala concentrada y determinada",
-            "focused_stressed": "Colegiala concentrada pero estresada",
-            "tired_but_determined": "Colegiala cansada pero determinada",
-            "tired_overwhelmed": "Colegiala cansada y abrumada",
-            "excited_achievement": "Colegiala emocionada por logro",
-            "proud_accomplished": "Colegiala orgullosa de logro",
-            "thoughtful_planning": "Colegiala pensativa planificando",
-            "confident_ready": "Colegiala confiada y lista",
-            "nervous_uncertain": "Colegiala nerviosa e incierta",
-            "relaxed_break": "Colegiala relajada en descanso",
-            "energized_motivated": "Colegiala energizada y motivada",
-            "determined_challenge": "Colegiala determinada ante desafío",
-        }
+        return dict(CHIBI_TYPE_DESCRIPTIONS)
     
     @staticmethod
     def get_emotional_state_description(chibi_type: ChibiType) -> str:
@@ -154,21 +207,4 @@ class ChibiManager:
         Returns:
             str: Descripción del estado emocional
         """
-        descriptions = {
-            ChibiType.HAPPY_EXCITED: "¡Está muy emocionada! Sus ojos brillan con entusiasmo y tiene una sonrisa radiante.",
-            ChibiType.HAPPY_CALM: "Se ve tranquila y contenta, disfrutando del momento con una sonrisa suave.",
-            ChibiType.HAPPY_STUDYING: "Está estudiando con alegría, disfrutando del proceso de aprendizaje.",
-            ChibiType.FOCUSED_DETERMINED: "Concentrada en su objetivo, muestra determinación y enfoque.",
-            ChibiType.FOCUSED_STRESSED: "Está trabajando duro pero se nota algo de tensión en su expresión.",
-            ChibiType.TIRED_BUT_DETERMINED: "Aunque está cansada, mantiene su determinación y sigue adelante.",
-            ChibiType.TIRED_OVERWHELMED: "Se ve agotada y un poco abrumada, necesita un descanso.",
-            ChibiType.EXCITED_ACHIEVEMENT: "¡Está súper emocionada por su logro! Sus ojos brillan de felicidad.",
-            ChibiType.PROUD_ACCOMPLISHED: "Se ve orgullosa y satisfecha con lo que ha logrado.",
-            ChibiType.THOUGHTFUL_PLANNING: "Está pensando y planificando su siguiente paso con cuidado.",
-            ChibiType.CONFIDENT_READY: "Se ve segura de sí misma y lista para enfrentar cualquier desafío.",
-            ChibiType.NERVOUS_UNCERTAIN: "Se nota un poco nerviosa e insegura sobre lo que viene.",
-            ChibiType.RELAXED_BREAK: "Está relajada, tomándose un merecido descanso.",
-            ChibiType.ENERGIZED_MOTIVATED: "¡Está llena de energía y motivación! Lista para cualquier cosa.",
-            ChibiType.DETERMINED_CHALLENGE: "Se ve decidida a enfrentar el desafío que tiene por delante.",
-        }
-        return descriptions.get(chibi_type, "Estado emocional no definido") 
\ No newline at end of file
+        return EMOTIONAL_STATE_DESCRIPTIONS.get(chibi_type, "Estado emocional no definido") 
\ No newline at end of file
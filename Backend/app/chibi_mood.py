@@ -0,0 +1,92 @@
+"""
+Ánimo de la colegiala según la carga de trabajo del usuario
+Las señales (tareas vencidas, que vencen en 24h, completadas hoy y abiertas) salen de una
+única consulta agregada sobre el índice (project_id, status, due_date) de tasks, y se
+cachean por usuario hasta que cambian sus tareas o proyectos.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from .cache import UserScopedCache
+from .chibi_manager import ChibiManager
+from .datetime_utils import UTC
+from .events import subscribe
+from .models.project import Project
+from .models.task import Task
+
+COMPLETED_STATUS = "completada"
+
+# Aunque no haya escrituras, con el tiempo las tareas pasan a estar vencidas
+MOOD_CACHE_TTL = 60.0
+
+mood_cache = UserScopedCache(ttl=MOOD_CACHE_TTL)
+subscribe(mood_cache.invalidate)
+
+
+def _count(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def workload_signals(db: Session, user_id: int, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Cuenta las señales de carga de trabajo de un usuario en una sola consulta
+
+    Args:
+        db: Sesión de base de datos
+        user_id: Usuario
+        now: Instante de referencia (por defecto ahora, UTC)
+
+    Returns:
+        Dict[str, int]: overdue, due_soon, completed_today y open
+    """
+    # Las columnas DateTime se guardan sin zona, en UTC
+    now = (now or datetime.now(UTC)).astimezone(UTC).replace(tzinfo=None)
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    pending = Task.status != COMPLETED_STATUS
+
+    stmt = (
+        select(
+            _count(pending & (Task.due_date < now)).label("overdue"),
+            _count(pending & (Task.due_date >= now) & (Task.due_date < now + timedelta(hours=24))).label("due_soon"),
+            _count((Task.status == COMPLETED_STATUS) & (Task.updated_at >= start_of_day)).label("completed_today"),
+            _count(pending).label("open"),
+        )
+        .select_from(Task)
+        .join(Project, Task.project_id == Project.id)
+        .where(Project.user_id == user_id)
+    )
+    row = db.execute(stmt).one()
+    return {key: int(value) for key, value in row._mapping.items()}
+
+
+def compute_mood(db: Session, user_id: int, now: Optional[datetime] = None) -> Dict:
+    """
+    Chibi que corresponde a la carga de trabajo actual del usuario
+
+    Args:
+        db: Sesión de base de datos
+        user_id: Usuario
+        now: Instante de referencia (por defecto ahora, UTC)
+
+    Returns:
+        Dict: Estado emocional, descripción, archivo, URL y señales usadas
+    """
+    signals = workload_signals(db, user_id, now)
+    chibi_type = ChibiManager.get_mood_chibi(signals)
+    chibi_filename = f"{chibi_type.value}.png"
+    return {
+        "emotional_state": chibi_type.value,
+        "emotional_description": ChibiManager.get_emotional_state_description(chibi_type),
+        "chibi_filename": chibi_filename,
+        "chibi_url": ChibiManager.get_chibi_url(chibi_filename),
+        "signals": signals,
+    }
+
+
+def get_user_mood(db: Session, user_id: int) -> Dict:
+    """Ánimo del usuario desde la caché, recalculándolo si caducó o cambiaron sus datos"""
+    return mood_cache.get_or_set(user_id, lambda: compute_mood(db, user_id))
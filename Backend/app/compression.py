@@ -0,0 +1,202 @@
+"""
+Middleware de compresión de respuestas para los clientes móviles
+Negocia gzip, brotli o zstd según Accept-Encoding, respeta un tamaño mínimo y una lista
+de tipos de contenido comprimibles, y comprime fuera del event loop los cuerpos grandes.
+brotli y zstd solo se ofrecen si los paquetes ``brotli`` / ``zstandard`` están instalados.
+"""
+
+import gzip
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+# Por debajo de este tamaño la cabecera y el coste de CPU no compensan
+DEFAULT_MINIMUM_SIZE = 1024
+
+# A partir de este tamaño la compresión se hace en el threadpool para no bloquear el loop
+DEFAULT_OFFLOAD_THRESHOLD = 64 * 1024
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+# Estados sin cuerpo o que nunca deben recodificarse
+_SKIP_STATUS = {204, 206, 304}
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    # mtime=0 para que la salida sea determinista (ETags estables)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _compress_brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=4)
+
+
+def _compress_zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(body)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """
+    Obtiene los codificadores disponibles en orden de preferencia del servidor
+
+    Returns:
+        Dict[str, Callable[[bytes], bytes]]: Nombre de la codificación y función que comprime
+    """
+    encoders = {}
+    if zstandard is not None:
+        encoders["zstd"] = _compress_zstd
+    if brotli is not None:
+        encoders["br"] = _compress_brotli
+    encoders["gzip"] = _compress_gzip
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+    """
+    Elige la codificación a usar según la cabecera Accept-Encoding del cliente
+
+    Args:
+        accept_encoding: Valor de la cabecera (p. ej. "gzip, br;q=0.9")
+        supported: Codificaciones del servidor en orden de preferencia
+
+    Returns:
+        Optional[str]: Codificación elegida, o None si el cliente no acepta ninguna
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best: Optional[Tuple[float, int, str]] = None
+    for rank, encoding in enumerate(supported):
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q <= 0:
+            continue
+        # Mayor q gana; a igual q, manda el orden de preferencia del servidor
+        candidate = (q, -rank, encoding)
+        if best is None or candidate > best:
+            best = candidate
+    return best[2] if best else None
+
+
+class CompressionMiddleware:
+    """Comprime respuestas completas (no streaming) cuando el cliente lo acepta"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        content_types: Iterable[str] = COMPRESSIBLE_CONTENT_TYPES,
+        encoders: Optional[Dict[str, Callable[[bytes], bytes]]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_threshold = offload_threshold
+        self.content_types = tuple(content_types)
+        self.encoders = encoders if encoders is not None else available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encoders)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return any(content_type.startswith(allowed) for allowed in self.content_types)
+
+
+class _CompressionResponder:
+    """Intercepta los mensajes ASGI de una respuesta para decidir si se comprime"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.start_message is None:
+            await self.downstream(message)
+            return
+
+        start = self.start_message
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        compressible = start["status"] not in _SKIP_STATUS and self.middleware.is_compressible(headers)
+
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        if message.get("more_body", False) or not compressible or len(body) < self.middleware.minimum_size:
+            # Respuestas en streaming o pequeñas se envían tal cual
+            self.passthrough = True
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        encoder = self.middleware.encoders[self.encoding]
+        if len(body) >= self.middleware.offload_threshold:
+            compressed = await run_in_threadpool(encoder, body)
+        else:
+            compressed = encoder(body)
+
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        if "etag" in headers and not headers["etag"].startswith("W/"):
+            # La representación comprimida no es idéntica byte a byte
+            headers["ETag"] = f"W/{headers['etag']}"
+
+        self.passthrough = True
+        await self.downstream(start)
+        await self.downstream({"type": "http.response.body", "body": compressed, "more_body": False})
@@ -0,0 +1,71 @@
+"""
+Normalización de fechas compartida por los modelos
+Convierte strings ISO 8601 y datetimes a datetimes en UTC usando solo la librería
+estándar. Las fechas sin zona se asumen en UTC y las que traen otra zona se pasan a UTC:
+las columnas DateTime guardan la hora sin zona, así que lo guardado es siempre UTC.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Union
+
+UTC = timezone.utc
+
+DateTimeInput = Union[datetime, str, None]
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    # Las importaciones y formularios repiten mucho las mismas fechas: se cachea el parseo
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Formato de fecha inválido: {value}") from None
+    return _to_utc(parsed)
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value if value.tzinfo is UTC else value.astimezone(UTC)
+
+
+def normalize_datetime(value: DateTimeInput) -> Optional[datetime]:
+    """
+    Normaliza una fecha a datetime en UTC
+
+    Args:
+        value: datetime (con o sin zona), string ISO 8601 o None
+
+    Returns:
+        Optional[datetime]: Fecha en UTC; las fechas sin zona se asumen en UTC
+
+    Raises:
+        ValueError: Si el string no es ISO 8601 o el tipo no es soportado
+    """
+    if value is None:
+        return None
+    # Camino rápido: datetime que ya está en UTC, sin asignaciones
+    if value.__class__ is datetime:
+        return value if value.tzinfo is UTC else _to_utc(value)
+    if isinstance(value, str):
+        if not value:
+            raise ValueError("Formato de fecha inválido: cadena vacía")
+        return _parse_iso(value)
+    if isinstance(value, datetime):
+        return _to_utc(value)
+    raise ValueError("La fecha debe ser string o datetime")
+
+
+def utc_today() -> date:
+    """Fecha actual en UTC"""
+    return datetime.now(UTC).date()
+
+
+def seconds_until_utc_midnight(now: Optional[datetime] = None) -> int:
+    """Segundos que faltan para la próxima medianoche UTC (mínimo 1)"""
+    now = (now or datetime.now(UTC)).astimezone(UTC)
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=UTC)
+    return max(1, int((midnight - now).total_seconds()))
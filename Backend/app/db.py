@@ -16,15 +16,40 @@ else:
     DATABASE_URL = f"sqlite:///{parent_dir}/lifeplanner.db"
     print(f"📁 Usando base de datos local en: {DATABASE_URL}")
 
+def engine_options(url: str) -> dict:
+    """
+    Opciones del motor según el dialecto
+
+    Con varios workers cada proceso tiene su propio pool: DB_POOL_SIZE y DB_MAX_OVERFLOW
+    son por worker (app.serve los reparte a partir de DB_MAX_CONNECTIONS).
+    """
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": True,
+    }
+
 # Crear el motor de la base de datos
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 # Crear la sesión
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Réplica de solo lectura opcional (ver app.read_routing); sin ella las lecturas van al primario
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+if DATABASE_READ_URL and DATABASE_READ_URL.startswith("postgres://"):
+    DATABASE_READ_URL = DATABASE_READ_URL.replace("postgres://", "postgresql://", 1)
+
+if DATABASE_READ_URL and DATABASE_READ_URL != DATABASE_URL:
+    read_engine = create_engine(DATABASE_READ_URL, **engine_options(DATABASE_READ_URL))
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={"replica": read_engine is not engine})
+
 # Crear la base declarativa usando la nueva API
 class Base(DeclarativeBase):
     pass
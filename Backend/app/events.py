@@ -0,0 +1,45 @@
+"""
+Avisos de cambios en los datos de un usuario
+Las rutas publican un aviso después de confirmar (commit) una escritura; las cachés por
+usuario se suscriben para invalidarse y app.change_stream los reenvía a los dispositivos
+conectados a /lifeplanner/stream. Es un bus en proceso y síncrono: cada suscriptor
+debe ser rápido y no lanzar excepciones (si lo hace, se registra y se sigue).
+"""
+
+import logging
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+# listener(user_id, entity, action): entity = "task" | "project", action = "create" | "update" | "delete" | "import"
+ChangeListener = Callable[[int, str, str], None]
+
+_listeners: List[ChangeListener] = []
+
+
+def subscribe(listener: ChangeListener) -> ChangeListener:
+    """Registra un suscriptor (se puede usar como decorador)"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def unsubscribe(listener: ChangeListener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def publish_change(user_id: int, entity: str, action: str):
+    """
+    Notifica a los suscriptores que cambiaron los datos de un usuario
+
+    Args:
+        user_id: Usuario afectado
+        entity: Tipo de dato ("task", "project")
+        action: Operación ("create", "update", "delete", "import")
+    """
+    for listener in list(_listeners):
+        try:
+            listener(user_id, entity, action)
+        except Exception as e:
+            logger.error(f"❌ Error en suscriptor de cambios {listener!r}: {str(e)}")
@@ -0,0 +1,78 @@
+"""
+Utilidades de caché HTTP para respuestas precalculadas
+Serializa una sola vez el cuerpo, calcula su ETag y responde 304 cuando el cliente
+ya tiene esa versión (If-None-Match).
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Catálogos estáticos por despliegue: el cliente revalida con ETag pasado un día
+CATALOG_CACHE_CONTROL = "public, max-age=86400"
+
+NO_STORE_CACHE_CONTROL = "no-store"
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    """Cuerpo ya serializado junto con su ETag"""
+
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+
+    @classmethod
+    def from_json(cls, data: Any) -> "CachedPayload":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls.from_bytes(body)
+
+    @classmethod
+    def from_bytes(cls, body: bytes, media_type: str = "application/json") -> "CachedPayload":
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:16]}"', media_type=media_type)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match contra un ETag (RFC 9110)
+
+    Args:
+        if_none_match: Valor de la cabecera If-None-Match
+        etag: ETag actual del recurso
+
+    Returns:
+        bool: True si el cliente ya tiene esta versión
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def cached_response(request: Request, payload: CachedPayload, cache_control: str = CATALOG_CACHE_CONTROL) -> Response:
+    """
+    Respuesta con ETag y Cache-Control, o 304 si el cliente ya tiene el contenido
+
+    Args:
+        request: Petición actual
+        payload: Cuerpo precalculado
+        cache_control: Valor de la cabecera Cache-Control
+
+    Returns:
+        Response: 200 con el cuerpo o 304 sin cuerpo
+    """
+    headers = {"ETag": payload.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type=payload.media_type, headers=headers)
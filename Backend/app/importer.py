@@ -0,0 +1,265 @@
+"""
+Importación masiva de proyectos y tareas (NDJSON o CSV)
+Valida por lotes con ProjectCreate/TaskCreate, inserta con executemany y confirma
+cada lote en su propia transacción, devolviendo los errores por línea. Si la base de
+datos rechaza un lote, ese lote se revierte y la importación se detiene con
+ImportAborted, que informa de lo ya confirmado en los lotes anteriores.
+
+Formato de cada fila:
+    {"type": "project", "ref": "p1", "title": "...", "status": "activo", ...}
+    {"type": "task", "project_ref": "p1", "title": "...", "status": "pendiente", "priority": "media"}
+    {"type": "task", "project_id": 12, ...}   # proyecto ya existente del usuario
+"""
+
+import csv
+import io
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.project_schema import ProjectCreate
+from app.schemas.task_schema import TaskCreate
+
+# Filas por transacción
+IMPORT_BATCH_SIZE = 2000
+
+# Límite de errores devueltos en la respuesta
+MAX_REPORTED_ERRORS = 1000
+
+_projects_adapter = TypeAdapter(List[ProjectCreate])
+_tasks_adapter = TypeAdapter(List[TaskCreate])
+
+Row = Tuple[int, dict]
+
+
+def parse_ndjson(content: bytes) -> Iterator[Row]:
+    """Devuelve (línea, fila) por cada línea no vacía; las líneas ilegibles llevan ``_error``"""
+    for line_number, line in enumerate(content.decode("utf-8-sig").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, {"_error": f"JSON inválido: {e.msg}"}
+            continue
+        if not isinstance(record, dict):
+            yield line_number, {"_error": "Cada línea debe ser un objeto JSON"}
+            continue
+        yield line_number, record
+
+
+def parse_csv(content: bytes) -> Iterator[Row]:
+    """Devuelve (línea, fila) por cada registro CSV; las celdas vacías se tratan como nulas"""
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    for record in reader:
+        yield reader.line_num, {key: value for key, value in record.items() if key and value not in ("", None)}
+
+
+def _format_errors(error: ValidationError) -> Dict[int, List[str]]:
+    """Agrupa los errores de validación de una lista por índice de fila"""
+    grouped: Dict[int, List[str]] = {}
+    for item in error.errors():
+        index = item["loc"][0]
+        field = ".".join(str(part) for part in item["loc"][1:]) or "fila"
+        grouped.setdefault(index, []).append(f"{field}: {item['msg']}")
+    return grouped
+
+
+def validate_batch(adapter: TypeAdapter, rows: List[Row]) -> Tuple[List[Tuple[Row, object]], List[Tuple[int, List[str]]]]:
+    """
+    Valida un lote completo de una vez y separa las filas válidas de las inválidas
+
+    Args:
+        adapter: TypeAdapter de una lista del esquema
+        rows: Filas (línea, datos) a validar
+
+    Returns:
+        Tuple: (filas válidas con su modelo, errores por línea)
+    """
+    if not rows:
+        return [], []
+    try:
+        models = adapter.validate_python([data for _, data in rows])
+        return list(zip(rows, models)), []
+    except ValidationError as e:
+        bad = _format_errors(e)
+
+    errors = [(rows[index][0], messages) for index, messages in sorted(bad.items())]
+    remaining = [row for index, row in enumerate(rows) if index not in bad]
+    if not remaining:
+        return [], errors
+    # El resto del lote ya es válido: segunda pasada sin las filas con error
+    models = adapter.validate_python([data for _, data in remaining])
+    return list(zip(remaining, models)), errors
+
+
+class ImportAborted(Exception):
+    """La base de datos rechazó un lote; los lotes anteriores ya están confirmados"""
+
+    def __init__(self, result: dict, first_line: int, last_line: int, reason: str):
+        super().__init__(reason)
+        self.result = result
+        self.first_line = first_line
+        self.last_line = last_line
+        self.reason = reason
+
+    def to_dict(self) -> dict:
+        return {
+            "message": "La importación se detuvo: un lote fue rechazado por la base de datos",
+            "failed_lines": [self.first_line, self.last_line],
+            "reason": self.reason,
+            **self.result,
+        }
+
+
+class ImportResult:
+    """Acumula contadores y errores de una importación"""
+
+    def __init__(self):
+        self.rows = 0
+        self.projects_created = 0
+        self.tasks_created = 0
+        self.error_count = 0
+        self.errors: List[dict] = []
+        self.started = time.perf_counter()
+
+    def add_error(self, line: int, messages: List[str]):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": messages})
+
+    def to_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            "projects_created": self.projects_created,
+            "tasks_created": self.tasks_created,
+            "error_count": self.error_count,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.error_count > len(self.errors),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows_per_second": round(self.rows / elapsed) if elapsed > 0 else None,
+        }
+
+
+def _batches(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_records(db: Session, user_id: int, rows: Iterable[Row], batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Importa filas de proyectos y tareas para un usuario
+
+    Args:
+        db: Sesión de base de datos
+        user_id: Usuario dueño de los datos importados
+        rows: Filas (línea, datos) de parse_ndjson/parse_csv
+        batch_size: Filas por transacción
+
+    Returns:
+        dict: Resumen con contadores, errores por línea y rendimiento
+
+    Raises:
+        ImportAborted: Si la base de datos rechaza un lote (se revierte solo ese lote)
+    """
+    result = ImportResult()
+    refs: Dict[str, int] = {}
+    owned_projects = set(db.execute(select(Project.id).where(Project.user_id == user_id)).scalars())
+
+    for batch in _batches(rows, batch_size):
+        result.rows += len(batch)
+        project_rows: List[Row] = []
+        task_rows: List[Row] = []
+        for line, data in batch:
+            kind = data.get("type")
+            if "_error" in data:
+                result.add_error(line, [data["_error"]])
+            elif kind == "project":
+                project_rows.append((line, data))
+            elif kind == "task":
+                task_rows.append((line, data))
+            else:
+                result.add_error(line, ["type: debe ser 'project' o 'task'"])
+
+        try:
+            projects_created, tasks_created = _write_batch(db, user_id, project_rows, task_rows, refs,
+                                                           owned_projects, result)
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ImportAborted(result.to_dict(), batch[0][0], batch[-1][0], type(e).__name__) from e
+        result.projects_created += projects_created
+        result.tasks_created += tasks_created
+
+    return result.to_dict()
+
+
+def _write_batch(db: Session, user_id: int, project_rows: List[Row], task_rows: List[Row],
+                 refs: Dict[str, int], owned_projects: set, result: ImportResult) -> Tuple[int, int]:
+    """Valida e inserta un lote y lo confirma; devuelve (proyectos, tareas) creados"""
+    # Las referencias nuevas solo se conservan si el lote llega a confirmarse
+    batch_refs = dict(refs)
+    batch_projects = set(owned_projects)
+    projects_created = tasks_created = 0
+
+    # Proyectos primero para que las tareas del mismo lote puedan referenciarlos
+    valid_projects, errors = validate_batch(_projects_adapter, project_rows)
+    for line, messages in errors:
+        result.add_error(line, messages)
+    if valid_projects:
+        values = [{**model.model_dump(), "user_id": user_id} for _, model in valid_projects]
+        stmt = insert(Project).returning(Project.id, sort_by_parameter_order=True)
+        new_ids = db.execute(stmt, values).scalars().all()
+        for ((_, data), _), project_id in zip(valid_projects, new_ids):
+            batch_projects.add(project_id)
+            if data.get("ref") is not None:
+                batch_refs[str(data["ref"])] = project_id
+        projects_created = len(new_ids)
+
+    resolved: List[Tuple[Row, int]] = []
+    for line, data in task_rows:
+        project_id = _resolve_project(data, batch_refs, batch_projects)
+        if project_id is None:
+            result.add_error(line, ["project: proyecto no encontrado (usa project_ref o project_id)"])
+        else:
+            resolved.append(((line, data), project_id))
+
+    valid_tasks, errors = validate_batch(_tasks_adapter, [row for row, _ in resolved])
+    for line, messages in errors:
+        result.add_error(line, messages)
+    if valid_tasks:
+        project_by_line = {row[0]: project_id for row, project_id in resolved}
+        values = [
+            {**model.model_dump(), "project_id": project_by_line[line]}
+            for (line, _), model in valid_tasks
+        ]
+        db.execute(insert(Task), values)
+        tasks_created = len(values)
+
+    db.commit()
+    refs.update(batch_refs)
+    owned_projects.update(batch_projects)
+    return projects_created, tasks_created
+
+
+def _resolve_project(data: dict, refs: Dict[str, int], owned_projects: set) -> Optional[int]:
+    if data.get("project_ref") is not None:
+        return refs.get(str(data["project_ref"]))
+    try:
+        project_id = int(data.get("project_id"))
+    except (TypeError, ValueError):
+        return None
+    return project_id if project_id in owned_projects else None
@@ -4,15 +4,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
+import os
 import sys
 from pathlib import Path
 import logging
 
-from app.db import Base, engine, SessionLocal
-from app.routes import project_route, task_route, chibi_route, user_route
+from app.db import Base, engine, read_engine, SessionLocal
+from app.compression import CompressionMiddleware
+from app.read_routing import ReadYourWritesMiddleware, warn_if_not_shared
+from app.sqlite_replica import SQLiteReplicator, sqlite_path
+from app.write_buffer import status_buffer
+from app.reminders import REMINDERS_ENABLED, reminder_scheduler
+from app.archive import archive_mover
+from app.chibi_assets import ChibiStaticFiles, manifest as chibi_manifest
+from app import chibi_catalog, change_stream
+from app.routes import project_route, task_route, chibi_route, user_route, data_route, stream_route, archive_route
 
 # 🚨 IMPORTAR MODELOS para que Base los registre antes de create_all()
-from app.models import project, task, user
+from app.models import project, task, user, scheduler_state, archive
 
 # Configurar logging
 logging.basicConfig(level=logging.DEBUG)  # En producción usa INFO o WARNING
@@ -48,8 +57,19 @@ def run_migration(module_name: str, function_name: str, success_message: str):
         logger.error(f"❌ Error durante la migración {module_name}: {str(e)}")
         return False
 
+def start_sqlite_replica():
+    """Réplica local (dos archivos SQLite) si SQLITE_REPLICA_INTERVAL está definido"""
+    interval = os.getenv("SQLITE_REPLICA_INTERVAL")
+    primary, replica = sqlite_path(engine), sqlite_path(read_engine)
+    if not interval or read_engine is engine or not primary or not replica:
+        return None
+    replicator = SQLiteReplicator(primary, replica, float(interval)).start()
+    logger.info(f"✅ Réplica SQLite local activa ({replica}, cada {interval} s)")
+    return replicator
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    replicator = None
     try:
         # ✅ Crear tablas si no existen
         Base.metadata.create_all(bind=engine)
@@ -57,6 +77,14 @@ async def lifespan(app: FastAPI):
             db.execute(text("SELECT 1"))
         logger.info("✅ Base de datos conectada correctamente")
         
+        # Manifiesto de chibis con huella de contenido (una vez por arranque)
+        chibi_files = chibi_manifest.build()
+        logger.info(f"✅ Manifiesto de chibis generado ({len(chibi_files)} archivos)")
+        
+        # Catálogos estáticos de chibis serializados una sola vez (dependen de las URLs con huella)
+        catalogs = chibi_catalog.warm()
+        logger.info(f"✅ Catálogo de chibis precalculado ({catalogs} respuestas)")
+        
         # Asegurar que sys.path incluye raíz del proyecto
         root_path = str(Path(__file__).resolve().parent.parent)
         if root_path not in sys.path:
@@ -66,6 +94,25 @@ async def lifespan(app: FastAPI):
         run_migration("truncate_titles", "truncate_titles", 
                       "✅ Migración de truncado de títulos ejecutada correctamente")
         
+        replicator = start_sqlite_replica()
+        warn_if_not_shared()
+        
+        # Reparto de cambios entre workers: el hilo de Redis se arranca en cada proceso
+        change_stream.broker.start()
+        
+        # Buffer de cambios de estado (solo si STATUS_COALESCE_SECONDS > 0)
+        if status_buffer.start().enabled:
+            logger.info(f"✅ Buffer de cambios de estado activo ({status_buffer.window} s)")
+        
+        # Recordatorios de fechas límite (se despierta solo para el siguiente)
+        if REMINDERS_ENABLED:
+            reminder_scheduler.start()
+            logger.info("✅ Planificador de recordatorios activo")
+        
+        # Archivado de trabajo terminado (solo si ARCHIVE_AFTER_DAYS > 0)
+        if archive_mover.start().enabled:
+            logger.info(f"✅ Archivado activo (terminado hace más de {archive_mover.after_days:g} días)")
+        
     except SQLAlchemyError as e:
         logger.error(f"❌ Error al conectar con la base de datos: {str(e)}")
         raise
@@ -75,6 +122,14 @@ async def lifespan(app: FastAPI):
     
     yield  # Aquí la aplicación está en ejecución
     
+    reminder_scheduler.stop()
+    archive_mover.stop()
+    # Volcar los cambios de estado pendientes antes de cerrar
+    flushed = status_buffer.stop()
+    if flushed:
+        logger.info(f"💾 {flushed} cambios de estado pendientes guardados al apagar")
+    if replicator is not None:
+        replicator.stop()
     logger.info("🔴 Apagando la aplicación...")
 
 app = FastAPI(
@@ -95,9 +150,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión de respuestas (gzip, y brotli/zstd si están instalados)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    offload_threshold=int(os.getenv("COMPRESSION_OFFLOAD_SIZE", str(64 * 1024))),
+)
+
+# Tras una escritura, el mismo dispositivo lee del primario durante READ_STICKY_SECONDS
+app.add_middleware(ReadYourWritesMiddleware)
+
 # Montar archivos estáticos (solo si existe el directorio)
 static_dir = Path(__file__).parent.parent / "static"
 if static_dir.exists():
+    # Los chibis van primero: sus URLs con huella se sirven con caché inmutable
+    if (static_dir / "chibis").exists():
+        app.mount("/static/chibis", ChibiStaticFiles(directory=str(static_dir / "chibis")), name="chibis")
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 # Inclusión de routers
@@ -125,6 +193,24 @@ app.include_router(
     tags=["users"]
 )
 
+app.include_router(
+    data_route.router,
+    prefix="/lifeplanner",
+    tags=["data"]
+)
+
+app.include_router(
+    stream_route.router,
+    prefix="/lifeplanner",
+    tags=["stream"]
+)
+
+app.include_router(
+    archive_route.router,
+    prefix="/lifeplanner",
+    tags=["archive"]
+)
+
 # Ruta de salud
 @app.get("/lifeplanner/health")
 async def health_check():
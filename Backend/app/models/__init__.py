@@ -1,6 +1,8 @@
 from .project import Project
 from .task import Task
 from .user import User
+from .scheduler_state import SchedulerState, SentReminder
+from .archive import ArchivedProject, ArchivedTask
 from ..db import Base
 
-__all__ = ['Project', 'Task', 'User', 'Base'] 
\ No newline at end of file
+__all__ = ['Project', 'Task', 'User', 'SchedulerState', 'SentReminder', 'ArchivedProject', 'ArchivedTask', 'Base'] 
\ No newline at end of file
@@ -0,0 +1,88 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from ..db import Base
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+class ArchivedProject(Base):
+    """Proyecto terminado retirado de la tabla projects (conserva su id original en original_id)"""
+    __tablename__ = "archived_projects"
+    __table_args__ = (
+        # Archivo de un usuario, del más reciente al más antiguo
+        Index("ix_archived_projects_user_id", "user_id", "id"),
+        Index("ix_archived_projects_original_id", "original_id"),
+        # Ids de archivo siempre crecientes (cursor de GET /archive)
+        {'extend_existing': True, 'sqlite_autoincrement': True},
+    )
+
+    # Id propio del archivo: SQLite puede reutilizar el id de una fila borrada de projects
+    id = Column(Integer, primary_key=True)
+    original_id = Column(Integer, nullable=False)
+    title = Column(String(100), nullable=False)
+    description = Column(String(500))
+    status = Column(String(20), nullable=False)
+    priority = Column(String(20))
+    category = Column(String(100))
+    deadline = Column(DateTime)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    user_id = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.original_id,
+            "archive_id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "category": self.category,
+            "deadline": _isoformat(self.deadline),
+            "created_at": _isoformat(self.created_at),
+            "updated_at": _isoformat(self.updated_at),
+            "archived_at": _isoformat(self.archived_at),
+        }
+
+
+class ArchivedTask(Base):
+    """Tarea completada retirada de la tabla tasks (conserva su id en original_id y el de su proyecto)"""
+    __tablename__ = "archived_tasks"
+    __table_args__ = (
+        Index("ix_archived_tasks_user_id", "user_id", "id"),
+        Index("ix_archived_tasks_original_id", "original_id"),
+        # Tareas archivadas de un proyecto (activo o archivado)
+        Index("ix_archived_tasks_project_id", "project_id"),
+        {'extend_existing': True, 'sqlite_autoincrement': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    original_id = Column(Integer, nullable=False)
+    title = Column(String(100), nullable=False)
+    description = Column(String(500))
+    status = Column(String(20), nullable=False)
+    priority = Column(String(20), nullable=False)
+    due_date = Column(DateTime)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    # Sin clave foránea: el proyecto puede seguir en projects o estar en archived_projects
+    project_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.original_id,
+            "archive_id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "due_date": _isoformat(self.due_date),
+            "created_at": _isoformat(self.created_at),
+            "updated_at": _isoformat(self.updated_at),
+            "project_id": self.project_id,
+            "archived_at": _isoformat(self.archived_at),
+        }
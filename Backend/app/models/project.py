@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship, validates
 from datetime import datetime, timezone
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Literal
 from ..db import Base
 from ..chibi_manager import ChibiManager
-import pytz
+from ..datetime_utils import normalize_datetime, utc_today
+
+# Predicados de los índices parciales de fechas límite (no terminados) y de archivado (terminados)
+OPEN_PROJECT_CONDITION = "status <> 'terminado'"
+FINISHED_PROJECT_CONDITION = "status = 'terminado'"
 
 class ProjectBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -17,36 +21,15 @@ class ProjectBase(BaseModel):
 
     @field_validator('deadline')
     def validate_deadline(cls, v):
-        if v is not None:
-            try:
-                if isinstance(v, str):
-                    # Asegurar que la fecha tenga zona horaria
-                    if not any(x in v for x in ['+', '-', 'Z']):
-                        v = v + 'Z'
-                    elif v.endswith('Z'):
-                        v = v[:-1] + '+00:00'
-                    
-                    deadline_date = datetime.fromisoformat(v.replace('Z', '+00:00'))
-                    
-                    # Asegurar que ambas fechas estén en UTC para comparación
-                    current = datetime.now(pytz.UTC)
-                    if deadline_date.tzinfo is None:
-                        deadline_date = pytz.UTC.localize(deadline_date)
-                    
-                    # Comparar solo las fechas, ignorando la hora
-                    deadline_date_only = deadline_date.date()
-                    current_date_only = current.date()
-                    
-                    if deadline_date_only < current_date_only:
-                        raise ValueError("La fecha límite no puede estar en el pasado")
-                    
-                    return deadline_date
-                return v
-            except ValueError as e:
-                if "fromisoformat" in str(e):
-                    raise ValueError("Formato de fecha inválido")
-                raise e
-        return v
+        if v is None:
+            return v
+        deadline_date = normalize_datetime(v)
+
+        # Comparar solo las fechas, ignorando la hora
+        if deadline_date.date() < utc_today():
+            raise ValueError("La fecha límite no puede estar en el pasado")
+
+        return deadline_date
 
     @field_validator('title')
     def validate_title_length(cls, v):
@@ -64,6 +47,23 @@ class ProjectBase(BaseModel):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Proyectos de un usuario (punto de partida de los listados y de la agenda)
+        Index("ix_projects_user_id", "user_id"),
+        # Recordatorios: fechas límite de proyectos que no están terminados
+        Index(
+            "ix_projects_open_deadline", "deadline",
+            sqlite_where=text(OPEN_PROJECT_CONDITION),
+            postgresql_where=text(OPEN_PROJECT_CONDITION),
+        ),
+        # Archivado: terminados por antigüedad
+        Index(
+            "ix_projects_finished_updated", "updated_at",
+            sqlite_where=text(FINISHED_PROJECT_CONDITION),
+            postgresql_where=text(FINISHED_PROJECT_CONDITION),
+        ),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
@@ -109,38 +109,12 @@ class Project(Base):
 
     @validates('deadline')
     def validate_deadline(self, key, deadline):
-        if deadline is not None:
-            try:
-                if isinstance(deadline, str):
-                    # Asegurar que la fecha tenga zona horaria
-                    if not any(x in deadline for x in ['+', '-', 'Z']):
-                        deadline = deadline + 'Z'
-                    elif deadline.endswith('Z'):
-                        deadline = deadline[:-1] + '+00:00'
-                    
-                    deadline_date = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-                    
-                    # Asegurar que ambas fechas estén en UTC para comparación
-                    current = datetime.now(pytz.UTC)
-                    if deadline_date.tzinfo is None:
-                        deadline_date = pytz.UTC.localize(deadline_date)
-                    
-                    # Comparar solo las fechas, ignorando la hora
-                    deadline_date_only = deadline_date.date()
-                    current_date_only = current.date()
-                    
-                    # Permitir fechas en el pasado para proyectos existentes
-                    # if deadline_date_only < current_date_only:
-                    #     raise ValueError("La fecha límite no puede estar en el pasado")
-                    
-                    return deadline_date
-                return deadline
-            except ValueError as e:
-                if "fromisoformat" in str(e):
-                    # En lugar de fallar, retornar None para fechas inválidas
-                    return None
-                raise e
-        return deadline
+        # Se permiten fechas en el pasado para proyectos existentes
+        try:
+            return normalize_datetime(deadline)
+        except ValueError:
+            # En lugar de fallar, retornar None para fechas inválidas
+            return None
 
     def get_chibi(self) -> str:
         """
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Index, func
+from ..db import Base
+
+class SchedulerState(Base):
+    """Progreso persistido de los procesos de fondo (p. ej. recordatorios ya emitidos)"""
+    __tablename__ = "scheduler_state"
+    __table_args__ = {'extend_existing': True}
+
+    name = Column(String(50), primary_key=True)
+    # Todo lo programado hasta este instante (UTC, sin zona) ya se procesó
+    watermark = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class SentReminder(Base):
+    """Recordatorio reclamado por un worker antes de emitirlo (uno por aviso y fecha límite)"""
+    __tablename__ = "sent_reminders"
+    __table_args__ = (
+        # Un segundo worker que intente reclamar el mismo aviso choca con la restricción
+        UniqueConstraint("entity", "entity_id", "kind", "due_at", name="uq_sent_reminders_key"),
+        # Purga de los reclamos antiguos
+        Index("ix_sent_reminders_due_at", "due_at"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    kind = Column(String(20), nullable=False)
+    # Fecha límite a la que corresponde el aviso: si cambia, hay aviso nuevo
+    due_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=func.now())
@@ -1,12 +1,47 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import relationship, validates
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import Iterable, List, Optional
 from ..db import Base
 from ..chibi_manager import ChibiManager
+from ..datetime_utils import normalize_datetime
+
+
+# Predicados de las tareas abiertas y completadas: los índices parciales y las consultas que
+# los usan deben escribirlos igual (SQLite solo usa un índice parcial si la consulta repite su condición)
+OPEN_TASK_CONDITION = "status <> 'completada'"
+COMPLETED_TASK_CONDITION = "status = 'completada'"
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
 
 class Task(Base):
     __tablename__ = "tasks"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Filtros por proyecto + estado ordenados por fecha límite (listados y ánimo del chibi)
+        Index("ix_tasks_project_status_due", "project_id", "status", "due_date"),
+        # Agenda (vencidas, hoy, semana): solo tareas abiertas, así el historial de completadas
+        # no crece el índice ni el rango recorrido
+        Index(
+            "ix_tasks_open_project_due", "project_id", "due_date",
+            sqlite_where=text(OPEN_TASK_CONDITION),
+            postgresql_where=text(OPEN_TASK_CONDITION),
+        ),
+        # Recordatorios: próximas fechas límite de todos los usuarios, sin el historial completado
+        Index(
+            "ix_tasks_open_due", "due_date",
+            sqlite_where=text(OPEN_TASK_CONDITION),
+            postgresql_where=text(OPEN_TASK_CONDITION),
+        ),
+        # Archivado: completadas por antigüedad (se vacía a medida que se archivan)
+        Index(
+            "ix_tasks_completed_updated", "updated_at",
+            sqlite_where=text(COMPLETED_TASK_CONDITION),
+            postgresql_where=text(COMPLETED_TASK_CONDITION),
+        ),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
@@ -20,6 +55,72 @@ class Task(Base):
 
     project = relationship("Project", back_populates="tasks")
 
+    # Serializadores por campo para respuestas proyectadas (parámetro ``fields``)
+    FIELD_SERIALIZERS = {
+        "id": lambda task: task.id,
+        "title": lambda task: task.title,
+        "description": lambda task: task.description,
+        "status": lambda task: task.status,
+        "priority": lambda task: task.priority,
+        "due_date": lambda task: _isoformat(task.due_date),
+        "created_at": lambda task: _isoformat(task.created_at),
+        "updated_at": lambda task: _isoformat(task.updated_at),
+        "project_id": lambda task: task.project_id,
+        "chibi": lambda task: task.get_chibi(),
+        "chibi_url": lambda task: task.get_chibi_url(),
+    }
+
+    # Columnas que necesita cargar cada campo (los chibis dependen de estado y prioridad)
+    FIELD_COLUMNS = {
+        "chibi": ("status", "priority"),
+        "chibi_url": ("status", "priority"),
+    }
+
+    @classmethod
+    def parse_fields(cls, fields: Optional[str]) -> Optional[List[str]]:
+        """
+        Convierte el parámetro ``fields`` ("id,title,status") en una lista de campos válidos
+        
+        Args:
+            fields: Campos separados por coma, o None para devolver todos
+            
+        Returns:
+            Optional[List[str]]: Campos solicitados sin duplicados, o None si no se pidió proyección
+            
+        Raises:
+            ValueError: Si algún campo no existe
+        """
+        if not fields:
+            return None
+
+        selected = []
+        for field in fields.split(","):
+            field = field.strip()
+            if not field or field in selected:
+                continue
+            if field not in cls.FIELD_SERIALIZERS:
+                raise ValueError(f"Campo inválido: {field}. Debe ser uno de: {list(cls.FIELD_SERIALIZERS)}")
+            selected.append(field)
+        return selected or None
+
+    @classmethod
+    def projected_columns(cls, fields: Iterable[str]) -> list:
+        """
+        Obtiene las columnas mínimas que hay que cargar para serializar los campos pedidos
+        
+        Args:
+            fields: Campos solicitados (ya validados con ``parse_fields``)
+            
+        Returns:
+            list: Atributos de columna para usar con ``load_only``
+        """
+        columns = []
+        for field in fields:
+            for column in cls.FIELD_COLUMNS.get(field, (field,)):
+                if column not in columns:
+                    columns.append(column)
+        return [getattr(cls, column) for column in columns]
+
     def get_chibi(self) -> str:
         """
         Obtiene el chibi correspondiente al estado y prioridad de la tarea
@@ -42,7 +143,11 @@ class Task(Base):
         chibi_filename = self.get_chibi()
         return ChibiManager.get_chibi_url(chibi_filename, base_url)
 
-    def to_dict(self):
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        if fields is not None:
+            # Serializar solo lo pedido para no tocar columnas diferidas
+            return {field: self.FIELD_SERIALIZERS[field](self) for field in fields}
+
         return {
             "id": self.id,
             "title": self.title,
@@ -83,22 +188,7 @@ class Task(Base):
 
     @validates('due_date')
     def validate_due_date(self, key, due_date):
-        if due_date is None:
-            return None
-            
-        if isinstance(due_date, str):
-            try:
-                due_date = datetime.fromisoformat(due_date)
-            except Exception as e:
-                raise ValueError(f"Formato de fecha inválido en modelo: {e}")
-        elif not isinstance(due_date, datetime):
-            raise ValueError("due_date debe ser string o datetime")
-
-        if due_date.tzinfo is None:
-            due_date = due_date.replace(tzinfo=timezone.utc)
-
-        # Solo validar fechas pasadas para tareas nuevas, no para actualizaciones
-        # if due_date.date() < datetime.now(timezone.utc).date():
-        #     raise ValueError("La fecha límite no puede estar en el pasado (día anterior)")
-        
-        return due_date
+        try:
+            return normalize_datetime(due_date)
+        except ValueError as e:
+            raise ValueError(f"Formato de fecha inválido en modelo: {e}")
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from ..db import Base
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Filtro por rango de alta en el listado de administración
+        Index("ix_users_created_at", "created_at"),
+        # LIKE 'prefijo%' en PostgreSQL solo usa un btree con text_pattern_ops (salvo collation C)
+        Index(
+            "ix_users_username_pattern", "username", postgresql_ops={"username": "text_pattern_ops"}
+        ).ddl_if(dialect="postgresql"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False, index=True)
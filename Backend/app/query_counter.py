@@ -0,0 +1,46 @@
+"""
+Contador de sentencias SQL
+Escucha before_cursor_execute en un motor y guarda las sentencias ejecutadas mientras está
+activo. Lo usan los benchmarks (consultas por petición) y las pruebas.
+"""
+
+import threading
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """
+    Cuenta las sentencias que ejecuta un motor dentro de un bloque with
+
+    Ejemplo:
+        with QueryCounter(engine) as counter:
+            client.get("/lifeplanner/projects/")
+        print(counter.count)
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
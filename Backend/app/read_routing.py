@@ -0,0 +1,159 @@
+"""
+Enrutado de lecturas a la réplica
+Los endpoints de solo lectura piden la sesión con ``get_read_db``: va a la réplica
+(DATABASE_READ_URL) salvo que el dispositivo haya escrito hace menos de READ_STICKY_SECONDS,
+en cuyo caso va al primario para que vea sus propios cambios (read-your-writes) aunque la
+réplica vaya con retraso.
+
+ReadYourWritesMiddleware marca el dispositivo (cabecera X-Device-ID) tras cada escritura
+con éxito. Las rutas de /users, que no llevan X-Device-ID, marcan además el usuario
+modificado (mark_user) y sus lecturas usan ``get_user_read_db``.
+
+La marca se guarda en un almacén con interfaz Redis (el mismo que la caché de usuarios).
+Con varios workers hace falta USER_CACHE_BACKEND=redis para que la vean todos: con el
+almacén en proceso una lectura atendida por otro worker va a la réplica. Al arrancar se
+avisa en el log si hay réplica y el almacén no es compartido.
+"""
+
+import logging
+import math
+import os
+from typing import Optional
+
+from fastapi import Header
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import db as database
+from .user_cache import LocalRedis, create_client
+
+logger = logging.getLogger(__name__)
+
+READ_STICKY_SECONDS = float(os.getenv("READ_STICKY_SECONDS", 5))
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class StickyReads:
+    """Dispositivos que deben leer del primario durante una ventana tras escribir"""
+
+    def __init__(self, client=None, window: float = READ_STICKY_SECONDS, prefix: str = "sticky"):
+        self.client = client if client is not None else LocalRedis()
+        self.window = window
+        self.prefix = prefix
+
+    def _key(self, device_id: str) -> str:
+        return f"{self.prefix}:device:{device_id}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    def _set(self, key: str):
+        if self.window > 0:
+            self.client.set(key, 1, ex=max(1, math.ceil(self.window)))
+
+    def mark(self, device_id: Optional[str]):
+        if device_id:
+            self._set(self._key(device_id))
+
+    def mark_user(self, user_id: Optional[int]):
+        """Marca un usuario escrito por una ruta que no lleva X-Device-ID"""
+        if user_id is not None:
+            self._set(self._user_key(user_id))
+
+    def is_sticky(self, device_id: Optional[str]) -> bool:
+        return bool(device_id) and self.client.get(self._key(device_id)) is not None
+
+    def is_user_sticky(self, user_id: Optional[int]) -> bool:
+        return user_id is not None and self.client.get(self._user_key(user_id)) is not None
+
+    @property
+    def shared(self) -> bool:
+        """False si la marca vive en la memoria de este proceso (LocalRedis)"""
+        return not isinstance(self.client, LocalRedis)
+
+
+sticky_reads = StickyReads(create_client())
+
+
+def replica_enabled() -> bool:
+    return database.read_engine is not database.engine
+
+
+def warn_if_not_shared() -> bool:
+    """
+    Avisa si hay réplica pero las marcas de read-your-writes no se comparten entre workers
+
+    Returns:
+        bool: True si la configuración garantiza read-your-writes con varios workers
+    """
+    if not replica_enabled() or sticky_reads.shared:
+        return True
+    logger.warning("⚠️ DATABASE_READ_URL sin almacén compartido: con varios workers una lectura tras "
+                   "una escritura puede ir a la réplica. Usa USER_CACHE_BACKEND=redis con REDIS_URL")
+    return False
+
+
+def is_replica_session(db: Session) -> bool:
+    """True si la sesión lee de la réplica (sus datos pueden ir con retraso)"""
+    return bool(db.info.get("replica"))
+
+
+def _read_session(use_replica: bool):
+    db = (database.ReadSessionLocal if use_replica else database.SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(device_id: Optional[str] = Header(None, alias="X-Device-ID")):
+    """
+    Sesión para endpoints de solo lectura
+
+    Args:
+        device_id: Dispositivo que hace la petición (para read-your-writes)
+
+    Yields:
+        Session: De la réplica, o del primario si no hay réplica o el dispositivo escribió hace poco
+    """
+    yield from _read_session(replica_enabled() and not sticky_reads.is_sticky(device_id))
+
+
+def get_user_read_db(user_id: int, device_id: Optional[str] = Header(None, alias="X-Device-ID")):
+    """
+    Sesión de solo lectura para /users/{user_id}
+
+    Además del dispositivo comprueba la marca del propio usuario, que ponen las escrituras
+    de /users aunque no lleven X-Device-ID.
+
+    Yields:
+        Session: De la réplica, o del primario si el usuario o el dispositivo escribieron hace poco
+    """
+    use_replica = (replica_enabled() and not sticky_reads.is_sticky(device_id)
+                   and not sticky_reads.is_user_sticky(user_id))
+    yield from _read_session(use_replica)
+
+
+class ReadYourWritesMiddleware:
+    """Marca el dispositivo como 'pegado' al primario tras una escritura con éxito"""
+
+    def __init__(self, app: ASGIApp, sticky: Optional[StickyReads] = None) -> None:
+        self.app = app
+        self.sticky = sticky
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        device_id = Headers(scope=scope).get("x-device-id")
+
+        async def send_wrapper(message: Message) -> None:
+            # Se marca al empezar la respuesta: el commit ya se hizo y el cliente aún no
+            # puede lanzar la lectura siguiente
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                (self.sticky or sticky_reads).mark(device_id)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,424 @@
+"""
+Recordatorios de fechas límite de tareas y proyectos
+Un hilo de fondo, arrancado desde el lifespan, mantiene en un montículo (heap) los
+recordatorios de las próximas horas ordenados por el instante en que deben emitirse y
+duerme hasta el siguiente: no consulta las tablas periódicamente. Por cada tarea abierta
+y cada proyecto no terminado con fecha límite se emiten dos avisos:
+- "upcoming": REMINDER_LEAD_MINUTES antes de la fecha límite.
+- "due": al llegar la fecha límite.
+
+Las escrituras de un usuario (app.events) marcan sus recordatorios para recalcularlos en el
+hilo de fondo, sin consultas en la petición. Solo se cargan los recordatorios de la
+ventana REMINDER_HORIZON_HOURS; al agotarse se carga la siguiente.
+
+La marca de agua (tabla scheduler_state) guarda hasta qué instante se emitió todo: al
+reiniciar solo se leen las fechas posteriores (índices parciales ix_tasks_open_due e
+ix_projects_open_deadline) y se emiten las que vencieron mientras estaba apagado. Con
+varios workers cada uno programa los avisos que conoce (los cambios de app.events solo
+llegan al worker que los hizo) y, antes de emitir, reclama cada aviso insertando su fila
+en sent_reminders: la restricción única (entidad, id, tipo, fecha límite) hace que solo un
+worker lo envíe, sin perder los que los demás no conocían.
+
+Los avisos van a un destino intercambiable (REMINDER_SINK): log, queue (cola en memoria),
+webhook (POST JSON a REMINDER_WEBHOOK_URL) o stream (evento "reminder" en /lifeplanner/stream).
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import urllib.request
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import db as database
+from .datetime_utils import UTC
+from .events import subscribe, unsubscribe
+from .models.project import OPEN_PROJECT_CONDITION, Project
+from .models.scheduler_state import SchedulerState, SentReminder
+from .models.task import OPEN_TASK_CONDITION, Task
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "1").lower() not in ("0", "false", "no")
+REMINDER_LEAD_MINUTES = float(os.getenv("REMINDER_LEAD_MINUTES", 60))
+REMINDER_HORIZON_HOURS = float(os.getenv("REMINDER_HORIZON_HOURS", 24))
+SCHEDULER_NAME = "deadline_reminders"
+
+# Clave de un recordatorio: (entidad, id, tipo)
+ReminderKey = Tuple[str, int, str]
+
+
+@dataclass(frozen=True)
+class Reminder:
+    entity: str  # "task" | "project"
+    id: int
+    kind: str  # "upcoming" | "due"
+    user_id: int
+    title: str
+    due_at: datetime  # UTC sin zona, como en la base de datos
+    fire_at: datetime
+
+    @property
+    def key(self) -> ReminderKey:
+        return (self.entity, self.id, self.kind)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["due_at"] = self.due_at.replace(tzinfo=UTC).isoformat()
+        data["fire_at"] = self.fire_at.replace(tzinfo=UTC).isoformat()
+        return data
+
+
+# ---------------------------------------------------------------- destinos
+
+class LogSink:
+    """Registra cada recordatorio en el log"""
+
+    def __call__(self, reminder: Reminder):
+        logger.info(f"⏰ Recordatorio {reminder.kind} de {reminder.entity} {reminder.id} "
+                    f"(usuario {reminder.user_id}): {reminder.title}")
+
+
+class QueueSink:
+    """Deja los recordatorios en una cola en memoria (para otro consumidor del proceso)"""
+
+    def __init__(self, maxsize: int = 10_000):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def __call__(self, reminder: Reminder):
+        try:
+            self.queue.put_nowait(reminder)
+        except queue.Full:
+            logger.warning(f"⚠️ Cola de recordatorios llena; se descarta {reminder.key}")
+
+
+class WebhookSink:
+    """Envía cada recordatorio como JSON por POST"""
+
+    def __init__(self, url: str, timeout: float = 5.0, opener: Callable = urllib.request.urlopen):
+        self.url = url
+        self.timeout = timeout
+        self.opener = opener
+
+    def __call__(self, reminder: Reminder):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(reminder.to_dict()).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with self.opener(request, timeout=self.timeout):
+            pass
+
+
+class StreamSink:
+    """Publica el recordatorio en las conexiones abiertas del usuario (/lifeplanner/stream)"""
+
+    def __call__(self, reminder: Reminder):
+        from . import change_stream
+        broker = change_stream.broker
+        # Por la misma vía que los cambios: con Redis llega también a las conexiones de otros workers
+        broker.publish_event({"id": broker.next_id(), "event": "reminder", **reminder.to_dict()})
+
+
+def create_sink(name: Optional[str] = None) -> Callable[[Reminder], None]:
+    """Destino según REMINDER_SINK ("log", "queue", "webhook" o "stream")"""
+    name = (name or os.getenv("REMINDER_SINK", "log")).lower()
+    if name == "queue":
+        return QueueSink()
+    if name == "stream":
+        return StreamSink()
+    if name == "webhook":
+        url = os.getenv("REMINDER_WEBHOOK_URL")
+        if url:
+            return WebhookSink(url)
+        logger.warning("⚠️ REMINDER_SINK=webhook sin REMINDER_WEBHOOK_URL; se usa el log")
+    return LogSink()
+
+
+# ---------------------------------------------------------------- planificador
+
+def _utc_naive(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+class ReminderScheduler:
+    """Montículo de recordatorios con marca de agua persistida"""
+
+    def __init__(self, sink: Callable[[Reminder], None], session_factory: Optional[Callable[[], Session]] = None,
+                 lead: timedelta = timedelta(minutes=REMINDER_LEAD_MINUTES),
+                 horizon: timedelta = timedelta(hours=REMINDER_HORIZON_HOURS),
+                 now: Callable[[], datetime] = lambda: datetime.now(UTC),
+                 name: str = SCHEDULER_NAME):
+        self.sink = sink
+        self.session_factory = session_factory
+        self.lead = lead
+        self.horizon = horizon
+        self._now = now
+        self.name = name
+        self.watermark: Optional[datetime] = None
+        self.loaded_until: Optional[datetime] = None
+        self._heap: List[Tuple[datetime, int, ReminderKey]] = []
+        self._scheduled: Dict[ReminderKey, Reminder] = {}
+        self._by_user: Dict[int, Set[ReminderKey]] = {}
+        self._dirty_users: Set[int] = set()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.emitted = 0
+
+    def now(self) -> datetime:
+        return _utc_naive(self._now())
+
+    def _session(self) -> Session:
+        return (self.session_factory or database.SessionLocal)()
+
+    # -- estado persistido
+
+    def load_watermark(self, db: Session) -> datetime:
+        """Lee la marca de agua; la primera vez la crea en "ahora" (no se avisa de lo anterior)"""
+        state = db.get(SchedulerState, self.name, populate_existing=True)
+        if state is None:
+            state = SchedulerState(name=self.name, watermark=self.now())
+            db.add(state)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Otro worker la creó a la vez
+                db.rollback()
+                state = db.get(SchedulerState, self.name, populate_existing=True)
+        self.watermark = state.watermark
+        return self.watermark
+
+    def _advance_watermark(self, db: Session, new_watermark: datetime):
+        """UPDATE condicional: la marca compartida solo avanza (la de otro worker puede ir por delante)"""
+        db.execute(
+            update(SchedulerState)
+            .where(SchedulerState.name == self.name, SchedulerState.watermark < new_watermark)
+            .values(watermark=new_watermark)
+        )
+        db.commit()
+
+    def _claim(self, db: Session, reminder: Reminder) -> bool:
+        """Reclama un aviso para este worker; False si otro ya lo reclamó"""
+        try:
+            with db.begin_nested():
+                db.execute(insert(SentReminder).values(
+                    entity=reminder.entity, entity_id=reminder.id, kind=reminder.kind, due_at=reminder.due_at,
+                ))
+        except IntegrityError:
+            return False
+        return True
+
+    def purge_claims(self, db: Session) -> int:
+        """
+        Borra los reclamos de fechas límite anteriores a la marca menos dos horizontes
+
+        Un worker duerme como mucho un horizonte entre vueltas y en cada una avanza su marca
+        local, así que ningún worker vuelve a cargar esos avisos.
+        """
+        result = db.execute(delete(SentReminder).where(SentReminder.due_at < self.watermark - 2 * self.horizon))
+        db.commit()
+        return result.rowcount
+
+    # -- carga de recordatorios
+
+    def _reminders_for(self, entity: str, item_id: int, user_id: int, title: str, due_at: datetime,
+                       after: datetime, until: datetime) -> List[Reminder]:
+        reminders = []
+        for kind, fire_at in (("upcoming", due_at - self.lead), ("due", due_at)):
+            if after < fire_at <= until:
+                reminders.append(Reminder(entity, item_id, kind, user_id, title, due_at, fire_at))
+        return reminders
+
+    def _query(self, db: Session, after: datetime, until: datetime, user_id: Optional[int] = None) -> List[Reminder]:
+        """Recordatorios con fire_at en (after, until] (una consulta por entidad, sobre índices parciales)"""
+        # Los avisos "upcoming" de fechas hasta until + lead caen dentro de la ventana
+        due_until = until + self.lead
+        tasks = (
+            select(Task.id, Project.user_id, Task.title, Task.due_date)
+            .join(Project, Task.project_id == Project.id)
+            .where(text(f"tasks.{OPEN_TASK_CONDITION}"))
+            .where(Task.due_date > after, Task.due_date <= due_until)
+        )
+        projects = (
+            select(Project.id, Project.user_id, Project.title, Project.deadline)
+            .where(text(f"projects.{OPEN_PROJECT_CONDITION}"))
+            .where(Project.deadline > after, Project.deadline <= due_until)
+        )
+        if user_id is not None:
+            tasks = tasks.where(Project.user_id == user_id)
+            projects = projects.where(Project.user_id == user_id)
+
+        reminders = []
+        for entity, stmt in (("task", tasks), ("project", projects)):
+            for item_id, owner_id, title, due_at in db.execute(stmt):
+                reminders.extend(self._reminders_for(entity, item_id, owner_id, title, due_at, after, until))
+        return reminders
+
+    def _push(self, reminder: Reminder):
+        self._scheduled[reminder.key] = reminder
+        self._by_user.setdefault(reminder.user_id, set()).add(reminder.key)
+        heapq.heappush(self._heap, (reminder.fire_at, next(self._seq), reminder.key))
+
+    def _drop_user(self, user_id: int):
+        # Borrado perezoso: las entradas del heap sin recordatorio vigente se ignoran al salir
+        for key in self._by_user.pop(user_id, ()):
+            self._scheduled.pop(key, None)
+
+    def refill(self, db: Session) -> int:
+        """Carga la siguiente ventana de recordatorios (desde la marca o lo ya cargado hasta ahora + horizonte)"""
+        if self.watermark is None:
+            self.load_watermark(db)
+        after = max(self.watermark, self.loaded_until or self.watermark)
+        until = max(self.now(), after) + self.horizon
+        reminders = self._query(db, after, until)
+        with self._lock:
+            for reminder in reminders:
+                self._push(reminder)
+            self.loaded_until = until
+        self.purge_claims(db)
+        return len(reminders)
+
+    def mark_user(self, user_id: int, *_args):
+        """Suscriptor de app.events: recalcula los recordatorios del usuario en el hilo de fondo"""
+        with self._lock:
+            self._dirty_users.add(user_id)
+        self._wake.set()
+
+    def reschedule_dirty(self, db: Session) -> int:
+        """Vuelve a leer los recordatorios de la ventana de los usuarios con cambios"""
+        with self._lock:
+            users, self._dirty_users = self._dirty_users, set()
+        if not users or self.loaded_until is None:
+            return 0
+        count = 0
+        for user_id in users:
+            reminders = self._query(db, self.watermark, self.loaded_until, user_id)
+            with self._lock:
+                self._drop_user(user_id)
+                for reminder in reminders:
+                    self._push(reminder)
+            count += len(reminders)
+        return count
+
+    # -- emisión
+
+    def _pop_due(self, now: datetime) -> List[Reminder]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, _, key = heapq.heappop(self._heap)
+                reminder = self._scheduled.get(key)
+                if reminder is None or reminder.fire_at != fire_at:
+                    continue  # entrada obsoleta: recordatorio borrado o reprogramado (tiene su propia entrada)
+                del self._scheduled[key]
+                user_keys = self._by_user.get(reminder.user_id)
+                if user_keys is not None:
+                    user_keys.discard(key)
+                    if not user_keys:
+                        del self._by_user[reminder.user_id]
+                due.append(reminder)
+        return due
+
+    def _still_pending(self, db: Session, reminders: List[Reminder]) -> List[Reminder]:
+        """Descarta lo completado o reprogramado desde que se cargó (p. ej. desde otro worker)"""
+        current = {}
+        task_ids = [r.id for r in reminders if r.entity == "task"]
+        project_ids = [r.id for r in reminders if r.entity == "project"]
+        if task_ids:
+            stmt = select(Task.id, Task.due_date).where(Task.id.in_(task_ids), text(f"tasks.{OPEN_TASK_CONDITION}"))
+            current.update({("task", item_id): due for item_id, due in db.execute(stmt)})
+        if project_ids:
+            stmt = select(Project.id, Project.deadline).where(
+                Project.id.in_(project_ids), text(f"projects.{OPEN_PROJECT_CONDITION}")
+            )
+            current.update({("project", item_id): due for item_id, due in db.execute(stmt)})
+        return [r for r in reminders if current.get((r.entity, r.id)) == r.due_at]
+
+    def run_due(self, db: Session) -> int:
+        """
+        Emite los recordatorios vencidos que este worker consigue reclamar y avanza la marca de agua
+
+        Returns:
+            int: Recordatorios emitidos por este proceso
+        """
+        now = self.now()
+        reminders = self._pop_due(now)
+        if not reminders:
+            # Nada pendiente hasta ahora en este worker: su marca local avanza sin escribir
+            if self.watermark is not None:
+                self.watermark = max(now, self.watermark)
+            return 0
+        reminders = [r for r in self._still_pending(db, reminders) if self._claim(db, r)]
+        # El reclamo se confirma antes de enviar: un fallo del destino pierde el aviso, no lo duplica
+        db.commit()
+        self.watermark = max(now, self.watermark)
+        self._advance_watermark(db, self.watermark)
+        for reminder in reminders:
+            try:
+                self.sink(reminder)
+            except Exception as e:
+                logger.error(f"❌ Error al emitir el recordatorio {reminder.key}: {str(e)}")
+        self.emitted += len(reminders)
+        return len(reminders)
+
+    def seconds_until_next(self) -> float:
+        """Segundos hasta el próximo recordatorio o hasta que haya que cargar la siguiente ventana"""
+        now = self.now()
+        with self._lock:
+            targets = [self.loaded_until] if self.loaded_until else []
+            if self._heap:
+                targets.append(self._heap[0][0])
+        if not targets:
+            return self.horizon.total_seconds()
+        return max(0.0, (min(targets) - now).total_seconds())
+
+    def tick(self) -> int:
+        """Una vuelta del hilo: cambios pendientes, nueva ventana si hace falta y emisión"""
+        with self._session() as db:
+            if self.loaded_until is None or self.now() >= self.loaded_until:
+                self.refill(db)
+            self.reschedule_dirty(db)
+            return self.run_due(db)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"❌ Error en el planificador de recordatorios: {str(e)}")
+            # Dormir hasta el próximo recordatorio; una escritura o stop() lo despiertan antes
+            self._wake.wait(max(self.seconds_until_next(), 0.05))
+            self._wake.clear()
+
+    def start(self) -> "ReminderScheduler":
+        if self._thread is None:
+            self._stop.clear()
+            subscribe(self.mark_user)
+            self._thread = threading.Thread(target=self._run, name="deadline-reminders", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        unsubscribe(self.mark_user)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# Planificador del proceso (se arranca desde el lifespan si REMINDERS_ENABLED)
+reminder_scheduler = ReminderScheduler(create_sink())
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.models.archive import ArchivedProject, ArchivedTask
+from app.models.user import User
+from app.read_routing import get_read_db
+from app.routes.project_route import get_current_user
+
+router = APIRouter()
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@router.get("/archive")
+def get_archive(
+    request: Request,
+    response: Response,
+    kind: str = Query("tasks", enum=["tasks", "projects"]),
+    project_id: Optional[int] = Query(None, description="Solo tareas archivadas de este proyecto"),
+    before_id: Optional[int] = Query(None, ge=0, description="Cursor: devolver elementos con archive_id menor que este"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Tareas completadas o proyectos terminados ya archivados del usuario, del más nuevo al más antiguo
+
+    Cada elemento conserva su id original en "id"; "archive_id" es el id propio del archivo.
+    Paginación por cursor sobre archive_id: si hay más resultados, la respuesta incluye la
+    cabecera X-Next-Cursor (y un Link rel="next") con el before_id de la página siguiente.
+    """
+    model = ArchivedTask if kind == "tasks" else ArchivedProject
+    stmt = select(model).where(model.user_id == current_user.id)
+    if project_id is not None and model is ArchivedTask:
+        stmt = stmt.where(ArchivedTask.project_id == project_id)
+    if before_id is not None:
+        stmt = stmt.where(model.id < before_id)
+    # Se pide una fila de más para saber si hay página siguiente sin contar
+    items = db.execute(stmt.order_by(model.id.desc()).limit(limit + 1)).scalars().all()
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = items[-1].id
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        next_url = request.url.include_query_params(before_id=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return [item.to_dict() for item in items]
@@ -1,32 +1,141 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, List, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, Literal, Optional
+import json
+import secrets
 from ..chibi_manager import ChibiManager, ChibiType
 from ..chibi_config import ChibiConfig, MotivationSystem, StudySession, SchoolSubject
+from .. import chibi_catalog
+from sqlalchemy.orm import Session
+from ..chibi_assets import CHIBI_STATIC_DIR, manifest as chibi_manifest
+from ..chibi_mood import get_user_mood
+from ..db import get_db
+from ..models.user import User
+from .project_route import get_current_user
+from ..chibi_images import (
+    MAX_WIDTH, MIN_WIDTH, OUTPUT_FORMATS, get_variant, pillow_available, source_hash, variant_key
+)
+from ..datetime_utils import seconds_until_utc_midnight, utc_today
+from ..http_cache import (
+    CATALOG_CACHE_CONTROL, NO_STORE_CACHE_CONTROL, CachedPayload, cached_response, etag_matches
+)
 
 router = APIRouter(prefix="/chibis", tags=["chibis"])
 
+# Mapa de coordenadas generado por build_chibi_atlas.py
+ATLAS_MAP_PATH = CHIBI_STATIC_DIR / "atlas.json"
+_atlas_cache: Dict[tuple, CachedPayload] = {}
+
+def _get_atlas_payload() -> CachedPayload:
+    """Carga y serializa el mapa del atlas una vez por versión del archivo y de la imagen"""
+    key = (ATLAS_MAP_PATH.stat().st_mtime_ns, chibi_manifest.content_hash("atlas.png"))
+    payload = _atlas_cache.get(key)
+    if payload is None:
+        atlas = json.loads(ATLAS_MAP_PATH.read_text(encoding="utf-8"))
+        atlas["image_url"] = ChibiManager.get_chibi_url(atlas["image"])
+        payload = CachedPayload.from_json(atlas)
+        _atlas_cache.clear()
+        _atlas_cache[key] = payload
+    return payload
+
+@router.get("/atlas")
+async def get_chibi_atlas(request: Request) -> Response:
+    """
+    Obtiene el atlas de chibis: URL de la imagen única y coordenadas de cada estado
+    
+    La imagen se sirve con huella de contenido y caché inmutable; este mapa lleva ETag,
+    así que el cliente solo descarga de nuevo si cambia el atlas.
+    
+    Returns:
+        Response: JSON con image_url, width, height y frames {tipo: {x, y, w, h}}
+    """
+    try:
+        payload = _get_atlas_payload()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Atlas de chibis no generado (ejecuta build_chibi_atlas.py)")
+    return cached_response(request, payload)
+
+@router.get("/image/{chibi_type}")
+async def get_chibi_image(
+    chibi_type: ChibiType,
+    request: Request,
+    w: Optional[int] = Query(None, ge=MIN_WIDTH, le=MAX_WIDTH, description="Ancho en píxeles"),
+    format: Literal["png", "webp"] = Query("png", description="Formato de salida"),
+) -> Response:
+    """
+    Obtiene un chibi redimensionado (miniaturas para listas en móvil)
+    
+    Cada variante se genera una vez en el threadpool y se guarda en la caché de disco;
+    el ETag depende del contenido original, el ancho y el formato.
+    
+    Args:
+        chibi_type: Estado emocional del chibi
+        w: Ancho destino (la imagen nunca se amplía)
+        format: png o webp
+        
+    Returns:
+        Response: Imagen, o 304 si el cliente ya tiene esa variante
+    """
+    if not pillow_available():
+        raise HTTPException(status_code=503, detail="Redimensionado de imágenes no disponible (falta Pillow)")
+    try:
+        content_hash = source_hash(f"{chibi_type.value}.png")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Imagen de chibi no encontrada")
+    
+    etag = f'"{variant_key(chibi_type.value, content_hash, w, format)}"'
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    content = await run_in_threadpool(get_variant, chibi_type.value, w, format)
+    return Response(content=content, media_type=OUTPUT_FORMATS[format][1], headers=headers)
+
+@router.get("/mood")
+def get_chibi_mood(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Obtiene el chibi según la carga de trabajo actual del usuario
+    
+    Usa las tareas vencidas, las que vencen en las próximas 24h y las completadas hoy,
+    calculadas en una sola consulta y cacheadas hasta que cambian sus datos.
+    
+    Returns:
+        Dict[str, Any]: Estado emocional, descripción, archivo, URL y señales usadas
+    """
+    return get_user_mood(db, current_user.id)
+
 @router.get("/types")
-async def get_chibi_types() -> Dict[str, str]:
+async def get_chibi_types(request: Request) -> Response:
     """
     Obtiene todos los tipos de chibis de colegiala disponibles con sus descripciones
     
     Returns:
-        Dict[str, str]: Diccionario con tipo de chibi y descripción
+        Response: JSON {tipo de chibi: descripción} precalculado, con ETag
     """
-    return ChibiManager.get_all_chibi_types()
+    return cached_response(request, chibi_catalog.get_payload("types"))
 
 @router.get("/emotional-states")
-async def get_emotional_states() -> Dict[str, str]:
+async def get_emotional_states(request: Request) -> Response:
     """
     Obtiene descripciones detalladas de todos los estados emocionales de la colegiala
     
     Returns:
-        Dict[str, str]: Diccionario con tipo de chibi y descripción emocional detallada
+        Response: JSON {tipo de chibi: descripción emocional} precalculado, con ETag
     """
-    emotional_states = {}
-    for chibi_type in ChibiType:
-        emotional_states[chibi_type.value] = ChibiManager.get_emotional_state_description(chibi_type)
-    return emotional_states
+    return cached_response(request, chibi_catalog.get_payload("emotional-states"))
+
+@router.get("/content")
+async def get_chibi_content(request: Request) -> Response:
+    """
+    Obtiene todos los mensajes motivacionales y consejos de estudio de una vez
+    
+    Pensado para que el cliente lo descargue una sola vez y lo guarde; lleva ETag.
+    
+    Returns:
+        Response: JSON con motivational_messages {estado: [...]}, study_tips {materia: [...]}
+        y los valores por defecto de cada uno
+    """
+    return cached_response(request, chibi_catalog.get_payload("content"))
 
 @router.get("/personality")
 async def get_chibi_personality() -> Dict:
@@ -106,19 +215,28 @@ async def get_study_tips(subject: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error al obtener consejos de estudio: {str(e)}")
 
 @router.get("/daily-quote")
-async def get_daily_quote() -> Dict[str, str]:
+async def get_daily_quote(
+    request: Request,
+    per_user: bool = Query(False, description="Frase del día propia de cada usuario (según X-Device-ID)"),
+    x_device_id: Optional[str] = Header(None, alias="X-Device-ID"),
+) -> Response:
     """
     Obtiene una frase motivacional del día para la colegiala
     
+    La frase depende solo de la fecha (y del usuario si per_user=true), así que la
+    respuesta se cachea hasta la medianoche UTC.
+    
+    Args:
+        per_user: Usar también el X-Device-ID para elegir la frase
+        
     Returns:
-        Dict[str, str]: Frase motivacional y su fuente
+        Response: JSON con la frase, su fuente y la fecha, con ETag y Cache-Control
     """
     try:
-        quote = ChibiConfig.get_daily_quote()
-        return {
-            "quote": quote,
-            "source": "Sistema de motivación de Sakura"
-        }
+        user_key = x_device_id if per_user else None
+        payload = chibi_catalog.daily_quote_payload(utc_today(), user_key)
+        scope = "private" if user_key else "public"
+        return cached_response(request, payload, f"{scope}, max-age={seconds_until_utc_midnight()}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener frase del día: {str(e)}")
 
@@ -228,91 +346,37 @@ async def get_task_chibi(status: str, priority: str = None) -> Dict[str, str]:
         raise HTTPException(status_code=400, detail=f"Error al obtener chibi: {str(e)}")
 
 @router.get("/preview")
-async def get_chibi_preview() -> Dict[str, List[Dict[str, str]]]:
+async def get_chibi_preview(request: Request) -> Response:
     """
     Obtiene una vista previa de todos los chibis de colegiala disponibles organizados por tipo
     
     Returns:
-        Dict[str, List[Dict[str, str]]]: Lista de chibis organizados por proyectos y tareas
+        Response: JSON {"projects": [...], "tasks": [...]} precalculado, con ETag
     """
-    try:
-        # Chibis de proyectos
-        project_chibis = []
-        project_statuses = ["activo", "en_pausa", "terminado"]
-        project_priorities = ["alta", "media", "baja", None]
-        
-        for status in project_statuses:
-            for priority in project_priorities:
-                chibi_filename = ChibiManager.get_project_chibi(status, priority)
-                chibi_url = ChibiManager.get_chibi_url(chibi_filename)
-                
-                # Obtener descripción emocional
-                chibi_type = ChibiManager.PROJECT_CHIBIS.get((status, priority))
-                if not chibi_type:
-                    chibi_type = ChibiType.HAPPY_STUDYING
-                
-                emotional_description = ChibiManager.get_emotional_state_description(chibi_type)
-                
-                project_chibis.append({
-                    "chibi_filename": chibi_filename,
-                    "chibi_url": chibi_url,
-                    "status": status,
-                    "priority": priority or "sin_prioridad",
-                    "emotional_state": chibi_type.value,
-                    "emotional_description": emotional_description
-                })
-        
-        # Chibis de tareas
-        task_chibis = []
-        task_statuses = ["pendiente", "en_progreso", "completada"]
-        task_priorities = ["alta", "media", "baja", None]
-        
-        for status in task_statuses:
-            for priority in task_priorities:
-                chibi_filename = ChibiManager.get_task_chibi(status, priority)
-                chibi_url = ChibiManager.get_chibi_url(chibi_filename)
-                
-                # Obtener descripción emocional
-                chibi_type = ChibiManager.TASK_CHIBIS.get((status, priority))
-                if not chibi_type:
-                    chibi_type = ChibiType.CONFIDENT_READY
-                
-                emotional_description = ChibiManager.get_emotional_state_description(chibi_type)
-                
-                task_chibis.append({
-                    "chibi_filename": chibi_filename,
-                    "chibi_url": chibi_url,
-                    "status": status,
-                    "priority": priority or "sin_prioridad",
-                    "emotional_state": chibi_type.value,
-                    "emotional_description": emotional_description
-                })
-        
-        return {
-            "projects": project_chibis,
-            "tasks": task_chibis
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al generar vista previa: {str(e)}")
+    return cached_response(request, chibi_catalog.get_payload("preview"))
 
 @router.get("/random-emotional-state")
-async def get_random_emotional_state() -> Dict[str, str]:
+async def get_random_emotional_state(
+    request: Request,
+    seed: Optional[int] = Query(None, ge=0, le=2**32 - 1, description="Semilla para repetir el mismo estado"),
+) -> Response:
     """
     Obtiene un estado emocional aleatorio de la colegiala
     
+    El estado sale de un generador con semilla propio de la petición. Sin semilla se
+    sortea una, se devuelve en la respuesta y esta no se cachea; con semilla la
+    respuesta es siempre la misma y se puede cachear.
+    
+    Args:
+        seed: Semilla del generador (opcional)
+        
     Returns:
-        Dict[str, str]: Estado emocional aleatorio con descripción
+        Response: Estado emocional aleatorio con descripción y la semilla usada
     """
     try:
-        import random
-        chibi_types = list(ChibiType)
-        random_chibi = random.choice(chibi_types)
-        
-        return {
-            "emotional_state": random_chibi.value,
-            "emotional_description": ChibiManager.get_emotional_state_description(random_chibi),
-            "chibi_filename": f"{random_chibi.value}.png",
-            "chibi_url": ChibiManager.get_chibi_url(f"{random_chibi.value}.png")
-        }
+        if seed is None:
+            payload = chibi_catalog.random_state_payload(secrets.randbits(32))
+            return cached_response(request, payload, NO_STORE_CACHE_CONTROL)
+        return cached_response(request, chibi_catalog.random_state_payload(seed))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener estado emocional aleatorio: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al obtener estado emocional aleatorio: {str(e)}")
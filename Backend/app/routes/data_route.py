@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Iterator, Optional
+from app.db import get_db
+from app.events import publish_change
+from app.importer import ImportAborted, import_records, parse_csv, parse_ndjson
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.routes.project_route import get_current_user
+from app.streaming import chunked, close_session_after, dumps, ndjson_lines
+
+router = APIRouter()
+
+# Filas que se traen por cada viaje al cursor del servidor
+EXPORT_BATCH_SIZE = 1000
+
+
+def project_export_dict(project: Project) -> dict:
+    """Serializa un proyecto sin sus tareas (se exportan aparte)"""
+    return {
+        "id": project.id,
+        "title": project.title,
+        "description": project.description,
+        "status": project.status,
+        "priority": project.priority,
+        "category": project.category,
+        "deadline": project.deadline.isoformat() if project.deadline else None,
+        "created_at": project.created_at.isoformat() if project.created_at else None,
+        "updated_at": project.updated_at.isoformat() if project.updated_at else None,
+    }
+
+
+def iter_user_projects(db: Session, user_id: int) -> Iterator[dict]:
+    stmt = (
+        select(Project)
+        .where(Project.user_id == user_id)
+        .order_by(Project.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for project in db.execute(stmt).scalars():
+        yield project_export_dict(project)
+
+
+def iter_user_tasks(db: Session, user_id: int) -> Iterator[dict]:
+    stmt = (
+        select(Task)
+        .join(Project)
+        .where(Project.user_id == user_id)
+        .order_by(Task.project_id, Task.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for task in db.execute(stmt).scalars():
+        yield task.to_dict()
+
+
+def iter_export_records(db: Session, user: dict) -> Iterator[dict]:
+    """Registros de la exportación en orden: usuario, proyectos y tareas"""
+    yield {"type": "user", **user}
+    for project in iter_user_projects(db, user["id"]):
+        yield {"type": "project", **project}
+    for task in iter_user_tasks(db, user["id"]):
+        yield {"type": "task", **task}
+
+
+def iter_export_json(db: Session, user: dict) -> Iterator[str]:
+    """Documento JSON único construido por fragmentos"""
+    yield '{"user":' + dumps(user) + ',"projects":['
+    for index, project in enumerate(iter_user_projects(db, user["id"])):
+        yield ("," if index else "") + dumps(project)
+    yield '],"tasks":['
+    for index, task in enumerate(iter_user_tasks(db, user["id"])):
+        yield ("," if index else "") + dumps(task)
+    yield "]}"
+
+
+def iter_user_export(db: Session, user: dict, format: str = "ndjson") -> Iterator[bytes]:
+    """
+    Genera la exportación completa de un usuario en bloques de bytes
+
+    Usa cursores con yield_per, así que la memoria no depende del tamaño de la cuenta.
+
+    Args:
+        db: Sesión de base de datos
+        user: Usuario serializado (``User.to_dict``)
+        format: "ndjson" (una línea por registro) o "json" (un documento)
+
+    Returns:
+        Iterator[bytes]: Cuerpo de la respuesta
+    """
+    if format == "json":
+        return chunked(iter_export_json(db, user))
+    return chunked(ndjson_lines(iter_export_records(db, user)))
+
+
+@router.get("/export")
+def export_user_data(
+    format: str = Query("ndjson", enum=["ndjson", "json"]),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Exporta todos los proyectos y tareas del usuario actual en streaming"""
+    user = current_user.to_dict()
+    extension = "json" if format == "json" else "ndjson"
+    media_type = "application/json" if format == "json" else "application/x-ndjson"
+
+    return StreamingResponse(
+        close_session_after(iter_user_export(db, user, format), db),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="lifeplanner-export-{user["id"]}.{extension}"'}
+    )
+
+
+async def publish_import(user_id: int, result: dict):
+    """Avisa del cambio solo si se creó algo; en el threadpool (con Redis publicar es E/S bloqueante)"""
+    if result["projects_created"] + result["tasks_created"] > 0:
+        await run_in_threadpool(publish_change, user_id, "task", "import")
+
+
+@router.post("/import")
+async def import_user_data(
+    request: Request,
+    format: Optional[str] = Query(None, enum=["ndjson", "csv"]),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Importa proyectos y tareas en bloque desde NDJSON o CSV
+
+    El formato se toma de ``format`` o, si no se indica, del Content-Type (text/csv → CSV).
+    Cada lote se confirma por separado; las filas inválidas se informan por número de línea.
+    Si la base de datos rechaza un lote responde 422 con lo confirmado hasta ese lote.
+    """
+    content = await request.body()
+    if not content.strip():
+        raise HTTPException(status_code=400, detail="El cuerpo de la importación está vacío")
+
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    rows = parse_csv(content) if format == "csv" else parse_ndjson(content)
+
+    try:
+        result = await run_in_threadpool(import_records, db, current_user.id, rows)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El archivo debe estar codificado en UTF-8")
+    except ImportAborted as e:
+        # Los lotes ya confirmados cuentan como cambio aunque un lote posterior falle
+        await publish_import(current_user.id, e.result)
+        # 422 con lo ya confirmado: el cliente puede reintentar desde failed_lines
+        raise HTTPException(status_code=422, detail=e.to_dict())
+    await publish_import(current_user.id, result)
+    return result
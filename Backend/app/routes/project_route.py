@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Header
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Header
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, joinedload, load_only
 from typing import List, Optional
+from app.archive import purge_project_archive
 from app.db import SessionLocal, get_db
+from app.read_routing import get_read_db
+from app.events import publish_change
+from app.user_cache import user_cache
+from app.write_buffer import status_buffer
 from app.models.project import Project
 from app.models.task import Task
 from app.models.user import User
@@ -25,7 +31,7 @@ def get_current_user(device_id: Optional[str] = Header(None, alias="X-Device-ID"
         # Si no hay device_id, crear un usuario temporal
         device_id = "temp_user"
     
-    user = db.query(User).filter(User.device_id == device_id).first()
+    user = user_cache.get_by_device_id(db, device_id)
     
     if not user:
         # Crear un nuevo usuario automáticamente
@@ -56,6 +62,8 @@ def get_current_user(device_id: Optional[str] = Header(None, alias="X-Device-ID"
             db.commit()
             db.refresh(user)
     
+    # Lecturas y escrituras ven los cambios de estado pendientes del usuario
+    status_buffer.flush_user(user.id, db)
     return user
 
 
@@ -89,6 +97,7 @@ async def create_project(project: ProjectCreate, current_user: User = Depends(ge
 
         db.add(db_project)
         db.commit()
+        publish_change(current_user.id, "project", "create")
         db.refresh(db_project)
         
         logger.info(f"Proyecto creado exitosamente con ID: {db_project.id}")
@@ -109,7 +118,7 @@ async def get_projects(
     priority: str = None,
     due_date_order: str = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     try:
         # Filtrar por usuario actual
@@ -138,7 +147,12 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectOut)
 async def get_project(project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
-        project = db.query(Project).filter(Project.id == project_id, Project.user_id == current_user.id).first()
+        project = (
+            db.query(Project)
+            .options(joinedload(Project.tasks))
+            .filter(Project.id == project_id, Project.user_id == current_user.id)
+            .first()
+        )
         if not project:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proyecto no encontrado")
         return project.to_dict()
@@ -154,15 +168,33 @@ async def get_project(project_id: int, current_user: User = Depends(get_current_
         )
 
 @router.get("/{project_id}/tasks", response_model=List[TaskOut])
-async def get_tasks_by_project(project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_tasks_by_project(
+    project_id: int,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id,title,status,due_date)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     try:
+        try:
+            selected_fields = Task.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
         # Verificar que el proyecto pertenece al usuario
         project = db.query(Project).filter(Project.id == project_id, Project.user_id == current_user.id).first()
         if not project:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proyecto no encontrado")
         
-        tasks = db.query(Task).filter(Task.project_id == project_id).all()
+        query = db.query(Task).filter(Task.project_id == project_id)
+        if selected_fields:
+            # Proyección de columnas: menos lectura en BD y respuesta más pequeña
+            query = query.options(load_only(*Task.projected_columns(selected_fields)))
+            return JSONResponse(content=[task.to_dict(selected_fields) for task in query.all()])
+
+        tasks = query.all()
         return [task.to_dict() for task in tasks]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error al obtener tareas del proyecto {project_id}: {str(e)}")
         logger.error(traceback.format_exc())
@@ -195,6 +227,7 @@ async def update_project(
             setattr(db_project, field, value)
 
         db.commit()
+        publish_change(current_user.id, "project", "update")
         db.refresh(db_project)
         return db_project.to_dict()
     except Exception as e:
@@ -226,6 +259,7 @@ async def patch_project(
             setattr(db_project, key, value)
 
         db.commit()
+        publish_change(current_user.id, "project", "update")
         db.refresh(db_project)
         return db_project.to_dict()
     except Exception as e:
@@ -245,6 +279,9 @@ def delete_project(project_id: int, current_user: User = Depends(get_current_use
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
 
     db.delete(project)
+    # Sus tareas ya archivadas se van con él (el id del proyecto puede reutilizarse)
+    purge_project_archive(db, current_user.id, project_id)
     db.commit()
+    publish_change(current_user.id, "project", "delete")
     return Response(status_code=204)
 
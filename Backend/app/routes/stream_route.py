@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.db import get_db
+from app.routes.project_route import get_current_user
+import app.change_stream as change_stream
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    device_id: Optional[str] = Header(None, alias="X-Device-ID"),
+    device_id_query: Optional[str] = Query(None, alias="device_id"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: Session = Depends(get_db),
+):
+    """
+    Cambios de proyectos y tareas del usuario en tiempo real (Server-Sent Events)
+
+    Cada evento "change" trae {"entity": "task"|"project", "action": ...}: la app recarga lo
+    afectado en lugar de consultar periódicamente. Un evento "resync" pide recargar todo.
+    EventSource no permite cabeceras propias, por eso el dispositivo también se acepta como
+    ?device_id=. Al reconectar, EventSource envía Last-Event-ID y se reenvían los perdidos.
+    """
+    user = await run_in_threadpool(get_current_user, device_id or device_id_query, db)
+    user_id = user.id
+    # La conexión dura minutos: no se retiene una conexión del pool mientras tanto
+    db.close()
+
+    return StreamingResponse(
+        change_stream.event_stream(
+            change_stream.broker,
+            user_id,
+            request.is_disconnected,
+            last_event_id=last_event_id,
+            heartbeat=change_stream.STREAM_HEARTBEAT_SECONDS,
+            max_seconds=change_stream.STREAM_MAX_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Header
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import asc, desc
 from app.db import get_db
+from app.read_routing import get_read_db
+from app.events import publish_change
+from app.user_cache import user_cache
+from app.write_buffer import status_buffer
+from app.agenda import AGENDA_RANGES, get_agenda
 from app.models.task import Task
 from app.models.project import Project
 from app.models.user import User
@@ -11,13 +17,13 @@ from typing import List, Optional
 router = APIRouter()
 
 # Función para obtener el usuario actual
-def get_current_user(device_id: Optional[str] = Header(None, alias="X-Device-ID"), db: Session = Depends(get_db)) -> User:
+def resolve_current_user(device_id: Optional[str] = Header(None, alias="X-Device-ID"), db: Session = Depends(get_db)) -> User:
     """Obtener o crear el usuario actual basado en device_id"""
     if not device_id:
         # Si no hay device_id, crear un usuario temporal
         device_id = "temp_user"
     
-    user = db.query(User).filter(User.device_id == device_id).first()
+    user = user_cache.get_by_device_id(db, device_id)
     
     if not user:
         # Crear un nuevo usuario automáticamente
@@ -31,16 +37,28 @@ def get_current_user(device_id: Optional[str] = Header(None, alias="X-Device-ID"
     
     return user
 
+def get_current_user(device_id: Optional[str] = Header(None, alias="X-Device-ID"), db: Session = Depends(get_db)) -> User:
+    """Usuario actual, con sus cambios de estado pendientes ya escritos"""
+    user = resolve_current_user(device_id, db)
+    status_buffer.flush_user(user.id, db)
+    return user
+
 @router.get("/", response_model=List[TaskOut])
 def get_tasks(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     project_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None, enum=["pendiente", "en_progreso", "completada"]),
     priority: Optional[str] = Query(None, enum=["baja", "media", "alta"]),
     tag: Optional[str] = Query(None),
     due_date_order: Optional[str] = Query("asc", enum=["asc", "desc"]),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id,title,status,due_date)"),
     current_user: User = Depends(get_current_user)
 ):
+    try:
+        selected_fields = Task.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # Filtrar tareas por proyectos del usuario actual
     query = db.query(Task).join(Project).filter(Project.user_id == current_user.id)
 
@@ -59,11 +77,34 @@ def get_tasks(
     else:
         query = query.order_by(desc(Task.due_date))
 
+    if selected_fields:
+        # Cargar solo las columnas necesarias y devolver el diccionario recortado
+        query = query.options(load_only(*Task.projected_columns(selected_fields)))
+        return JSONResponse(content=[task.to_dict(selected_fields) for task in query.all()])
+
     tasks = query.all()
     return tasks
 
+@router.get("/status-buffer/metrics")
+def get_status_buffer_metrics():
+    """Métricas del buffer de cambios de estado (cambios agrupados y commits ahorrados)"""
+    return status_buffer.metrics()
+
+@router.get("/agenda")
+def get_task_agenda(
+    range: str = Query("today", enum=list(AGENDA_RANGES)),
+    tz: Optional[str] = Query(None, description="Zona horaria IANA del dispositivo (p. ej. America/Mexico_City); por defecto UTC"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Tareas abiertas vencidas (overdue), de hoy (today) o de los próximos 7 días (week)"""
+    try:
+        return get_agenda(db, current_user.id, range, tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{task_id}", response_model=TaskOut)
-def get_task(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_task(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     task = db.query(Task).join(Project).filter(Task.id == task_id, Project.user_id == current_user.id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -79,6 +120,7 @@ def create_task_for_project(project_id: int, task: TaskCreate, current_user: Use
     db_task = Task(**task.model_dump(), project_id=project_id)
     db.add(db_task)
     db.commit()
+    publish_change(current_user.id, "task", "create")
     db.refresh(db_task)
     return db_task
 
@@ -90,12 +132,19 @@ def update_task(task_id: int, updated_task: TaskUpdate, current_user: User = Dep
     for key, value in updated_task.dict(exclude_unset=True).items():
         setattr(task, key, value)
     db.commit()
+    publish_change(current_user.id, "task", "update")
     db.refresh(task)
     return task
 
 @router.put("/{task_id}/status", response_model=TaskOut)
-def update_task_status(task_id: int, status_update: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Actualiza solo el estado de una tarea"""
+def update_task_status(task_id: int, status_update: dict, current_user: User = Depends(resolve_current_user), db: Session = Depends(get_db)):
+    """
+    Actualiza solo el estado de una tarea
+
+    Con el buffer de escritura activo (STATUS_COALESCE_SECONDS) el cambio se agrupa con los
+    siguientes de la misma tarea y se escribe al terminar la ventana; la respuesta ya
+    refleja el nuevo estado.
+    """
     task = db.query(Task).join(Project).filter(Task.id == task_id, Project.user_id == current_user.id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -104,8 +153,16 @@ def update_task_status(task_id: int, status_update: dict, current_user: User = D
     if new_status not in ["pendiente", "en_progreso", "completada"]:
         raise HTTPException(status_code=400, detail="Estado inválido")
     
+    if status_buffer.enabled:
+        status_buffer.enqueue(current_user.id, task.id, new_status)
+        # Fuera de la sesión: el cambio solo se refleja en la respuesta
+        db.expunge(task)
+        task.status = new_status
+        return task
+    
     task.status = new_status
     db.commit()
+    publish_change(current_user.id, "task", "update")
     db.refresh(task)
     return task
 
@@ -122,6 +179,7 @@ def update_task_priority(task_id: int, priority_update: dict, current_user: User
     
     task.priority = new_priority
     db.commit()
+    publish_change(current_user.id, "task", "update")
     db.refresh(task)
     return task
 
@@ -132,6 +190,7 @@ def delete_task_by_id(task_id: int, current_user: User = Depends(get_current_use
         raise HTTPException(status_code=404, detail="Task not found")
     db.delete(task)
     db.commit()
+    publish_change(current_user.id, "task", "delete")
     return {"message": "Tarea borrada exitosamente"}
 
 @router.delete("/project/{project_id}/task/{task_id}")
@@ -146,4 +205,5 @@ def delete_task_with_project(project_id: int, task_id: int, current_user: User =
         raise HTTPException(status_code=404, detail="Task not found in this project")
     db.delete(task)
     db.commit()
+    publish_change(current_user.id, "task", "delete")
     return {"message": "Tarea borrada exitosamente (verificado por proyecto)"}
@@ -1,22 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import Iterator, List, Optional
+import hmac
+import os
 from ..db import get_db
+from .. import read_routing
+from ..archive import purge_user_archive
+from ..read_routing import get_user_read_db, is_replica_session
 from ..models.user import User
 from ..schemas.user_schema import UserCreate, UserUpdate, UserOut
+from ..streaming import chunked, close_session_after, csv_lines, ndjson_lines
+from ..user_cache import user_cache
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Filas por viaje al cursor del servidor en la exportación
+EXPORT_BATCH_SIZE = 1000
+
+# Sin device_id: es la única credencial que comprueba get_current_user
+EXPORT_COLUMNS = ("id", "username", "email", "created_at", "updated_at")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Exige la cabecera X-Admin-Token igual a ADMIN_TOKEN
+
+    Sin ADMIN_TOKEN configurado los endpoints de administración quedan desactivados.
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Endpoint de administración desactivado")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+def filter_users(stmt, created_from: Optional[datetime], created_to: Optional[datetime], username_prefix: Optional[str]):
+    """Aplica los filtros del listado de usuarios (rango de alta y prefijo de username)"""
+    if created_from:
+        stmt = stmt.where(User.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(User.created_at < created_to)
+    if username_prefix:
+        # LIKE 'prefijo%' (con escape de % y _) usa el índice de username
+        stmt = stmt.where(User.username.startswith(username_prefix, autoescape=True))
+    return stmt
+
+def iter_users_export(db: Session, format: str, created_from=None, created_to=None, username_prefix=None) -> Iterator[bytes]:
+    """
+    Genera la exportación de usuarios en bloques de bytes
+
+    Recorre la tabla con un cursor de servidor (yield_per), sin cargarla entera en memoria.
+
+    Args:
+        db: Sesión de base de datos
+        format: "ndjson" o "csv"
+        created_from, created_to, username_prefix: Filtros del listado
+
+    Returns:
+        Iterator[bytes]: Cuerpo de la respuesta
+    """
+    stmt = filter_users(
+        select(*(getattr(User, column) for column in EXPORT_COLUMNS)),
+        created_from, created_to, username_prefix
+    ).order_by(User.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    rows = (
+        tuple(value.isoformat() if isinstance(value, datetime) else value for value in row)
+        for row in db.execute(stmt)
+    )
+    if format == "csv":
+        return chunked(csv_lines(EXPORT_COLUMNS, rows))
+    return chunked(ndjson_lines(dict(zip(EXPORT_COLUMNS, row)) for row in rows))
+
 @router.get("/", response_model=List[UserOut])
-def get_users(db: Session = Depends(get_db)):
-    """Obtener todos los usuarios (solo para desarrollo)"""
-    users = db.query(User).all()
+def get_users(
+    request: Request,
+    response: Response,
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor: devolver usuarios con id mayor que este"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    created_from: Optional[datetime] = Query(None, description="Alta desde (incluida)"),
+    created_to: Optional[datetime] = Query(None, description="Alta hasta (excluida)"),
+    username_prefix: Optional[str] = Query(None, min_length=1, max_length=50),
+    _admin: None = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener usuarios paginados por id (solo administración: incluye device_id, la credencial de cada usuario)
+    
+    Paginación por cursor: si hay más resultados, la respuesta incluye la cabecera
+    X-Next-Cursor (y un Link rel="next") con el after_id de la página siguiente.
+    """
+    stmt = filter_users(select(User), created_from, created_to, username_prefix)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    # Se pide una fila de más para saber si hay página siguiente sin contar
+    users = db.execute(stmt.order_by(User.id).limit(limit + 1)).scalars().all()
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = users[-1].id
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        next_url = request.url.include_query_params(after_id=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
     return users
 
+@router.get("/export")
+def export_users(
+    format: str = Query("ndjson", enum=["ndjson", "csv"]),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    username_prefix: Optional[str] = Query(None, min_length=1, max_length=50),
+    _admin: None = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Exportar usuarios en streaming (NDJSON o CSV) con los mismos filtros que el listado (requiere X-Admin-Token)"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        close_session_after(iter_users_export(db, format, created_from, created_to, username_prefix), db),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="lifeplanner-users.{format}"'}
+    )
+
 @router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_user_read_db)):
     """Obtener un usuario por ID"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = user_cache.get_by_id(db, user_id, fill=not is_replica_session(db))
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return user
@@ -24,7 +134,7 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 @router.get("/device/{device_id}", response_model=UserOut)
 def get_user_by_device_id(device_id: str, db: Session = Depends(get_db)):
     """Obtener o crear un usuario por device_id"""
-    user = db.query(User).filter(User.device_id == device_id).first()
+    user = user_cache.get_by_device_id(db, device_id)
     
     if not user:
         # Crear un nuevo usuario automáticamente
@@ -56,6 +166,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    read_routing.sticky_reads.mark_user(db_user.id)
     return db_user
 
 @router.put("/{user_id}", response_model=UserOut)
@@ -83,6 +194,9 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
         setattr(user, field, value)
     
     db.commit()
+    user_cache.invalidate(user_id)
+    # Sin X-Device-ID el middleware no puede marcar nada: se marca el usuario
+    read_routing.sticky_reads.mark_user(user_id)
     db.refresh(user)
     return user
 
@@ -94,6 +208,9 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     db.delete(user)
+    purge_user_archive(db, user_id)
     db.commit()
+    user_cache.invalidate(user_id)
+    read_routing.sticky_reads.mark_user(user_id)
     return {"message": "Usuario eliminado correctamente"}
 
@@ -0,0 +1,240 @@
+"""
+Punto de entrada de producción con varios workers
+Arranca gunicorn con workers ASGI (uvicorn.workers.UvicornWorker) dimensionados a partir
+de las CPUs y la memoria disponibles en el contenedor, con la aplicación precargada en el
+proceso maestro y el pool de base de datos repartido entre workers.
+
+Uso:
+    python -m app.serve
+
+Variables de entorno:
+    PORT / HOST             Dirección de escucha (por defecto 0.0.0.0:8000)
+    WEB_CONCURRENCY         Número de workers fijo (si no, se calcula)
+    WORKER_MEMORY_MB        Memoria reservada por worker para el cálculo (por defecto 160)
+    DB_MAX_CONNECTIONS      Conexiones totales permitidas a PostgreSQL entre todos los workers
+    GUNICORN_TIMEOUT        Segundos sin respuesta antes de reiniciar un worker (por defecto 60)
+    GUNICORN_GRACEFUL_TIMEOUT  Segundos para terminar peticiones en curso al reiniciar (30)
+    GUNICORN_KEEPALIVE      Segundos de keep-alive; mayor que el timeout del proxy (75)
+
+Si gunicorn no está instalado (p. ej. en Windows) se usa ``uvicorn --workers`` sin precarga.
+"""
+
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+APP_IMPORT = "app.main:app"
+WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+DEFAULT_WORKER_MEMORY_MB = 160
+DEFAULT_DB_MAX_CONNECTIONS = 40
+MAX_WORKERS = 16
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_count(cgroup_root: Path = CGROUP_ROOT) -> int:
+    """
+    CPUs utilizables por el proceso
+
+    Respeta la afinidad del proceso y la cuota de CPU del contenedor (cgroup v2 ``cpu.max``
+    o v1 ``cpu.cfs_quota_us``), que ``os.cpu_count()`` ignora.
+
+    Args:
+        cgroup_root: Raíz del sistema de archivos cgroup
+
+    Returns:
+        int: Número de CPUs (al menos 1)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = period = None
+    cpu_max = _read(cgroup_root / "cpu.max")
+    if cpu_max:
+        parts = cpu_max.split()
+        if parts[0] != "max" and len(parts) == 2:
+            quota, period = int(parts[0]), int(parts[1])
+    else:
+        raw_quota = _read(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+        raw_period = _read(cgroup_root / "cpu" / "cpu.cfs_period_us")
+        if raw_quota and raw_period and int(raw_quota) > 0:
+            quota, period = int(raw_quota), int(raw_period)
+    if quota and period:
+        cpus = min(cpus, math.ceil(quota / period))
+    return max(1, cpus)
+
+
+def memory_limit_bytes(cgroup_root: Path = CGROUP_ROOT, meminfo: Path = Path("/proc/meminfo")) -> Optional[int]:
+    """
+    Memoria disponible para el contenedor
+
+    Args:
+        cgroup_root: Raíz del sistema de archivos cgroup
+        meminfo: Ruta de /proc/meminfo (memoria total si no hay límite de cgroup)
+
+    Returns:
+        Optional[int]: Bytes, o None si no se puede determinar
+    """
+    host_total = None
+    raw = _read(meminfo)
+    if raw:
+        for line in raw.splitlines():
+            if line.startswith("MemTotal:"):
+                host_total = int(line.split()[1]) * 1024
+                break
+
+    for path in (cgroup_root / "memory.max", cgroup_root / "memory" / "memory.limit_in_bytes"):
+        limit = _read(path)
+        if limit and limit != "max":
+            limit = int(limit)
+            # cgroup v1 sin límite informa un valor enorme (PAGE_COUNTER_MAX)
+            if host_total is None or limit < host_total:
+                return limit
+    return host_total
+
+
+def compute_workers(cpus: int, memory_bytes: Optional[int], worker_memory_mb: int = DEFAULT_WORKER_MEMORY_MB) -> int:
+    """
+    Número de workers: 2×CPU+1 limitado por la memoria y por MAX_WORKERS
+
+    Args:
+        cpus: CPUs utilizables
+        memory_bytes: Memoria disponible (None = sin límite conocido)
+        worker_memory_mb: Memoria que se reserva por worker
+
+    Returns:
+        int: Workers (al menos 1)
+    """
+    workers = 2 * cpus + 1
+    if memory_bytes:
+        workers = min(workers, memory_bytes // (worker_memory_mb * 1024 * 1024))
+    return int(max(1, min(workers, MAX_WORKERS)))
+
+
+def pool_settings(workers: int, max_connections: int = DEFAULT_DB_MAX_CONNECTIONS) -> Dict[str, int]:
+    """
+    Reparte las conexiones permitidas entre workers
+
+    Cada worker tiene su propio pool; pool_size + max_overflow de todos los workers no
+    supera max_connections.
+
+    Args:
+        workers: Número de workers
+        max_connections: Conexiones totales permitidas
+
+    Returns:
+        Dict[str, int]: {"pool_size", "max_overflow"} por worker
+    """
+    per_worker = max(2, max_connections // max(1, workers))
+    pool_size = max(1, per_worker * 2 // 3)
+    return {"pool_size": pool_size, "max_overflow": per_worker - pool_size}
+
+
+def build_options(environ: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Configuración de gunicorn a partir del entorno
+
+    Args:
+        environ: Variables de entorno (por defecto os.environ)
+
+    Returns:
+        Dict[str, Any]: Opciones de gunicorn
+    """
+    environ = os.environ if environ is None else environ
+    if environ.get("WEB_CONCURRENCY"):
+        workers = max(1, int(environ["WEB_CONCURRENCY"]))
+    else:
+        worker_memory_mb = int(environ.get("WORKER_MEMORY_MB", DEFAULT_WORKER_MEMORY_MB))
+        workers = compute_workers(cpu_count(), memory_limit_bytes(), worker_memory_mb)
+
+    return {
+        "bind": f"{environ.get('HOST', '0.0.0.0')}:{environ.get('PORT', '8000')}",
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": True,
+        "timeout": int(environ.get("GUNICORN_TIMEOUT", 60)),
+        "graceful_timeout": int(environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30)),
+        "keepalive": int(environ.get("GUNICORN_KEEPALIVE", 75)),
+        # Reciclar workers de vez en cuando limita el crecimiento de memoria
+        "max_requests": int(environ.get("GUNICORN_MAX_REQUESTS", 2000)),
+        "max_requests_jitter": int(environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200)),
+        "accesslog": "-",
+        "post_fork": post_fork,
+    }
+
+
+def configure_pool(workers: int, environ: Optional[Dict[str, str]] = None):
+    """Fija DB_POOL_SIZE/DB_MAX_OVERFLOW por worker antes de importar app.db"""
+    environ = os.environ if environ is None else environ
+    max_connections = int(environ.get("DB_MAX_CONNECTIONS", DEFAULT_DB_MAX_CONNECTIONS))
+    settings = pool_settings(workers, max_connections)
+    environ.setdefault("DB_POOL_SIZE", str(settings["pool_size"]))
+    environ.setdefault("DB_MAX_OVERFLOW", str(settings["max_overflow"]))
+
+
+def post_fork(server, worker):
+    """
+    Tras el fork cada worker descarta las conexiones heredadas del maestro
+
+    Con preload_app el motor se crea en el maestro; compartir sus sockets entre procesos
+    corrompe el protocolo, así que cada worker abre las suyas (close=False no las cierra
+    en el maestro). Con DATABASE_READ_URL la réplica tiene su propio motor y pasa lo mismo.
+    """
+    from app.db import engine, read_engine
+    engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
+
+
+def run_gunicorn(options: Dict[str, Any]):
+    from gunicorn.app.base import BaseApplication
+
+    class LifePlannerApplication(BaseApplication):
+        def __init__(self, options: Dict[str, Any]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    LifePlannerApplication(options).run()
+
+
+def main():
+    options = build_options()
+    configure_pool(options["workers"])
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        import uvicorn
+        host, port = options["bind"].rsplit(":", 1)
+        logger.warning("⚠️ gunicorn no está instalado; se usa uvicorn --workers sin precarga")
+        uvicorn.run(APP_IMPORT, host=host, port=int(port), workers=options["workers"],
+                    timeout_keep_alive=options["keepalive"],
+                    timeout_graceful_shutdown=options["graceful_timeout"])
+        return
+    print(f"🚀 Iniciando LifePlanner con {options['workers']} workers en {options['bind']}")
+    run_gunicorn(options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Sustituto local de una réplica de lectura
+Copia periódicamente la base SQLite primaria sobre otra con la API de backup de SQLite,
+imitando una réplica de PostgreSQL con retraso. Permite probar el enrutado de lecturas
+(app.read_routing) en desarrollo:
+
+    DATABASE_URL=sqlite:///./lifeplanner.db
+    DATABASE_READ_URL=sqlite:///./lifeplanner_replica.db
+    SQLITE_REPLICA_INTERVAL=2   # segundos entre copias (retraso de la réplica)
+"""
+
+import logging
+import sqlite3
+import threading
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def sqlite_path(engine: Engine) -> Optional[str]:
+    """Ruta del archivo de un motor SQLite (None si no es SQLite o es en memoria)"""
+    if engine.dialect.name != "sqlite":
+        return None
+    database = engine.url.database
+    return database if database and database != ":memory:" else None
+
+
+class SQLiteReplicator:
+    """Replica primario → réplica cada interval segundos en un hilo de fondo"""
+
+    def __init__(self, primary_path: str, replica_path: str, interval: float = 1.0):
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.interval = interval
+        self.syncs = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync(self):
+        """Copia el estado actual del primario a la réplica (una transacción consistente)"""
+        source = sqlite3.connect(self.primary_path)
+        target = sqlite3.connect(self.replica_path)
+        try:
+            source.backup(target)
+            self.syncs += 1
+        finally:
+            target.close()
+            source.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Error al replicar {self.primary_path}: {str(e)}")
+
+    def start(self) -> "SQLiteReplicator":
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sqlite-replica", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
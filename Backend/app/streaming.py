@@ -0,0 +1,77 @@
+"""
+Utilidades para respuestas en streaming (exportaciones NDJSON/JSON/CSV)
+Agrupan las líneas en bloques para no emitir un chunk HTTP por fila.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+# Tamaño aproximado de cada bloque enviado al cliente
+CHUNK_SIZE = 64 * 1024
+
+
+def dumps(obj: Any) -> str:
+    """Serializa a JSON compacto manteniendo acentos legibles"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def chunked(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Agrupa fragmentos de texto en bloques de bytes de tamaño acotado
+
+    Args:
+        pieces: Fragmentos de texto a emitir en orden
+        chunk_size: Tamaño aproximado de cada bloque
+
+    Returns:
+        Iterator[bytes]: Bloques codificados en UTF-8
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def ndjson_lines(records: Iterable[dict]) -> Iterator[str]:
+    """Convierte diccionarios en líneas NDJSON"""
+    for record in records:
+        yield dumps(record) + "\n"
+
+
+def csv_lines(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """Convierte filas en líneas CSV con cabecera"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def close_session_after(iterator: Iterator[bytes], db: Optional[Session]) -> Iterator[bytes]:
+    """
+    Cierra la sesión cuando termina (o se aborta) el streaming
+
+    La dependencia get_db puede cerrar la sesión antes de enviar el cuerpo; si el generador
+    vuelve a usarla, la conexión se reabre y hay que devolverla al pool al terminar.
+    """
+    try:
+        yield from iterator
+    finally:
+        if db is not None:
+            db.close()
@@ -0,0 +1,303 @@
+"""
+Caché compartida de filas de usuario
+Las rutas y las dependencias get_current_user cargan el mismo User en cada petición. Esta
+caché de lectura (read-through) guarda cada usuario serializado bajo su id y su device_id
+y lo vuelve a asociar a la sesión con ``db.merge(load=False)``, sin consultar la base.
+
+Invalidación por versión: cada usuario tiene un contador ``user:ver:<id>``. Las entradas
+llevan la versión con la que se guardaron y se descartan si no coincide con la actual;
+al modificar o borrar un usuario basta con incrementar el contador, lo que invalida a la
+vez la entrada por id y la de cualquier device_id (aunque haya cambiado).
+
+El almacén es cualquier cliente con la interfaz básica de Redis (get/set/delete/incr/mget):
+- USER_CACHE_BACKEND=memory (por defecto): LocalRedis, en proceso
+- USER_CACHE_BACKEND=redis: redis.Redis.from_url(REDIS_URL), compartido entre workers
+- USER_CACHE_BACKEND=off: sin caché
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from .models.user import User
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))
+
+# Claves máximas del almacén en proceso; al superarlas se expulsan las menos usadas
+LOCAL_CACHE_MAX_KEYS = int(os.getenv("LOCAL_CACHE_MAX_KEYS", 100_000))
+
+# Cada cuánto (segundos) una escritura recorre el almacén para borrar las claves caducadas
+LOCAL_CACHE_PURGE_INTERVAL = 60
+
+# Columnas que se guardan en caché (todas las de la tabla users)
+USER_COLUMNS = ("id", "username", "email", "device_id", "created_at", "updated_at")
+DATETIME_COLUMNS = ("created_at", "updated_at")
+
+Value = Union[str, bytes]
+
+
+class LocalRedis:
+    """
+    Sustituto en proceso de un servidor Redis (solo las órdenes que usa la caché)
+
+    Sirve como almacén por defecto con un solo worker y para probar el mismo código que
+    se ejecuta contra Redis sin necesitar un servidor. Está acotado como un LRU de
+    max_keys claves y las escrituras purgan de vez en cuando las caducadas, así los
+    dispositivos que ya no vuelven no se quedan en memoria toda la vida del proceso.
+
+    Expulsar un contador de versión es seguro: las entradas se leen junto con su versión
+    (que queda como la más reciente) y una versión perdida vale 0, que no coincide con
+    la de ninguna entrada guardada después de una invalidación.
+    """
+
+    def __init__(self, clock=time.monotonic, max_keys: int = LOCAL_CACHE_MAX_KEYS):
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.max_keys = max_keys
+        self._next_purge = clock() + LOCAL_CACHE_PURGE_INTERVAL
+
+    def _alive(self, key: str) -> Optional[tuple]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: tuple):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        now = self._clock()
+        if now >= self._next_purge:
+            self._next_purge = now + LOCAL_CACHE_PURGE_INTERVAL
+            for expired in [k for k, (_, expires) in self._data.items() if expires is not None and expires <= now]:
+                del self._data[expired]
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._alive(key)
+            return entry[0] if entry else None
+
+    def mget(self, *keys: str) -> List[Optional[bytes]]:
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = tuple(keys[0])
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        elif isinstance(value, int):
+            value = str(value).encode("utf-8")
+        with self._lock:
+            self._store(key, (value, self._clock() + ex if ex else None))
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self._alive(key)
+            value = int(entry[0]) + 1 if entry else 1
+            self._store(key, (str(value).encode("utf-8"), entry[1] if entry else None))
+            return value
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+        return True
+
+
+def _decode(value: Optional[Value]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class UserCache:
+    """Caché read-through de User por id y por device_id con invalidación por versión"""
+
+    def __init__(self, client: Any = None, ttl: int = USER_CACHE_TTL, prefix: str = "user"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def _id_key(self, user_id: int) -> str:
+        return f"{self.prefix}:id:{user_id}"
+
+    def _device_key(self, device_id: str) -> str:
+        return f"{self.prefix}:device:{device_id}"
+
+    def _version_key(self, user_id: int) -> str:
+        return f"{self.prefix}:ver:{user_id}"
+
+    def version(self, user_id: int) -> int:
+        return int(_decode(self.client.get(self._version_key(user_id))) or 0)
+
+    @staticmethod
+    def serialize(user: User, version: int) -> str:
+        data = {column: getattr(user, column) for column in USER_COLUMNS}
+        for column in DATETIME_COLUMNS:
+            if data[column] is not None:
+                data[column] = data[column].isoformat()
+        data["_v"] = version
+        return json.dumps(data, separators=(",", ":"))
+
+    @staticmethod
+    def attach(db: Session, data: Dict[str, Any]) -> User:
+        """
+        Reconstruye el User y lo asocia a la sesión sin consultar la base de datos
+
+        Args:
+            db: Sesión de la petición
+            data: Columnas del usuario guardadas en caché
+
+        Returns:
+            User: Instancia persistente (las relaciones se cargan de forma perezosa)
+        """
+        values = {column: data[column] for column in USER_COLUMNS}
+        for column in DATETIME_COLUMNS:
+            if values[column] is not None:
+                values[column] = datetime.fromisoformat(values[column])
+        user = User(**values)
+        # Con identidad conocida el objeto pasa a "detached" y merge no necesita SELECT
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def _read(self, key: str, user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if user_id is not None:
+            raw, version = self.client.mget([key, self._version_key(user_id)])
+        else:
+            raw, version = self.client.get(key), None
+        raw = _decode(raw)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        if version is None and user_id is None:
+            version = self.client.get(self._version_key(data["id"]))
+        if data.get("_v") != int(_decode(version) or 0):
+            return None
+        return data
+
+    def store(self, user: User, version: Optional[int] = None):
+        """
+        Guarda un usuario bajo su id y su device_id
+
+        Args:
+            user: Usuario recién leído o creado
+            version: Versión leída antes de consultar la base (evita guardar datos de una
+                lectura que se cruzó con una escritura); por defecto la actual
+        """
+        if not self.enabled or user is None or user.id is None:
+            return
+        if version is None:
+            version = self.version(user.id)
+        payload = self.serialize(user, version)
+        self.client.set(self._id_key(user.id), payload, ex=self.ttl)
+        if user.device_id:
+            self.client.set(self._device_key(user.device_id), payload, ex=self.ttl)
+
+    def get_by_id(self, db: Session, user_id: int, fill: bool = True) -> Optional[User]:
+        """
+        Usuario por id desde la caché o, si no está, desde la base de datos
+
+        Args:
+            db: Sesión de la petición
+            user_id: Id del usuario
+            fill: Guardar en caché lo leído; False con sesiones de réplica, cuyos datos
+                pueden ser anteriores a la versión actual
+
+        Returns:
+            Optional[User]: Usuario o None si no existe
+        """
+        if not self.enabled:
+            return db.query(User).filter(User.id == user_id).first()
+        data = self._read(self._id_key(user_id), user_id)
+        if data is not None:
+            self.hits += 1
+            return self.attach(db, data)
+        self.misses += 1
+        version = self.version(user_id)
+        user = db.query(User).filter(User.id == user_id).first()
+        if fill:
+            self.store(user, version)
+        return user
+
+    def get_by_device_id(self, db: Session, device_id: str) -> Optional[User]:
+        """Usuario por device_id desde la caché o, si no está, desde la base de datos"""
+        if not self.enabled:
+            return db.query(User).filter(User.device_id == device_id).first()
+        data = self._read(self._device_key(device_id))
+        if data is not None and data["device_id"] == device_id:
+            self.hits += 1
+            return self.attach(db, data)
+        self.misses += 1
+        user = db.query(User).filter(User.device_id == device_id).first()
+        if user is not None:
+            # Hasta consultar no se conoce el id: se lee la versión y se recarga la fila,
+            # así los datos guardados nunca son más viejos que la versión que llevan
+            version = self.version(user.id)
+            db.refresh(user)
+            self.store(user, version)
+        return user
+
+    def invalidate(self, user_id: int, *_args):
+        """Invalida todas las entradas del usuario (firma compatible con app.events)"""
+        if self.enabled:
+            self.client.incr(self._version_key(user_id))
+
+    def clear(self):
+        if self.enabled:
+            self.client.flushdb()
+        self.hits = self.misses = 0
+
+
+def create_client(backend: Optional[str] = None):
+    """
+    Cliente de almacén según USER_CACHE_BACKEND
+
+    Args:
+        backend: "memory", "redis" u "off" (por defecto la variable de entorno)
+
+    Returns:
+        Cliente con interfaz Redis, o None si la caché está desactivada
+    """
+    backend = (backend or os.getenv("USER_CACHE_BACKEND", "memory")).lower()
+    if backend == "off":
+        return None
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.warning("⚠️ USER_CACHE_BACKEND=redis pero el paquete redis no está instalado; se usa caché en proceso")
+            return LocalRedis()
+        return redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return LocalRedis()
+
+
+# Caché compartida por las rutas de usuario y get_current_user
+user_cache = UserCache(create_client())
@@ -0,0 +1,217 @@
+"""
+Buffer de escritura diferida para los cambios de estado de tareas
+Los usuarios alternan una tarea entre pendiente, en_progreso y completada varias veces en
+pocos segundos. Con STATUS_COALESCE_SECONDS > 0, update_task_status no confirma cada
+cambio: lo deja en este buffer y solo el último estado de cada tarea dentro de la ventana
+se escribe, junto con los de otras tareas, en un UPDATE por lotes y un único commit.
+
+Garantías:
+- Ninguna escritura espera más de la ventana: un hilo de fondo vuelca las entradas vencidas.
+- Antes de cualquier otra petición del mismo usuario (lecturas incluidas) se vuelcan sus
+  cambios pendientes (ver get_current_user), así nunca lee un estado anterior ni otra
+  escritura pisa un cambio más nuevo. El buffer vive en la memoria de cada proceso: esta
+  garantía solo se cumple con un único worker; con varios, una petición atendida por
+  otro worker puede leer el estado anterior durante la ventana.
+- Si una tarea desaparece antes del volcado (borrada o archivada) su cambio se descarta;
+  no bloquea el resto del lote.
+- Al apagar la aplicación (lifespan) se vuelca todo.
+Lo que se pierde ante una caída abrupta del proceso está acotado a la ventana.
+
+Con STATUS_COALESCE_SECONDS=0 (por defecto) el buffer está desactivado y cada cambio se
+confirma en la petición, como siempre.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set, Union
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from . import db as database
+from .events import publish_change
+from .models.task import Task
+
+logger = logging.getLogger(__name__)
+
+STATUS_COALESCE_SECONDS = float(os.getenv("STATUS_COALESCE_SECONDS", 0))
+
+# UPDATE de Core con executemany: a diferencia del UPDATE masivo del ORM por clave primaria
+# no comprueba rowcount, así una tarea que ya no existe no hace fallar todo el lote
+_tasks = Task.__table__
+UPDATE_STATUS = (
+    update(_tasks)
+    .where(_tasks.c.id == bindparam("task_id"))
+    .values(status=bindparam("new_status"))
+)
+
+
+@dataclass
+class PendingStatus:
+    user_id: int
+    status: str
+    first_at: float
+
+
+class StatusWriteBuffer:
+    """Agrupa los cambios de estado por tarea y los escribe por lotes"""
+
+    def __init__(self, window: float = STATUS_COALESCE_SECONDS, clock: Callable[[], float] = time.monotonic,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        self.window = window
+        self.clock = clock
+        self.session_factory = session_factory
+        self._pending: Dict[int, PendingStatus] = {}
+        self._by_user: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.updates_received = 0
+        self.rows_written = 0
+        self.commits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def enqueue(self, user_id: int, task_id: int, status: str):
+        """
+        Registra el nuevo estado de una tarea (sustituye al pendiente si lo hay)
+
+        Args:
+            user_id: Dueño de la tarea (ya verificado por la ruta)
+            task_id: Tarea
+            status: Estado validado
+        """
+        with self._lock:
+            self.updates_received += 1
+            pending = self._pending.get(task_id)
+            first_at = pending.first_at if pending else self.clock()
+            self._pending[task_id] = PendingStatus(user_id, status, first_at)
+            self._by_user.setdefault(user_id, set()).add(task_id)
+
+    def pending_status(self, task_id: int) -> Optional[str]:
+        pending = self._pending.get(task_id)
+        return pending.status if pending else None
+
+    def _take(self, task_ids) -> Dict[int, PendingStatus]:
+        taken = {}
+        for task_id in task_ids:
+            pending = self._pending.pop(task_id, None)
+            if pending is None:
+                continue
+            taken[task_id] = pending
+            user_tasks = self._by_user.get(pending.user_id)
+            if user_tasks is not None:
+                user_tasks.discard(task_id)
+                if not user_tasks:
+                    del self._by_user[pending.user_id]
+        return taken
+
+    def _restore(self, entries: Dict[int, PendingStatus]):
+        """Devuelve al buffer lo que no se pudo escribir, salvo que ya haya un estado más nuevo"""
+        with self._lock:
+            for task_id, pending in entries.items():
+                if task_id not in self._pending:
+                    self._pending[task_id] = pending
+                    self._by_user.setdefault(pending.user_id, set()).add(task_id)
+
+    def _write(self, entries: Dict[int, PendingStatus], db: Optional[Session] = None) -> int:
+        if not entries:
+            return 0
+        own_session = db is None
+        if own_session:
+            db = (self.session_factory or database.SessionLocal)()
+        try:
+            # Una sentencia para todo el lote; las tareas que ya no existen no actualizan nada
+            db.execute(UPDATE_STATUS, [
+                {"task_id": task_id, "new_status": pending.status} for task_id, pending in entries.items()
+            ])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self._restore(entries)
+            logger.error(f"❌ Error al volcar {len(entries)} cambios de estado: {str(e)}")
+            raise
+        finally:
+            if own_session:
+                db.close()
+        with self._lock:
+            self.rows_written += len(entries)
+            self.commits += 1
+        for user_id in {pending.user_id for pending in entries.values()}:
+            publish_change(user_id, "task", "update")
+        return len(entries)
+
+    def flush_user(self, user_id: int, db: Optional[Session] = None) -> int:
+        """
+        Escribe los cambios pendientes de un usuario
+
+        Args:
+            user_id: Usuario
+            db: Sesión de la petición (si no, se abre una propia)
+
+        Returns:
+            int: Tareas actualizadas
+        """
+        if user_id not in self._by_user:
+            return 0
+        with self._lock:
+            entries = self._take(list(self._by_user.get(user_id, ())))
+        return self._write(entries, db)
+
+    def flush_due(self, db: Optional[Session] = None) -> int:
+        """Escribe las entradas cuya ventana ya terminó"""
+        deadline = self.clock() - self.window
+        with self._lock:
+            due = [task_id for task_id, pending in self._pending.items() if pending.first_at <= deadline]
+            entries = self._take(due)
+        return self._write(entries, db)
+
+    def flush_all(self, db: Optional[Session] = None) -> int:
+        with self._lock:
+            entries = self._take(list(self._pending))
+        return self._write(entries, db)
+
+    def metrics(self) -> Dict[str, Union[bool, float, int]]:
+        """Contadores: cambios recibidos, filas escritas y commits ahorrados"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_seconds": self.window,
+                "pending": len(self._pending),
+                "updates_received": self.updates_received,
+                "rows_written": self.rows_written,
+                "commits": self.commits,
+                "updates_coalesced": self.updates_received - self.rows_written - len(self._pending),
+                "commits_saved": max(0, self.updates_received - self.commits - len(self._pending)),
+            }
+
+    def _run(self):
+        while not self._stop.wait(max(self.window / 2, 0.05)):
+            try:
+                self.flush_due()
+            except Exception:
+                pass  # ya registrado; las entradas vuelven al buffer y se reintentan
+
+    def start(self) -> "StatusWriteBuffer":
+        if self.enabled and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="status-write-buffer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        """Detiene el hilo de fondo y vuelca todo lo pendiente"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.flush_all()
+
+
+# Buffer compartido por las rutas de tareas
+status_buffer = StatusWriteBuffer()
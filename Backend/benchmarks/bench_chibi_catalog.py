@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los catálogos de chibis
+Compara peticiones por segundo de /chibis/types, /chibis/emotional-states y
+/chibis/preview reconstruyendo la respuesta en cada llamada (handlers anteriores)
+frente a la versión precalculada, y revalidando con If-None-Match (304).
+
+Las peticiones se hacen en proceso sobre ASGI (sin red) para aislar el coste del handler.
+
+Uso:
+    python benchmarks/bench_chibi_catalog.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app import chibi_catalog  # noqa: E402
+from app.chibi_assets import manifest as chibi_manifest  # noqa: E402
+from app.http_cache import CachedPayload  # noqa: E402
+from app.routes import chibi_route  # noqa: E402
+
+
+def build_app() -> FastAPI:
+    """Rutas actuales bajo /chibis y copias de los handlers anteriores bajo /legacy"""
+    app = FastAPI()
+    app.include_router(chibi_route.router)
+
+    # Los handlers anteriores devolvían el dict recién construido y FastAPI lo validaba
+    # y serializaba en cada petición
+    @app.get("/legacy/types")
+    async def legacy_types() -> Dict[str, str]:
+        return chibi_catalog.build_chibi_types()
+
+    @app.get("/legacy/emotional-states")
+    async def legacy_emotional_states() -> Dict[str, str]:
+        return chibi_catalog.build_emotional_states()
+
+    @app.get("/legacy/preview")
+    async def legacy_preview() -> Dict[str, List[Dict[str, str]]]:
+        return chibi_catalog.build_chibi_preview()
+
+    return app
+
+
+def handler_cost_us(fn, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def measure(client: httpx.AsyncClient, url: str, count: int, headers: Dict[str, str] = None) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        response = await client.get(url, headers=headers)
+        assert response.status_code in (200, 304)
+    return count / (time.perf_counter() - start)
+
+
+async def run(count: int):
+    chibi_manifest.build()
+    chibi_catalog.warm()
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"📚 CATÁLOGOS DE CHIBIS ({count:,} peticiones por caso)")
+        print("=" * 98)
+        print(
+            f"{'endpoint':<20} {'antes req/s':>12} {'después req/s':>14} {'304 req/s':>11} {'mejora':>8}"
+            f" {'cuerpo antes':>13} {'después':>9}"
+        )
+        for name in chibi_catalog.CATALOG_BUILDERS:
+            # Calentamiento
+            await measure(client, f"/legacy/{name}", 20)
+            etag = (await client.get(f"/chibis/{name}")).headers["etag"]
+            before = await measure(client, f"/legacy/{name}", count)
+            after = await measure(client, f"/chibis/{name}", count)
+            revalidated = await measure(client, f"/chibis/{name}", count, {"If-None-Match": etag})
+            # Coste de construir y serializar el cuerpo, sin la pila HTTP
+            builder = chibi_catalog.CATALOG_BUILDERS[name]
+            build_us = handler_cost_us(lambda: CachedPayload.from_json(builder()), count)
+            cached_us = handler_cost_us(lambda: chibi_catalog.get_payload(name), count)
+            print(
+                f"{name:<20} {before:>12,.0f} {after:>14,.0f} {revalidated:>11,.0f} {after / before:>7.1f}x"
+                f" {build_us:>11.1f}µs {cached_us:>7.2f}µs"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los catálogos de chibis")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
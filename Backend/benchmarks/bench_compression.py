@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compresión de respuestas
+Mide bytes ahorrados y coste de CPU por codificación para distintos tamaños de listado
+de proyectos, usando los mismos codificadores que CompressionMiddleware.
+
+Uso:
+    python benchmarks/bench_compression.py [--repeat 20] [--json resultados.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.compression import available_encoders  # noqa: E402
+
+# Tamaños objetivo de los cuerpos JSON (bytes)
+SIZE_BUCKETS = [512, 2 * 1024, 16 * 1024, 128 * 1024, 1024 * 1024]
+
+
+def build_payload(target_size: int) -> bytes:
+    """Genera un listado de proyectos con tareas parecido al de get_projects"""
+    projects = []
+    body = b"[]"
+    project_id = 0
+    while len(body) < target_size:
+        project_id += 1
+        projects.append({
+            "id": project_id,
+            "title": f"Proyecto {project_id}",
+            "description": "Repasar los apuntes y preparar el examen final " * 2,
+            "status": "activo",
+            "priority": ["alta", "media", "baja"][project_id % 3],
+            "category": "estudios",
+            "deadline": "2026-06-01T00:00:00",
+            "created_at": "2026-01-10T12:00:00",
+            "updated_at": "2026-01-11T08:30:00",
+            "chibi": "focused_determined.png",
+            "chibi_url": "/static/chibis/focused_determined.png",
+            "tasks": [
+                {
+                    "id": project_id * 10 + n,
+                    "title": f"Tarea {n} del proyecto {project_id}",
+                    "status": ["pendiente", "en_progreso", "completada"][n % 3],
+                    "priority": "media",
+                    "due_date": None,
+                }
+                for n in range(3)
+            ],
+        })
+        body = json.dumps(projects).encode()
+    return body
+
+
+def run(repeat: int) -> list:
+    results = []
+    for size in SIZE_BUCKETS:
+        payload = build_payload(size)
+        for encoding, encoder in available_encoders().items():
+            start = time.process_time()
+            for _ in range(repeat):
+                compressed = encoder(payload)
+            cpu_us = (time.process_time() - start) / repeat * 1_000_000
+            results.append({
+                "bucket_bytes": size,
+                "encoding": encoding,
+                "original_bytes": len(payload),
+                "compressed_bytes": len(compressed),
+                "bytes_saved": len(payload) - len(compressed),
+                "saved_pct": round(100 * (1 - len(compressed) / len(payload)), 1),
+                "cpu_us": round(cpu_us, 1),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de compresión de respuestas")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por tamaño y codificación")
+    parser.add_argument("--json", dest="json_path", help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    print("🗜️  BENCHMARK DE COMPRESIÓN")
+    print("=" * 72)
+    results = run(args.repeat)
+    print(f"{'tamaño':>10} {'codif.':>6} {'original':>10} {'comprimido':>11} {'ahorro':>8} {'CPU (µs)':>10}")
+    for row in results:
+        print(
+            f"{row['bucket_bytes']:>10} {row['encoding']:>6} {row['original_bytes']:>10} "
+            f"{row['compressed_bytes']:>11} {row['saved_pct']:>7}% {row['cpu_us']:>10}"
+        )
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+        print(f"\n📁 Resultados guardados en {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
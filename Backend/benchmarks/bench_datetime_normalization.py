@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de normalización de fechas
+Compara el validador anterior de Task.due_date/Project.deadline (pytz, reescritura de
+strings, datetime.now en cada asignación) con normalize_datetime sobre 1M de asignaciones.
+
+Uso:
+    python benchmarks/bench_datetime_normalization.py [--count 1000000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.datetime_utils import normalize_datetime  # noqa: E402
+from app.models import Task  # noqa: E402
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+
+def legacy_validate_deadline(deadline):
+    """Copia del validador anterior de Project.deadline (solo para comparar)"""
+    if deadline is not None:
+        if isinstance(deadline, str):
+            if not any(x in deadline for x in ['+', '-', 'Z']):
+                deadline = deadline + 'Z'
+            elif deadline.endswith('Z'):
+                deadline = deadline[:-1] + '+00:00'
+            deadline_date = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+            current = datetime.now(pytz.UTC if pytz else timezone.utc)
+            if deadline_date.tzinfo is None:
+                deadline_date = deadline_date.replace(tzinfo=timezone.utc)
+            deadline_date.date() < current.date()
+            return deadline_date
+        return deadline
+    return deadline
+
+
+def legacy_validate_due_date(due_date):
+    """Copia del validador anterior de Task.due_date (solo para comparar)"""
+    if due_date is None:
+        return None
+    if isinstance(due_date, str):
+        due_date = datetime.fromisoformat(due_date)
+    elif not isinstance(due_date, datetime):
+        raise ValueError("due_date debe ser string o datetime")
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=timezone.utc)
+    return due_date
+
+
+INPUTS = {
+    "datetime con zona": datetime(2030, 5, 1, 10, tzinfo=timezone.utc),
+    "datetime sin zona": datetime(2030, 5, 1, 10),
+    "string ISO con Z": "2030-05-01T10:00:00Z",
+    "string ISO sin zona": "2030-05-01T10:00:00",
+}
+
+
+def timed(fn, value, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn(value)
+    return time.perf_counter() - start
+
+
+def timed_assignment(value, count: int) -> float:
+    # Asignación real al atributo instrumentado: dispara @validates('due_date')
+    task = Task(title="bench", status="pendiente", priority="media")
+    start = time.perf_counter()
+    for _ in range(count):
+        task.due_date = value
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de normalización de fechas")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"📅 NORMALIZACIÓN DE FECHAS ({args.count:,} asignaciones por caso)")
+    print("=" * 86)
+    print(f"{'entrada':<22} {'deadline ant.':>13} {'due_date ant.':>13} {'nuevo':>9} {'Task.due_date =':>16}")
+    for label, value in INPUTS.items():
+        old_deadline = timed(legacy_validate_deadline, value, args.count)
+        old_due = timed(legacy_validate_due_date, value, args.count)
+        new = timed(normalize_datetime, value, args.count)
+        assigned = timed_assignment(value, args.count)
+        print(
+            f"{label:<22} {old_deadline:>12.3f}s {old_due:>12.3f}s {new:>8.3f}s {assigned:>15.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de importación masiva
+Genera un NDJSON con proyectos y tareas y mide filas por segundo de import_records
+sobre una base SQLite temporal.
+
+Uso:
+    python benchmarks/bench_import.py [--projects 1000] [--tasks-per-project 50] [--batch-size 2000]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.importer import import_records, parse_ndjson  # noqa: E402
+from app.models import Project, Task, User  # noqa: E402,F401
+
+
+def build_ndjson(projects: int, tasks_per_project: int) -> bytes:
+    lines = []
+    for p in range(projects):
+        lines.append(json.dumps({
+            "type": "project", "ref": f"p{p}", "title": f"Proyecto {p}",
+            "status": "activo", "priority": "media", "category": "importado",
+        }))
+        for t in range(tasks_per_project):
+            lines.append(json.dumps({
+                "type": "task", "project_ref": f"p{p}", "title": f"Tarea {t}",
+                "description": "Importada desde otro planificador",
+                "status": "pendiente", "priority": "media",
+            }))
+    return "\n".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de importación masiva")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks-per-project", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench_import.db")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        with Session() as db:
+            user = User(username="bench_import", device_id="bench_import")
+            db.add(user)
+            db.commit()
+            user_id = user.id
+
+        content = build_ndjson(args.projects, args.tasks_per_project)
+        print("📥 BENCHMARK DE IMPORTACIÓN")
+        print("=" * 50)
+        print(f"📄 {len(content) / 1024 / 1024:.1f} MB de NDJSON")
+
+        with Session() as db:
+            start = time.perf_counter()
+            result = import_records(db, user_id, parse_ndjson(content), batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+
+        print(f"✅ Filas: {result['rows']} (proyectos {result['projects_created']}, tareas {result['tasks_created']})")
+        print(f"⏱️  Tiempo: {elapsed:.2f} s")
+        print(f"🚀 Rendimiento: {result['rows'] / elapsed:,.0f} filas/s")
+        if result["error_count"]:
+            print(f"⚠️  Errores: {result['error_count']}")
+
+
+if __name__ == "__main__":
+    main()
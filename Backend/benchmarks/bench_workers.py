@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Escalado del rendimiento con el número de workers
+Arranca ``python -m app.serve`` con 1, 2, 4… workers sobre una base SQLite temporal con
+datos de prueba, lo somete a carga desde varios procesos cliente con keep-alive y mide
+peticiones por segundo, para comprobar en la máquina de destino si el rendimiento crece
+con los workers antes de fijar WEB_CONCURRENCY.
+
+Uso:
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--duration 10] [--clients 8]
+                                       [--path /lifeplanner/projects/] [--json resultados.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEVICE_ID = "bench_workers"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/lifeplanner/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {timeout:.0f} s")
+
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, body: dict = None) -> bytes:
+    headers = {"X-Device-ID": DEVICE_ID, "Content-Type": "application/json"}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {path} → {response.status}: {data[:200]!r}")
+    return data
+
+
+def seed(port: int, projects: int, tasks_per_project: int):
+    """Crea proyectos y tareas a través de la API para el usuario de la prueba"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    for p in range(projects):
+        project = json.loads(request(conn, "POST", "/lifeplanner/projects/", {
+            "title": f"Proyecto {p}", "description": "Proyecto de carga",
+            "status": "activo", "priority": "media", "category": "bench",
+        }))
+        for t in range(tasks_per_project):
+            request(conn, "POST", f"/lifeplanner/tasks/project/{project['id']}", {
+                "title": f"Tarea {t}", "description": "Tarea de carga", "status": "pendiente",
+                "priority": "media",
+            })
+    conn.close()
+
+
+def client_loop(port: int, path: str, duration: float) -> int:
+    """Proceso cliente: peticiones en serie con una conexión keep-alive durante duration"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        request(conn, "GET", path)
+        done += 1
+    conn.close()
+    return done
+
+
+def run_for_workers(workers: int, args) -> dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), HOST="127.0.0.1",
+                   DATABASE_URL=f"sqlite:///{tmp}/bench_workers.db", GUNICORN_MAX_REQUESTS="0")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.serve"], cwd=BACKEND_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL,
+        )
+        try:
+            wait_ready(port, server)
+            seed(port, args.projects, args.tasks_per_project)
+            # Calentamiento: cada worker carga cachés y abre conexiones
+            with ProcessPoolExecutor(args.clients) as pool:
+                list(pool.map(client_loop, [port] * args.clients, [args.path] * args.clients, [1.0] * args.clients))
+                start = time.perf_counter()
+                counts = list(pool.map(client_loop, [port] * args.clients,
+                                       [args.path] * args.clients, [args.duration] * args.clients))
+                elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    total = sum(counts)
+    return {"workers": workers, "requests": total, "seconds": round(elapsed, 2), "rps": round(total / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalado del rendimiento con el número de workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--path", default="/lifeplanner/projects/")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks-per-project", type=int, default=10)
+    parser.add_argument("--verbose", action="store_true", help="Mostrar los logs del servidor")
+    parser.add_argument("--json", type=Path, help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    print("⚙️ ESCALADO CON WORKERS")
+    print("=" * 50)
+    print(f"🎯 {args.path} · {args.clients} clientes · {args.duration:.0f} s por ronda")
+    results = []
+    for workers in args.workers:
+        result = run_for_workers(workers, args)
+        result["speedup"] = round(result["rps"] / results[0]["rps"], 2) if results else 1.0
+        results.append(result)
+        print(f"👷 {workers:>2} workers: {result['rps']:>9,.1f} req/s  (x{result['speedup']})")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"💾 Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Pruebas de carga de la API con los flujos de la app móvil
+Genera datos (N usuarios × M proyectos × K tareas) en una base SQLite temporal, levanta
+la API en el mismo proceso y ejecuta cada escenario con varios usuarios virtuales
+concurrentes. Emite, por escenario y por endpoint, rendimiento (req/s), latencias
+p50/p95/p99 y consultas SQL por petición, en JSON para comparar entre versiones.
+
+El servidor es uvicorn en un hilo (si está instalado) o, si no, el TestClient de FastAPI
+sobre la app ASGI (sin red; útil para medir consultas y regresiones relativas).
+
+Uso:
+    python benchmarks/run_load.py [--users 50] [--projects 10] [--tasks 20] [--vus 8]
+                                  [--duration 10] [--scenarios open_app create_task]
+                                  [--json resultados.json] [--compare base.json --max-regression 15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.scenarios import SCENARIOS, RequestFailed, VirtualUser  # noqa: E402
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, queries: int) -> dict:
+    """Resumen de una serie de peticiones (latencias en segundos → ms)"""
+    values = sorted(latencies)
+    requests = len(values)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(values) / requests, 2) if requests else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 2),
+        "p95_ms": round(1000 * percentile(values, 95), 2),
+        "p99_ms": round(1000 * percentile(values, 99), 2),
+        "queries_per_request": round(queries / requests, 2) if requests else 0.0,
+    }
+
+
+class Recorder:
+    """Latencias por endpoint compartidas por los hilos de un escenario"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __call__(self, label: str, seconds: float, status_code: int):
+        with self._lock:
+            if status_code >= 400:
+                self.errors[label] += 1
+            else:
+                self.latencies[label].append(seconds)
+
+
+def run_scenario(name: str, clients: list, device_ids: List[str], duration: float, engine) -> dict:
+    """
+    Ejecuta un escenario con un hilo por usuario virtual durante duration segundos
+
+    Args:
+        name: Escenario de SCENARIOS
+        clients: Un cliente HTTP por usuario virtual
+        device_ids: Dispositivos sembrados (se reparten entre usuarios virtuales)
+        duration: Segundos de medición (tras una iteración de calentamiento)
+        engine: Motor de la app, para contar consultas
+
+    Returns:
+        dict: Resumen total y por endpoint
+    """
+    from app.query_counter import QueryCounter
+
+    scenario = SCENARIOS[name]
+    warmup = Recorder()
+    for index, client in enumerate(clients):
+        scenario(VirtualUser(client, device_ids[index % len(device_ids)], warmup))
+
+    recorder = Recorder()
+    failures = []
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int):
+        # Cada usuario virtual recorre sus propios dispositivos para no pisarse
+        users = [
+            VirtualUser(clients[index], device_id, recorder)
+            for device_id in device_ids[index::len(clients)] or [device_ids[index % len(device_ids)]]
+        ]
+        iteration = 0
+        while time.perf_counter() < deadline:
+            try:
+                scenario(users[iteration % len(users)])
+            except RequestFailed as e:
+                failures.append(str(e))
+            iteration += 1
+
+    with QueryCounter(engine) as counter:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(clients))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    result = summarize(all_latencies, sum(recorder.errors.values()), elapsed, counter.count)
+    result["endpoints"] = {
+        label: summarize(values, recorder.errors[label], elapsed, 0)
+        for label, values in sorted(recorder.latencies.items())
+    }
+    for endpoint in result["endpoints"].values():
+        endpoint.pop("queries_per_request")
+    if failures:
+        result["first_failure"] = failures[0]
+    return result
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """
+    Compara con una ejecución anterior
+
+    Args:
+        results: Resultados actuales
+        baseline: Resultados de referencia (mismo formato JSON)
+        max_regression: Porcentaje tolerado de empeoramiento en req/s y p95
+
+    Returns:
+        List[str]: Descripción de cada regresión encontrada
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - max_regression / 100):
+            regressions.append(f"{name}: req/s {previous['rps']} → {current['rps']}")
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression / 100):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms → {current['p95_ms']} ms")
+        if current["queries_per_request"] > previous["queries_per_request"] + 0.01:
+            regressions.append(
+                f"{name}: consultas/petición {previous['queries_per_request']} → {current['queries_per_request']}"
+            )
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, mode: str, vus: int):
+    """
+    Arranca la API y crea un cliente por usuario virtual
+
+    Returns:
+        tuple: (modo usado, clientes, función de parada)
+    """
+    if mode in ("auto", "uvicorn"):
+        try:
+            import httpx
+            import uvicorn
+        except ImportError:
+            if mode == "uvicorn":
+                raise
+        else:
+            port = free_port()
+            server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+            thread = threading.Thread(target=server.run, daemon=True)
+            thread.start()
+            while not server.started:
+                time.sleep(0.05)
+            clients = [httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) for _ in range(vus)]
+
+            def stop():
+                for client in clients:
+                    client.close()
+                server.should_exit = True
+                thread.join()
+
+            return "uvicorn", clients, stop
+
+    from fastapi.testclient import TestClient
+    client = TestClient(app)
+    client.__enter__()  # ejecuta el lifespan una sola vez para todos los hilos
+    return "inprocess", [client] * vus, lambda: client.__exit__(None, None, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de carga de la API LifePlanner")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=10, help="Proyectos por usuario")
+    parser.add_argument("--tasks", type=int, default=20, help="Tareas por proyecto")
+    parser.add_argument("--vus", type=int, default=8, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--server", choices=["auto", "uvicorn", "inprocess"], default="auto")
+    parser.add_argument("--json", type=Path, help="Guardar los resultados en un archivo JSON")
+    parser.add_argument("--compare", type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument("--max-regression", type=float, default=15.0, help="Porcentaje tolerado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # La app lee DATABASE_URL al importarse: se fija antes de importar app.*
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench_load.db"
+        from app.db import engine
+        from app.main import app
+        from benchmarks.seed import seed
+
+        start = time.perf_counter()
+        device_ids = seed(engine, args.users, args.projects, args.tasks)
+        print("📈 PRUEBAS DE CARGA")
+        print("=" * 60)
+        print(f"🌱 Datos: {args.users} usuarios × {args.projects} proyectos × {args.tasks} tareas "
+              f"({time.perf_counter() - start:.1f} s)")
+
+        mode, clients, stop = start_server(app, args.server, args.vus)
+        print(f"🖥️  Servidor: {mode} · {args.vus} usuarios virtuales · {args.duration:.0f} s por escenario")
+        scenarios = {}
+        try:
+            for name in args.scenarios:
+                result = run_scenario(name, clients, device_ids, args.duration, engine)
+                scenarios[name] = result
+                print(f"🎬 {name:<20} {result['rps']:>8,.1f} req/s  p50 {result['p50_ms']:>7.2f} ms  "
+                      f"p95 {result['p95_ms']:>7.2f} ms  p99 {result['p99_ms']:>7.2f} ms  "
+                      f"{result['queries_per_request']:.1f} consultas/petición"
+                      + (f"  ⚠️ {result['errors']} errores" if result["errors"] else ""))
+        finally:
+            stop()
+            engine.dispose()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "server": mode,
+            "users": args.users, "projects": args.projects, "tasks": args.tasks,
+            "vus": args.vus, "duration": args.duration,
+        },
+        "scenarios": scenarios,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"💾 Resultados guardados en {args.json}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print("❌ Regresiones respecto a la referencia:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print("✅ Sin regresiones respecto a la referencia")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Escenarios de carga basados en los flujos de la app móvil
+Cada escenario es una función que recibe un VirtualUser y hace las mismas peticiones, en
+el mismo orden, que la app en ese flujo. El cliente HTTP puede ser httpx.Client contra un
+servidor local o el TestClient de FastAPI (misma interfaz).
+"""
+
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+API = "/lifeplanner"
+NEXT_STATUS = {"pendiente": "en_progreso", "en_progreso": "completada", "completada": "pendiente"}
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class VirtualUser:
+    """Un dispositivo simulado: su cliente, su X-Device-ID y lo que ya conoce de la API"""
+
+    def __init__(self, client, device_id: str, recorder: Callable[[str, float, int], None],
+                 rng: Optional[random.Random] = None):
+        self.client = client
+        self.device_id = device_id
+        self.record = recorder
+        self.rng = rng or random.Random(device_id)
+        self.project_ids: List[int] = []
+        self.task_status: Dict[int, str] = {}
+
+    def request(self, method: str, path: str, label: str, json: dict = None):
+        start = time.perf_counter()
+        response = self.client.request(method, API + path, json=json, headers={"X-Device-ID": self.device_id})
+        self.record(label, time.perf_counter() - start, response.status_code)
+        if response.status_code >= 400:
+            raise RequestFailed(f"{method} {path} → {response.status_code}")
+        return response
+
+    def load_projects(self) -> list:
+        projects = self.request("GET", "/projects/", "GET /projects/").json()
+        self.project_ids = [project["id"] for project in projects]
+        self.task_status = {task["id"]: task["status"] for project in projects for task in project["tasks"]}
+        return projects
+
+
+def open_app(user: VirtualUser):
+    """Arranque de la app: salud, proyectos con sus tareas, chibi de ánimo y frase del día"""
+    user.request("GET", "/health", "GET /health")
+    user.load_projects()
+    user.request("GET", "/chibis/mood", "GET /chibis/mood")
+    user.request("GET", "/chibis/daily-quote", "GET /chibis/daily-quote")
+
+
+def list_projects(user: VirtualUser):
+    """Pantalla de proyectos y detalle de las tareas de uno de ellos"""
+    user.load_projects()
+    if user.project_ids:
+        project_id = user.rng.choice(user.project_ids)
+        user.request("GET", f"/projects/{project_id}/tasks", "GET /projects/{id}/tasks")
+
+
+def toggle_task_status(user: VirtualUser):
+    """Marcar una tarea como en progreso/completada desde la lista"""
+    if not user.task_status:
+        user.load_projects()
+    if not user.task_status:
+        return
+    task_id = user.rng.choice(list(user.task_status))
+    new_status = NEXT_STATUS[user.task_status[task_id]]
+    user.request("PUT", f"/tasks/{task_id}/status", "PUT /tasks/{id}/status", json={"status": new_status})
+    user.task_status[task_id] = new_status
+
+
+def create_task(user: VirtualUser):
+    """Crear una tarea nueva en uno de los proyectos"""
+    if not user.project_ids:
+        user.load_projects()
+    if not user.project_ids:
+        return
+    project_id = user.rng.choice(user.project_ids)
+    task = user.request("POST", f"/tasks/project/{project_id}", "POST /tasks/project/{id}", json={
+        "title": "Tarea desde benchmark",
+        "description": "Creada por el escenario create_task",
+        "status": "pendiente",
+        "priority": user.rng.choice(["baja", "media", "alta"]),
+    }).json()
+    user.task_status[task["id"]] = task["status"]
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], None]] = {
+    "open_app": open_app,
+    "list_projects": list_projects,
+    "toggle_task_status": toggle_task_status,
+    "create_task": create_task,
+}
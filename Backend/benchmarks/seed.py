@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Generador de datos para benchmarks
+Crea N usuarios × M proyectos × K tareas con inserciones en bloque (executemany), con
+estados, prioridades y fechas variados como los de una cuenta real.
+
+Uso:
+    python benchmarks/seed.py --database-url sqlite:///bench.db [--users 100] [--projects 10] [--tasks 20]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.models import Project, Task, User  # noqa: E402
+
+PROJECT_STATUSES = ["activo", "activo", "activo", "en_pausa", "terminado"]
+TASK_STATUSES = ["pendiente", "pendiente", "en_progreso", "completada"]
+PRIORITIES = ["baja", "media", "alta"]
+CATEGORIES = ["estudios", "trabajo", "personal", "salud"]
+
+# Filas por sentencia executemany
+INSERT_BATCH = 5000
+
+
+DEVICE_PREFIX = "bench-device-"
+
+
+def device_id_for(index: int) -> str:
+    return f"{DEVICE_PREFIX}{index:06d}"
+
+
+def _insert_batched(conn, table, rows: List[dict]):
+    for start in range(0, len(rows), INSERT_BATCH):
+        conn.execute(insert(table), rows[start:start + INSERT_BATCH])
+
+
+def seed(engine: Engine, users: int, projects: int, tasks: int, random_seed: int = 42) -> List[str]:
+    """
+    Llena la base de datos con datos sintéticos
+
+    Args:
+        engine: Motor de la base de datos (se crean las tablas si no existen)
+        users: Número de usuarios
+        projects: Proyectos por usuario
+        tasks: Tareas por proyecto
+        random_seed: Semilla para que dos ejecuciones generen los mismos datos
+
+    Returns:
+        List[str]: device_id de los usuarios creados (cabecera X-Device-ID)
+    """
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    Base.metadata.create_all(bind=engine)
+
+    device_ids = [device_id_for(i) for i in range(users)]
+    with engine.begin() as conn:
+        _insert_batched(conn, User.__table__, [
+            {"username": f"bench_user_{i:06d}", "device_id": device_id,
+             "created_at": now - timedelta(days=rng.randint(0, 365)), "updated_at": now}
+            for i, device_id in enumerate(device_ids)
+        ])
+        # Por prefijo y no con IN: miles de parámetros superan el límite de SQLite
+        user_ids = conn.execute(
+            select(User.id).where(User.device_id.like(f"{DEVICE_PREFIX}%")).order_by(User.id)
+        ).scalars().all()
+
+        project_rows = []
+        for user_id in user_ids:
+            for p in range(projects):
+                created = now - timedelta(days=rng.randint(1, 120))
+                project_rows.append({
+                    "title": f"Proyecto {p + 1}",
+                    "description": "Proyecto generado para pruebas de carga",
+                    "status": rng.choice(PROJECT_STATUSES),
+                    "priority": rng.choice(PRIORITIES),
+                    "category": rng.choice(CATEGORIES),
+                    "deadline": now + timedelta(days=rng.randint(-10, 90)),
+                    "created_at": created,
+                    "updated_at": created,
+                    "user_id": user_id,
+                })
+        _insert_batched(conn, Project.__table__, project_rows)
+        project_ids = conn.execute(
+            select(Project.id).join(User).where(User.device_id.like(f"{DEVICE_PREFIX}%")).order_by(Project.id)
+        ).scalars().all()
+
+        task_rows = []
+        for project_id in project_ids:
+            for t in range(tasks):
+                created = now - timedelta(days=rng.randint(0, 60))
+                task_rows.append({
+                    "title": f"Tarea {t + 1}",
+                    "description": "Tarea generada para pruebas de carga",
+                    "status": rng.choice(TASK_STATUSES),
+                    "priority": rng.choice(PRIORITIES),
+                    "due_date": now + timedelta(days=rng.randint(-5, 30)) if rng.random() < 0.7 else None,
+                    "created_at": created,
+                    "updated_at": created,
+                    "project_id": project_id,
+                })
+        _insert_batched(conn, Task.__table__, task_rows)
+    return device_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de datos para benchmarks")
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=10, help="Proyectos por usuario")
+    parser.add_argument("--tasks", type=int, default=20, help="Tareas por proyecto")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    start = time.perf_counter()
+    seed(engine, args.users, args.projects, args.tasks, args.seed)
+    elapsed = time.perf_counter() - start
+    total_tasks = args.users * args.projects * args.tasks
+    print(f"🌱 {args.users} usuarios, {args.users * args.projects} proyectos y {total_tasks} tareas en {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
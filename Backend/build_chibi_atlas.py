@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Script para empaquetar los chibis de Sakura en un único atlas (sprite sheet)
+Genera static/chibis/atlas.png y static/chibis/atlas.json con las coordenadas de cada
+ChibiType, de modo que el cliente descarga una sola imagen en el primer render.
+
+Uso:
+    python build_chibi_atlas.py [--columns 5] [--output-dir static/chibis]
+"""
+
+import argparse
+import json
+import math
+import os
+from typing import Dict
+
+from PIL import Image
+
+from app.chibi_manager import ChibiType
+
+ATLAS_IMAGE = "atlas.png"
+ATLAS_MAP = "atlas.json"
+
+
+def build_atlas(source_dir: str, output_dir: str, columns: int = 5, padding: int = 2) -> Dict:
+    """
+    Empaqueta las imágenes de todos los ChibiType en una cuadrícula
+
+    Args:
+        source_dir: Directorio con los PNG de cada estado
+        output_dir: Directorio donde se guardan atlas.png y atlas.json
+        columns: Columnas de la cuadrícula
+        padding: Separación en píxeles entre celdas (evita sangrado al escalar)
+
+    Returns:
+        Dict: Mapa de coordenadas guardado en atlas.json
+    """
+    images = {}
+    for chibi_type in ChibiType:
+        path = os.path.join(source_dir, f"{chibi_type.value}.png")
+        if not os.path.exists(path):
+            print(f"⚠️  Falta {path}, se omite del atlas")
+            continue
+        with Image.open(path) as img:
+            images[chibi_type.value] = img.convert("RGBA")
+
+    if not images:
+        raise SystemExit("❌ No hay imágenes de chibis para empaquetar")
+
+    cell_width = max(img.width for img in images.values())
+    cell_height = max(img.height for img in images.values())
+    rows = math.ceil(len(images) / columns)
+    width = columns * cell_width + (columns - 1) * padding
+    height = rows * cell_height + (rows - 1) * padding
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    frames = {}
+    for index, (name, img) in enumerate(images.items()):
+        x = (index % columns) * (cell_width + padding)
+        y = (index // columns) * (cell_height + padding)
+        atlas.paste(img, (x, y))
+        frames[name] = {"x": x, "y": y, "w": img.width, "h": img.height}
+
+    os.makedirs(output_dir, exist_ok=True)
+    atlas.save(os.path.join(output_dir, ATLAS_IMAGE), "PNG", optimize=True)
+
+    atlas_map = {
+        "image": ATLAS_IMAGE,
+        "width": width,
+        "height": height,
+        "frames": frames,
+    }
+    with open(os.path.join(output_dir, ATLAS_MAP), "w", encoding="utf-8") as f:
+        json.dump(atlas_map, f, indent=2)
+    return atlas_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el atlas de chibis")
+    parser.add_argument("--source-dir", default="static/chibis")
+    parser.add_argument("--output-dir", default="static/chibis")
+    parser.add_argument("--columns", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🧩 GENERANDO ATLAS DE CHIBIS")
+    print("=" * 50)
+    atlas_map = build_atlas(args.source_dir, args.output_dir, columns=args.columns)
+    print(f"✅ {len(atlas_map['frames'])} chibis en {atlas_map['width']}x{atlas_map['height']} px")
+    print(f"📁 {os.path.join(args.output_dir, ATLAS_IMAGE)}")
+    print(f"📁 {os.path.join(args.output_dir, ATLAS_MAP)}")
+
+
+if __name__ == "__main__":
+    main()
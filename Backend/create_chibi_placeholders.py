@@ -2,11 +2,35 @@
 """
 Script para crear imágenes placeholder de los chibis de Sakura
 Genera imágenes básicas para los 15 estados emocionales
+
+Renderiza en paralelo (un proceso por núcleo), admite varias densidades y formatos, y
+omite las imágenes cuya especificación no ha cambiado desde la última ejecución.
+
+Uso:
+    python create_chibi_placeholders.py [--sizes 1x 2x 3x] [--formats png webp]
+                                        [--output-dir static/chibis] [--workers N] [--force]
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
+import json
 import os
-from typing import Dict, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Tamaño base de los placeholders (1x)
+BASE_SIZE = 256
+
+# Incrementar si cambia el dibujo para invalidar las imágenes ya generadas
+RENDER_VERSION = 1
+
+# Hash de la especificación de cada imagen generada: fuera de static/chibis, que se sirve
+# públicamente (un archivo por directorio de salida)
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "placeholders")
+
+FORMATS = {"png": "PNG", "webp": "WEBP"}
 
 # Configuración de colores de Sakura
 COLORS = {
@@ -119,10 +143,38 @@ def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
-def create_chibi_placeholder(state: str, config: Dict) -> Image.Image:
-    """Crea una imagen placeholder para un estado emocional"""
+def load_font(size: int):
+    """Fuente del sistema del tamaño indicado, o la de PIL por defecto"""
+    try:
+        # Intentar usar una fuente del sistema
+        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", size)
+    except OSError:
+        try:
+            # Fuente alternativa
+            return ImageFont.truetype("/System/Library/Fonts/Arial.ttf", size)
+        except OSError:
+            # Fuente por defecto
+            return ImageFont.load_default()
+
+def create_chibi_placeholder(state: str, config: Dict, size: int = BASE_SIZE) -> Image.Image:
+    """
+    Crea una imagen placeholder para un estado emocional
+    
+    Args:
+        state: Nombre del estado (ChibiType)
+        config: Título, expresión y color del estado
+        size: Lado de la imagen en píxeles; el dibujo se escala desde BASE_SIZE
+        
+    Returns:
+        Image.Image: Imagen RGBA
+    """
+    scale = size / BASE_SIZE
+    
+    def px(value: float) -> int:
+        return round(value * scale)
+    
     # Configuración de la imagen
-    width, height = 256, 256
+    width, height = size, size
     img = Image.new('RGBA', (width, height), (240, 248, 255, 255))  # Fondo azul claro
     draw = ImageDraw.Draw(img)
     
@@ -131,8 +183,8 @@ def create_chibi_placeholder(state: str, config: Dict) -> Image.Image:
     draw.rectangle([0, 0, width, height], fill=bg_color + (100,))  # Con transparencia
     
     # Dibujar círculo para la cabeza (estilo chibi)
-    head_center = (width // 2, height // 2 - 20)
-    head_radius = 60
+    head_center = (width // 2, height // 2 - px(20))
+    head_radius = px(60)
     draw.ellipse([
         head_center[0] - head_radius,
         head_center[1] - head_radius,
@@ -143,98 +195,208 @@ def create_chibi_placeholder(state: str, config: Dict) -> Image.Image:
     # Dibujar cabello (estilo chibi)
     hair_color = hex_to_rgb(COLORS["hair"])
     draw.ellipse([
-        head_center[0] - head_radius - 10,
-        head_center[1] - head_radius - 15,
-        head_center[0] + head_radius + 10,
-        head_center[1] + head_radius - 20
+        head_center[0] - head_radius - px(10),
+        head_center[1] - head_radius - px(15),
+        head_center[0] + head_radius + px(10),
+        head_center[1] + head_radius - px(20)
     ], fill=hair_color)
     
     # Dibujar ojos
     eye_color = hex_to_rgb(COLORS["eyes"])
-    left_eye = (head_center[0] - 20, head_center[1] - 10)
-    right_eye = (head_center[0] + 20, head_center[1] - 10)
-    draw.ellipse([left_eye[0] - 8, left_eye[1] - 8, left_eye[0] + 8, left_eye[1] + 8], fill=eye_color)
-    draw.ellipse([right_eye[0] - 8, right_eye[1] - 8, right_eye[0] + 8, right_eye[1] + 8], fill=eye_color)
+    eye_radius = px(8)
+    left_eye = (head_center[0] - px(20), head_center[1] - px(10))
+    right_eye = (head_center[0] + px(20), head_center[1] - px(10))
+    draw.ellipse([left_eye[0] - eye_radius, left_eye[1] - eye_radius, left_eye[0] + eye_radius, left_eye[1] + eye_radius], fill=eye_color)
+    draw.ellipse([right_eye[0] - eye_radius, right_eye[1] - eye_radius, right_eye[0] + eye_radius, right_eye[1] + eye_radius], fill=eye_color)
     
     # Dibujar uniforme (cuerpo)
     uniform_color = hex_to_rgb(COLORS["uniform_primary"])
-    body_top = head_center[1] + head_radius - 20
-    body_bottom = height - 40
+    body_top = head_center[1] + head_radius - px(20)
+    body_bottom = height - px(40)
     draw.rectangle([
-        head_center[0] - 40,
+        head_center[0] - px(40),
         body_top,
-        head_center[0] + 40,
+        head_center[0] + px(40),
         body_bottom
     ], fill=uniform_color)
     
     # Agregar texto del estado
-    try:
-        # Intentar usar una fuente del sistema
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 16)
-    except:
-        try:
-            # Fuente alternativa
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 16)
-        except:
-            # Fuente por defecto
-            font = ImageFont.load_default()
+    font = load_font(px(16))
     
     # Título del estado
     title = config["title"]
     title_bbox = draw.textbbox((0, 0), title, font=font)
     title_width = title_bbox[2] - title_bbox[0]
     title_x = (width - title_width) // 2
-    draw.text((title_x, 20), title, fill=(0, 0, 0), font=font)
+    draw.text((title_x, px(20)), title, fill=(0, 0, 0), font=font)
     
     # Emoji de expresión
     emoji = config["expression"]
     emoji_bbox = draw.textbbox((0, 0), emoji, font=font)
     emoji_width = emoji_bbox[2] - emoji_bbox[0]
     emoji_x = (width - emoji_width) // 2
-    draw.text((emoji_x, head_center[1] - 50), emoji, fill=(0, 0, 0), font=font)
+    draw.text((emoji_x, head_center[1] - px(50)), emoji, fill=(0, 0, 0), font=font)
     
     # Texto "Sakura"
     sakura_text = "Sakura"
     sakura_bbox = draw.textbbox((0, 0), sakura_text, font=font)
     sakura_width = sakura_bbox[2] - sakura_bbox[0]
     sakura_x = (width - sakura_width) // 2
-    draw.text((sakura_x, height - 40), sakura_text, fill=(0, 0, 0), font=font)
+    draw.text((sakura_x, height - px(40)), sakura_text, fill=(0, 0, 0), font=font)
     
     return img
 
+def parse_size(value: str) -> Tuple[str, int]:
+    """
+    Interpreta un tamaño de la CLI
+    
+    Args:
+        value: Densidad ('1x', '2x', '3x') o lado en píxeles ('128')
+        
+    Returns:
+        Tuple[str, int]: (sufijo del archivo, lado en píxeles)
+    """
+    try:
+        if value.endswith("x"):
+            factor = int(value[:-1])
+            if factor < 1:
+                raise ValueError
+            return ("" if factor == 1 else f"@{factor}x"), BASE_SIZE * factor
+        pixels = int(value)
+        if pixels < 16:
+            raise ValueError
+        return ("" if pixels == BASE_SIZE else f"@{pixels}px"), pixels
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamaño inválido: {value} (usa 1x, 2x, 3x o píxeles >= 16)")
+
+def spec_hash(state: str, config: Dict, size: int, fmt: str) -> str:
+    """Hash de todo lo que determina el contenido de una imagen"""
+    spec = {
+        "state": state,
+        "config": config,
+        "colors": COLORS,
+        "size": size,
+        "format": fmt,
+        "version": RENDER_VERSION,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+def render_job(job: Tuple[str, Dict, int, str, str]) -> Tuple[str, float]:
+    """
+    Renderiza y guarda una imagen (se ejecuta en un proceso del pool)
+    
+    Args:
+        job: (estado, configuración, lado en píxeles, formato, ruta de salida)
+        
+    Returns:
+        Tuple[str, float]: (ruta guardada, segundos empleados)
+    """
+    state, config, size, fmt, filepath = job
+    start = time.perf_counter()
+    img = create_chibi_placeholder(state, config, size)
+    img.save(filepath, FORMATS[fmt])
+    return filepath, time.perf_counter() - start
+
+def spec_path(output_dir: str, spec_dir: str = SPEC_DIR) -> str:
+    key = hashlib.sha1(os.path.abspath(output_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(spec_dir, f"{key}.json")
+
+def load_specs(output_dir: str, spec_dir: str = SPEC_DIR) -> Dict[str, str]:
+    try:
+        with open(spec_path(output_dir, spec_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_specs(output_dir: str, specs: Dict[str, str], spec_dir: str = SPEC_DIR):
+    os.makedirs(spec_dir, exist_ok=True)
+    with open(spec_path(output_dir, spec_dir), "w", encoding="utf-8") as f:
+        json.dump(specs, f, indent=2, sort_keys=True)
+
+def generate_placeholders(
+    output_dir: str = "static/chibis",
+    sizes: Optional[List[Tuple[str, int]]] = None,
+    formats: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    spec_dir: str = SPEC_DIR,
+) -> Dict[str, List]:
+    """
+    Genera los placeholders que falten o cuya especificación haya cambiado
+    
+    Args:
+        output_dir: Directorio de salida
+        sizes: Lista de (sufijo, píxeles); por defecto solo 1x
+        formats: Formatos de salida; por defecto solo png
+        workers: Procesos en paralelo (1 = en el proceso actual)
+        force: Regenerar aunque el hash de la especificación no haya cambiado
+        spec_dir: Dónde guardar los hashes (por defecto Backend/.cache/placeholders)
+        
+    Returns:
+        Dict[str, List]: 'created' con (archivo, segundos) y 'skipped' con archivos
+    """
+    sizes = sizes or [parse_size("1x")]
+    formats = formats or ["png"]
+    os.makedirs(output_dir, exist_ok=True)
+    
+    specs = load_specs(output_dir, spec_dir)
+    pending = []
+    skipped = []
+    for state, config in EMOTIONAL_STATES.items():
+        for suffix, size in sizes:
+            for fmt in formats:
+                filename = f"{state}{suffix}.{fmt}"
+                digest = spec_hash(state, config, size, fmt)
+                filepath = os.path.join(output_dir, filename)
+                if not force and specs.get(filename) == digest and os.path.exists(filepath):
+                    skipped.append(filename)
+                    continue
+                pending.append(((state, config, size, fmt, filepath), filename, digest))
+    
+    jobs = [job for job, _, _ in pending]
+    if workers == 1 or len(jobs) <= 1:
+        results = list(map(render_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render_job, jobs))
+    
+    created = []
+    for (_, filename, digest), (_, seconds) in zip(pending, results):
+        specs[filename] = digest
+        created.append((filename, seconds))
+    if created:
+        save_specs(output_dir, specs, spec_dir)
+    return {"created": created, "skipped": skipped}
+
 def main():
     """Función principal que crea todas las imágenes placeholder"""
+    parser = argparse.ArgumentParser(description="Genera los placeholders de los chibis de Sakura")
+    parser.add_argument("--output-dir", default="static/chibis")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[parse_size("1x")],
+                        help="Densidades (1x 2x 3x) o lados en píxeles")
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS), default=["png"])
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--force", action="store_true", help="Regenerar aunque no haya cambios")
+    parser.add_argument("--spec-dir", default=SPEC_DIR, help="Directorio de los hashes de especificación")
+    args = parser.parse_args()
+    
     print("🎨 CREANDO IMÁGENES PLACEHOLDER PARA SAKURA")
     print("=" * 50)
     
-    # Crear directorio si no existe
-    output_dir = "static/chibis"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    created_files = []
+    start = time.perf_counter()
+    result = generate_placeholders(
+        args.output_dir, args.sizes, args.formats, workers=args.workers, force=args.force, spec_dir=args.spec_dir
+    )
+    elapsed = time.perf_counter() - start
     
-    for state, config in EMOTIONAL_STATES.items():
-        print(f"📝 Creando: {config['title']} ({state})")
-        
-        # Crear imagen
-        img = create_chibi_placeholder(state, config)
-        
-        # Guardar imagen
-        filename = f"{state}.png"
-        filepath = os.path.join(output_dir, filename)
-        img.save(filepath, "PNG")
-        
-        created_files.append(filename)
-        print(f"✅ Guardado: {filepath}")
+    for filename, seconds in result["created"]:
+        print(f"✅ Guardado: {os.path.join(args.output_dir, filename)} ({seconds * 1000:.0f} ms)")
     
     print("\n" + "=" * 50)
     print("🎓 IMÁGENES CREADAS EXITOSAMENTE")
     print("=" * 50)
-    print(f"📁 Directorio: {output_dir}")
-    print(f"📊 Total de archivos: {len(created_files)}")
-    print("\n📋 Archivos creados:")
-    for filename in created_files:
-        print(f"  - {filename}")
+    print(f"📁 Directorio: {args.output_dir}")
+    print(f"📊 Creados: {len(result['created'])} | Sin cambios: {len(result['skipped'])} | Total: {elapsed:.2f}s")
     
     print("\n💡 Próximos pasos:")
     print("1. Reemplazar estas imágenes placeholder con diseños finales")
@@ -243,4 +405,4 @@ def main():
     print("4. Probar el sistema con: python test_chibi_system.py")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
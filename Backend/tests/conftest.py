@@ -1,29 +1,86 @@
 """
 Configuración global para pytest
+
+Cada proceso de pruebas (uno por worker de pytest-xdist, o el único sin -n) usa su propia
+base SQLite en memoria. El esquema se crea una sola vez por ejecución en una base plantilla
+en disco, compartida por los workers, y cada worker la copia a su memoria con la API de
+backup de SQLite en lugar de repetir el DDL. En paralelo: ``pytest tests -n auto``.
 """
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
-import tempfile
-import os
 
 from app.main import app
 from app.db import Base, get_db
 from app.models import user, project, task
+from app.query_counter import QueryCounter
+from app.read_routing import get_read_db, get_user_read_db
+from app.user_cache import user_cache
 
-# Base de datos temporal para pruebas
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Base en memoria por worker: caché compartida para que cualquier conexión del proceso
+# vea los mismos datos, y StaticPool para que la base no desaparezca entre conexiones
+WORKER_ID = os.getenv("PYTEST_XDIST_WORKER", "main")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///file:lifeplanner_test_{WORKER_ID}?mode=memory&cache=shared&uri=true"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def build_schema_template(path) -> str:
+    """
+    Crea la base plantilla con todas las tablas e índices
+
+    Varios workers pueden llegar a la vez: cada uno escribe en un archivo propio y lo
+    mueve con os.replace, así nadie copia una plantilla a medio crear.
+    """
+    path = str(path)
+    if os.path.exists(path):
+        return path
+    partial = f"{path}.{WORKER_ID}.tmp"
+    template_engine = create_engine(f"sqlite:///{partial}")
+    Base.metadata.create_all(bind=template_engine)
+    template_engine.dispose()
+    os.replace(partial, path)
+    return path
+
+def clone_schema(template_path: str, target_engine=None):
+    """Copia la plantilla sobre la base en memoria con sqlite3.Connection.backup"""
+    target_engine = target_engine or engine
+    source = sqlite3.connect(template_path)
+    try:
+        with target_engine.connect() as conn:
+            source.backup(conn.connection.driver_connection)
+    finally:
+        source.close()
+
+def pytest_configure(config):
+    config._started_at = time.perf_counter()
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if hasattr(config, "workerinput"):
+        return
+    workers = getattr(config.option, "numprocesses", None)
+    mode = f"{workers} workers" if workers else "1 proceso"
+    elapsed = time.perf_counter() - config._started_at
+    terminalreporter.write_line(f"⏱️ Tiempo total de la suite: {elapsed:.2f} s ({mode})")
+
 @pytest.fixture(scope="session")
-def test_db():
-    """Crear base de datos de prueba"""
-    Base.metadata.create_all(bind=engine)
+def test_db(tmp_path_factory):
+    """Crear base de datos de prueba (copia de la plantilla del esquema)"""
+    # Con xdist el directorio padre es común a todos los workers de la ejecución
+    base = tmp_path_factory.getbasetemp()
+    shared = base.parent if WORKER_ID != "main" else base
+    clone_schema(build_schema_template(shared / "schema_template.db"))
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -40,6 +97,38 @@ def db_session(test_db):
     transaction.rollback()
     connection.close()
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Los id y device_id se repiten entre pruebas (rollback): vaciar la caché de usuarios"""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+@pytest.fixture
+def query_budget(db_session):
+    """
+    Falla si un bloque ejecuta más sentencias SQL que su presupuesto
+
+    Mide el peor caso: antes del bloque se vacían la sesión (el cliente comparte
+    db_session con las fixtures y su identity map ocultaría cargas perezosas) y la
+    caché de usuarios.
+
+    Uso:
+        with query_budget(3):
+            client.get("/lifeplanner/projects/", headers=headers)
+    """
+    @contextmanager
+    def check(max_queries: int):
+        db_session.expunge_all()
+        user_cache.clear()
+        with QueryCounter(engine) as counter:
+            yield counter
+        statements = "\n".join(f"  {n}. {sql[:120]}" for n, sql in enumerate(counter.statements, 1))
+        assert counter.count <= max_queries, (
+            f"{counter.count} consultas SQL (presupuesto: {max_queries}):\n{statements}"
+        )
+    return check
+
 @pytest.fixture
 def client(db_session):
     """Crear cliente de prueba para FastAPI"""
@@ -50,6 +139,8 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_user_read_db] = override_get_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -0,0 +1,66 @@
+"""
+Factorías para crear datos de prueba
+Las funciones bulk_* insertan todas las filas con una sola sentencia (INSERT … RETURNING
+con executemany) en lugar de un add/flush por objeto.
+"""
+from typing import Dict, List, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+def create_user(db: Session, **overrides) -> User:
+    """Crea un usuario; username y device_id se derivan del número de usuarios"""
+    index = db.query(User).count() + 1
+    values = {"username": f"usuario_{index}", "device_id": f"device_{index}"}
+    values.update(overrides)
+    user = User(**values)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def bulk_projects(db: Session, user_id: int, count: int, **overrides) -> List[int]:
+    """
+    Inserta proyectos de un usuario en bloque
+
+    Args:
+        db: Sesión de pruebas
+        user_id: Dueño de los proyectos
+        count: Número de proyectos
+        **overrides: Valores comunes para todas las filas
+
+    Returns:
+        List[int]: Ids en orden de creación
+    """
+    rows = [
+        {"title": f"Proyecto {n}", "status": "activo", "priority": "media", "user_id": user_id, **overrides}
+        for n in range(count)
+    ]
+    return list(db.scalars(insert(Project).returning(Project.id, sort_by_parameter_order=True), rows))
+
+def bulk_tasks(db: Session, project_ids: Sequence[int], per_project: int, **overrides) -> List[int]:
+    """
+    Inserta per_project tareas en cada proyecto
+
+    Returns:
+        List[int]: Ids en orden (por proyecto y luego por tarea)
+    """
+    rows = [
+        {"title": f"Tarea {n}", "status": "pendiente", "priority": "media", "project_id": project_id, **overrides}
+        for project_id in project_ids
+        for n in range(per_project)
+    ]
+    if not rows:
+        return []
+    return list(db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows))
+
+def seed_account(db: Session, user: User, projects: int, tasks: int) -> Dict[str, List[int]]:
+    """Crea proyectos × tareas para un usuario y confirma la transacción"""
+    project_ids = bulk_projects(db, user.id, projects)
+    task_ids = bulk_tasks(db, project_ids, tasks)
+    db.commit()
+    return {"project_ids": project_ids, "task_ids": task_ids}
@@ -0,0 +1,163 @@
+"""
+Pruebas de la agenda (tareas vencidas, de hoy y de la semana)
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import text
+from app.agenda import agenda_cache, query_agenda, range_bounds, resolve_timezone
+from app.models.project import Project
+from app.models.task import Task
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+NAIVE_NOW = NOW.replace(tzinfo=None)
+HEADERS = {"X-Device-ID": "test_device_123"}
+
+@pytest.fixture(autouse=True)
+def clear_agenda_cache():
+    """Los ids de usuario se reutilizan entre pruebas (rollback): vaciar la caché"""
+    agenda_cache.clear()
+    yield
+    agenda_cache.clear()
+
+def _add_task(db_session, project, title, due_date, status="pendiente"):
+    task = Task(title=title, status=status, priority="media", due_date=due_date, project_id=project.id)
+    db_session.add(task)
+    db_session.commit()
+    return task
+
+def _titles(tasks):
+    return [task["title"] for task in tasks]
+
+class TestRangeBounds:
+    """Pruebas del cálculo de rangos según la zona horaria"""
+
+    def test_today_in_local_timezone(self):
+        """Probar que "hoy" va de medianoche a medianoche local, expresado en UTC"""
+        start, end = range_bounds("today", resolve_timezone("America/Mexico_City"), NOW)
+        assert start == datetime(2026, 3, 10, 6, 0)
+        assert end == datetime(2026, 3, 11, 6, 0)
+
+    def test_local_date_can_differ_from_utc(self):
+        """Probar que a las 02:00 UTC en Ciudad de México todavía es el día anterior"""
+        late = datetime(2026, 3, 11, 2, 0, tzinfo=timezone.utc)
+        start, _ = range_bounds("today", resolve_timezone("America/Mexico_City"), late)
+        assert start == datetime(2026, 3, 10, 6, 0)
+
+    def test_week_across_dst_change(self):
+        """Probar que la semana respeta el cambio de horario (Madrid, 29 de marzo)"""
+        start, end = range_bounds("week", resolve_timezone("Europe/Madrid"), datetime(2026, 3, 27, 9, 0, tzinfo=timezone.utc))
+        assert start == datetime(2026, 3, 26, 23, 0)
+        assert end == datetime(2026, 4, 2, 22, 0)
+
+    def test_overdue_is_before_now(self):
+        """Probar que las vencidas no tienen inicio y terminan ahora"""
+        assert range_bounds("overdue", resolve_timezone(None), NOW) == (None, NAIVE_NOW)
+
+    def test_invalid_values(self):
+        """Probar que un rango o una zona desconocidos se rechazan"""
+        with pytest.raises(ValueError):
+            range_bounds("month", resolve_timezone(None), NOW)
+        with pytest.raises(ValueError):
+            resolve_timezone("Marte/Olympus")
+
+class TestQueryAgenda:
+    """Pruebas de la consulta de la agenda"""
+
+    def test_buckets(self, db_session, test_user, test_project):
+        """Probar qué tareas entran en cada rango"""
+        _add_task(db_session, test_project, "vencida", NAIVE_NOW - timedelta(days=2))
+        _add_task(db_session, test_project, "esta mañana", NAIVE_NOW - timedelta(hours=2))
+        _add_task(db_session, test_project, "esta tarde", NAIVE_NOW + timedelta(hours=3))
+        _add_task(db_session, test_project, "en tres días", NAIVE_NOW + timedelta(days=3), status="en_progreso")
+        _add_task(db_session, test_project, "en diez días", NAIVE_NOW + timedelta(days=10))
+        _add_task(db_session, test_project, "completada", NAIVE_NOW - timedelta(days=1), status="completada")
+        _add_task(db_session, test_project, "sin fecha", None)
+        utc = resolve_timezone("UTC")
+
+        assert _titles(query_agenda(db_session, test_user.id, "overdue", utc, NOW)) == ["vencida", "esta mañana"]
+        assert _titles(query_agenda(db_session, test_user.id, "today", utc, NOW)) == ["esta mañana", "esta tarde"]
+        assert _titles(query_agenda(db_session, test_user.id, "week", utc, NOW)) == [
+            "esta mañana", "esta tarde", "en tres días"
+        ]
+
+    def test_offset_due_dates_are_stored_in_utc(self, db_session, test_user, test_project):
+        """Probar que una fecha con desplazamiento se guarda en UTC y cae en el rango correcto"""
+        # 23:00 en Ciudad de México (-06:00) son las 05:00 UTC del día siguiente
+        task = _add_task(db_session, test_project, "entrega", "2026-03-10T23:00:00-06:00")
+        db_session.expire(task)
+        assert task.due_date == datetime(2026, 3, 11, 5, 0)
+
+        # A las 22:30 locales todavía no está vencida y sigue siendo de hoy
+        mexico = resolve_timezone("America/Mexico_City")
+        evening = datetime(2026, 3, 11, 4, 30, tzinfo=timezone.utc)
+        assert query_agenda(db_session, test_user.id, "overdue", mexico, evening) == []
+        assert _titles(query_agenda(db_session, test_user.id, "today", mexico, evening)) == ["entrega"]
+
+    def test_only_own_tasks(self, db_session, test_user, test_project):
+        """Probar que no aparecen tareas de otros usuarios"""
+        from tests.factories import create_user
+        other = create_user(db_session, device_id="otro_dispositivo")
+        other_project = Project(title="Ajeno", user_id=other.id)
+        db_session.add(other_project)
+        db_session.commit()
+        _add_task(db_session, other_project, "ajena", NAIVE_NOW - timedelta(days=1))
+        assert query_agenda(db_session, test_user.id, "overdue", resolve_timezone(None), NOW) == []
+
+    def test_uses_partial_index(self, db_session, test_user):
+        """Probar que la consulta recorre el índice parcial de tareas abiertas, no el historial"""
+        from sqlalchemy import select
+        from sqlalchemy.dialects import sqlite
+        start, end = range_bounds("week", resolve_timezone(None), NOW)
+        stmt = (
+            select(Task).join(Project, Task.project_id == Project.id)
+            .where(Project.user_id == test_user.id)
+            .where(text("tasks.status <> 'completada'"))
+            .where(Task.due_date >= start).where(Task.due_date < end)
+        )
+        sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        plan = " ".join(row[3] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        assert "ix_tasks_open_project_due" in plan
+        assert "ix_projects_user_id" in plan
+
+class TestAgendaEndpoint:
+    """Pruebas de GET /lifeplanner/tasks/agenda"""
+
+    def test_overdue(self, client, test_project, db_session):
+        """Probar la respuesta del endpoint y que el rango por defecto es hoy"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        _add_task(db_session, test_project, "atrasada", now - timedelta(days=1))
+
+        response = client.get("/lifeplanner/tasks/agenda?range=overdue&tz=Europe/Madrid", headers=HEADERS)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["range"] == "overdue"
+        assert body["timezone"] == "Europe/Madrid"
+        assert body["start"] is None
+        assert _titles(body["tasks"]) == ["atrasada"]
+
+        response = client.get("/lifeplanner/tasks/agenda", headers=HEADERS)
+        assert response.json()["range"] == "today"
+
+    def test_completing_a_task_invalidates_cache(self, client, test_project, db_session):
+        """Probar que al completar una tarea desaparece de la agenda cacheada"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        task = _add_task(db_session, test_project, "atrasada", now - timedelta(days=1))
+        url = "/lifeplanner/tasks/agenda?range=overdue"
+        assert len(client.get(url, headers=HEADERS).json()["tasks"]) == 1
+
+        response = client.put(f"/lifeplanner/tasks/{task.id}/status", json={"status": "completada"}, headers=HEADERS)
+        assert response.status_code == 200
+        assert client.get(url, headers=HEADERS).json()["tasks"] == []
+
+    def test_invalid_timezone(self, client):
+        """Probar que una zona horaria desconocida devuelve 400"""
+        response = client.get("/lifeplanner/tasks/agenda?tz=Nowhere/Land", headers=HEADERS)
+        assert response.status_code == 400
+        assert "Zona horaria inválida" in response.json()["detail"]
+
+    def test_cached_response_skips_database(self, client, query_budget):
+        """Probar que la segunda consulta de la agenda no toca la tabla de tareas"""
+        client.get("/lifeplanner/tasks/agenda?range=week", headers=HEADERS)
+        with query_budget(3) as counter:
+            client.get("/lifeplanner/tasks/agenda?range=week", headers=HEADERS)
+        assert not any("FROM tasks" in sql for sql in counter.statements)
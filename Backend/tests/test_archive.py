@@ -0,0 +1,274 @@
+"""
+Pruebas del archivo de tareas completadas y proyectos terminados
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, text, update
+import app.archive as archive
+from app.archive import ArchiveMover
+from app.events import subscribe, unsubscribe
+from app.models.archive import ArchivedProject, ArchivedTask
+from app.models.project import Project
+from app.models.scheduler_state import SchedulerState
+from app.models.task import Task
+from app.write_buffer import StatusWriteBuffer
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+OLD = datetime(2025, 12, 1, 9, 0)
+RECENT = datetime(2026, 3, 5, 9, 0)
+HEADERS = {"X-Device-ID": "test_device_123"}
+
+@pytest.fixture
+def mover():
+    """Archiva lo terminado hace más de 30 días, en lotes de 2"""
+    return ArchiveMover(after_days=30, batch_size=2, now=lambda: NOW)
+
+def _add_project(db_session, user, title, status="activo", updated_at=RECENT):
+    project = Project(title=title, status=status, user_id=user.id)
+    db_session.add(project)
+    db_session.flush()
+    project.updated_at = updated_at
+    db_session.commit()
+    return project
+
+def _add_task(db_session, project, title, status="completada", updated_at=OLD):
+    task = Task(title=title, status=status, priority="media", project_id=project.id)
+    db_session.add(task)
+    db_session.flush()
+    task.updated_at = updated_at
+    db_session.commit()
+    return task
+
+def _hot_task_titles(db_session):
+    return sorted(db_session.scalars(select(Task.title)))
+
+def _archived_task_titles(db_session):
+    return sorted(db_session.scalars(select(ArchivedTask.title)))
+
+def _archived(db_session, model, original_id):
+    return db_session.scalars(select(model).where(model.original_id == original_id)).one()
+
+def _reopen_before_copy(monkeypatch, db_session, reopen):
+    """Ejecuta reopen justo antes de copiar el lote (tras elegir los candidatos)"""
+    execute = db_session.execute
+    pending = [reopen]
+
+    def execute_with_reopen(statement, *args, **kwargs):
+        table = getattr(statement, "table", None)
+        if pending and table is not None and table.name.startswith("archived_"):
+            execute(pending.pop())
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db_session, "execute", execute_with_reopen)
+
+class TestArchiveMover:
+    """Pruebas del movimiento por lotes a las tablas de archivo"""
+
+    def test_moves_only_old_finished_work(self, db_session, test_user, mover):
+        """Probar qué se archiva: completadas antiguas y proyectos terminados antiguos con todas sus tareas"""
+        active = _add_project(db_session, test_user, "activo")
+        _add_task(db_session, active, "completada antigua")
+        _add_task(db_session, active, "completada reciente", updated_at=RECENT)
+        _add_task(db_session, active, "pendiente antigua", status="pendiente")
+        finished = _add_project(db_session, test_user, "terminado", status="terminado", updated_at=OLD)
+        _add_task(db_session, finished, "abierta de proyecto terminado", status="pendiente", updated_at=RECENT)
+        _add_project(db_session, test_user, "terminado reciente", status="terminado")
+        finished_id = finished.id
+
+        totals = mover.run(db_session)
+
+        assert totals == {"projects": 1, "tasks": 1, "batches": 2}
+        assert _hot_task_titles(db_session) == ["completada reciente", "pendiente antigua"]
+        assert _archived_task_titles(db_session) == ["abierta de proyecto terminado", "completada antigua"]
+        assert db_session.get(Project, finished_id) is None
+        archived = _archived(db_session, ArchivedProject, finished_id)
+        assert archived.user_id == test_user.id
+        assert archived.archived_at == NOW.replace(tzinfo=None)
+
+    def test_archived_rows_keep_original_data(self, db_session, test_user, test_project, mover):
+        """Probar que la tarea archivada conserva id, proyecto, fechas y usuario"""
+        task = _add_task(db_session, test_project, "informe")
+        task_id, created_at = task.id, task.created_at
+        mover.run(db_session)
+        archived = _archived(db_session, ArchivedTask, task_id)
+        assert (archived.project_id, archived.user_id, archived.created_at, archived.updated_at) == (
+            test_project.id, test_user.id, created_at, OLD
+        )
+
+    def test_reused_id_is_archived_again(self, db_session, test_project, mover):
+        """Probar que un id reutilizado por SQLite tras archivar se puede volver a archivar"""
+        first_id = _add_task(db_session, test_project, "primera").id
+        mover.run(db_session)
+        # Sin AUTOINCREMENT, SQLite da a la siguiente fila el id más alto + 1: el recién borrado
+        second_id = _add_task(db_session, test_project, "segunda").id
+        assert second_id == first_id
+
+        assert mover.run(db_session)["tasks"] == 1
+        rows = db_session.execute(
+            select(ArchivedTask.original_id, ArchivedTask.title).order_by(ArchivedTask.id)
+        ).all()
+        assert rows == [(first_id, "primera"), (first_id, "segunda")]
+
+    def test_task_reopened_during_batch_stays_hot(self, db_session, test_project, mover, monkeypatch):
+        """Probar que una tarea reabierta entre la selección y la copia no se archiva ni se borra"""
+        task_id = _add_task(db_session, test_project, "reabierta").id
+        _reopen_before_copy(monkeypatch, db_session, update(Task).where(Task.id == task_id).values(status="pendiente"))
+
+        assert mover.run(db_session)["tasks"] == 0
+        assert _hot_task_titles(db_session) == ["reabierta"]
+        assert _archived_task_titles(db_session) == []
+
+    def test_project_reopened_during_batch_stays_hot(self, db_session, test_user, mover, monkeypatch):
+        """Probar que un proyecto reabierto entre la selección y la copia se queda con sus tareas"""
+        project = _add_project(db_session, test_user, "reabierto", status="terminado", updated_at=OLD)
+        _add_task(db_session, project, "de proyecto reabierto", status="pendiente", updated_at=RECENT)
+        _reopen_before_copy(monkeypatch, db_session,
+                            update(Project).where(Project.id == project.id).values(status="activo"))
+
+        assert mover.run(db_session)["projects"] == 0
+        assert db_session.scalars(select(ArchivedProject)).all() == []
+        assert _hot_task_titles(db_session) == ["de proyecto reabierto"]
+
+    def test_batches_are_resumable(self, db_session, test_project, mover):
+        """Probar que una ejecución interrumpida sigue donde quedó sin duplicar"""
+        for index in range(5):
+            _add_task(db_session, test_project, f"t{index}", updated_at=OLD + timedelta(minutes=index))
+
+        assert mover.run(db_session, max_batches=1)["tasks"] == 2
+        assert db_session.get(SchedulerState, "archive_mover") is None  # no terminó
+        assert _archived_task_titles(db_session) == ["t0", "t1"]
+
+        assert mover.run(db_session)["tasks"] == 3
+        assert _hot_task_titles(db_session) == []
+        assert db_session.get(SchedulerState, "archive_mover").watermark == NOW.replace(tzinfo=None)
+        assert mover.seconds_until_due(db_session) == 24 * 3600
+
+    def test_only_one_worker_claims_the_run(self, db_session, mover):
+        """Probar que entre dos workers solo uno reclama cada intervalo"""
+        other = ArchiveMover(after_days=30, now=lambda: NOW)
+        assert mover.claim_run(db_session)
+        assert not other.claim_run(db_session)
+
+        later = ArchiveMover(after_days=30, now=lambda: NOW + timedelta(hours=24))
+        assert later.claim_run(db_session)
+        assert not ArchiveMover(after_days=30, now=lambda: NOW + timedelta(hours=24)).claim_run(db_session)
+
+    def test_buffered_status_is_flushed_before_archiving(self, db_session, test_user, test_project, mover,
+                                                         monkeypatch):
+        """Probar que un cambio de estado aún en el buffer se escribe antes de elegir candidatas"""
+        task_id = _add_task(db_session, test_project, "reabierta en el buffer").id
+        buffer = StatusWriteBuffer(window=60)
+        buffer.enqueue(test_user.id, task_id, "pendiente")
+        monkeypatch.setattr(archive, "status_buffer", buffer)
+
+        assert mover.run(db_session)["tasks"] == 0
+        assert db_session.get(Task, task_id, populate_existing=True).status == "pendiente"
+        assert _archived_task_titles(db_session) == []
+
+    def test_tasks_with_buffered_status_are_skipped(self, db_session, test_user, test_project, mover, monkeypatch):
+        """Probar que una tarea o un proyecto con un cambio pendiente en el buffer no se archivan"""
+        task_id = _add_task(db_session, test_project, "con cambio pendiente").id
+        finished = _add_project(db_session, test_user, "terminado", status="terminado", updated_at=OLD)
+        buffered_in_project = _add_task(db_session, finished, "de proyecto terminado", status="pendiente").id
+        buffer = StatusWriteBuffer(window=60)
+        buffer.enqueue(test_user.id, task_id, "pendiente")
+        buffer.enqueue(test_user.id, buffered_in_project, "completada")
+        monkeypatch.setattr(archive, "status_buffer", buffer)
+
+        assert mover.archive_projects_batch(db_session) == {}
+        assert mover.archive_tasks_batch(db_session) == {}
+        assert _archived_task_titles(db_session) == []
+
+    def test_publishes_archive_changes(self, db_session, test_user, test_project, mover):
+        """Probar que se avisa a las cachés y al stream del usuario afectado"""
+        _add_task(db_session, test_project, "informe")
+        received = []
+        listener = subscribe(lambda *args: received.append(args))
+        try:
+            mover.run(db_session)
+        finally:
+            unsubscribe(listener)
+        assert received == [(test_user.id, "task", "archive")]
+
+    def test_candidates_come_from_partial_index(self, db_session, mover):
+        """Probar que la búsqueda de candidatos usa el índice parcial de completadas"""
+        from sqlalchemy.dialects import sqlite
+        stmt = (
+            select(Task.id).where(text("tasks.status = 'completada'"))
+            .where(Task.updated_at < mover.cutoff()).order_by(Task.updated_at).limit(2)
+        )
+        sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        plan = " ".join(row[3] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        assert "ix_tasks_completed_updated" in plan
+
+    def test_disabled_by_default(self):
+        """Probar que sin ARCHIVE_AFTER_DAYS no arranca"""
+        assert not ArchiveMover(after_days=0).start().enabled
+
+class TestArchiveEndpoint:
+    """Pruebas de GET /lifeplanner/archive"""
+
+    def test_lists_archived_tasks_and_projects(self, client, db_session, test_user, test_project, mover):
+        """Probar el listado de tareas y proyectos archivados del usuario"""
+        _add_task(db_session, test_project, "informe")
+        finished_id = _add_project(db_session, test_user, "mudanza", status="terminado", updated_at=OLD).id
+        mover.run(db_session)
+
+        tasks = client.get("/lifeplanner/archive", headers=HEADERS).json()
+        assert [task["title"] for task in tasks] == ["informe"]
+        assert tasks[0]["archived_at"] == "2026-03-10T12:00:00"
+
+        projects = client.get("/lifeplanner/archive?kind=projects", headers=HEADERS).json()
+        assert [project["id"] for project in projects] == [finished_id]
+
+        by_project = client.get(f"/lifeplanner/archive?project_id={test_project.id}", headers=HEADERS).json()
+        assert [task["title"] for task in by_project] == ["informe"]
+
+    def test_other_users_archive_is_hidden(self, client, db_session, test_project, mover):
+        """Probar que otro dispositivo no ve el archivo ajeno"""
+        _add_task(db_session, test_project, "informe")
+        mover.run(db_session)
+        response = client.get("/lifeplanner/archive", headers={"X-Device-ID": "otro_dispositivo"})
+        assert response.json() == []
+
+    def test_cursor_pagination(self, client, db_session, test_project, mover):
+        """Probar la paginación por cursor, del más nuevo al más antiguo"""
+        ids = [_add_task(db_session, test_project, f"t{index}").id for index in range(3)]
+        mover.run(db_session)
+
+        first = client.get("/lifeplanner/archive?limit=2", headers=HEADERS)
+        assert [task["id"] for task in first.json()] == [ids[2], ids[1]]
+        cursor = first.json()[-1]["archive_id"]
+        assert first.headers["X-Next-Cursor"] == str(cursor)
+        assert 'rel="next"' in first.headers["Link"]
+
+        second = client.get(f"/lifeplanner/archive?limit=2&before_id={cursor}", headers=HEADERS)
+        assert [task["id"] for task in second.json()] == [ids[0]]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_deleting_user_purges_archive(self, client, db_session, test_user, test_project, mover):
+        """Probar que al borrar un usuario se borra su archivo (un id reutilizado no lo heredaría)"""
+        _add_task(db_session, test_project, "informe")
+        _add_project(db_session, test_user, "mudanza", status="terminado", updated_at=OLD)
+        mover.run(db_session)
+        assert client.delete(f"/lifeplanner/users/{test_user.id}").status_code == 200
+        assert db_session.scalars(select(ArchivedTask)).all() == []
+        assert db_session.scalars(select(ArchivedProject)).all() == []
+
+    def test_deleting_project_purges_its_archived_tasks(self, client, db_session, test_user, test_project, mover):
+        """Probar que al borrar un proyecto se borran sus tareas archivadas, pero no las de otros"""
+        _add_task(db_session, test_project, "del proyecto borrado")
+        other = _add_project(db_session, test_user, "otro")
+        _add_task(db_session, other, "de otro proyecto")
+        mover.run(db_session)
+
+        assert client.delete(f"/lifeplanner/projects/{test_project.id}", headers=HEADERS).status_code == 204
+        assert _archived_task_titles(db_session) == ["de otro proyecto"]
+
+    def test_hot_listing_no_longer_includes_archived(self, client, db_session, test_project, mover):
+        """Probar que los listados de tareas solo devuelven trabajo activo"""
+        _add_task(db_session, test_project, "informe")
+        _add_task(db_session, test_project, "pendiente", status="pendiente", updated_at=RECENT)
+        mover.run(db_session)
+        response = client.get(f"/lifeplanner/projects/{test_project.id}/tasks", headers=HEADERS)
+        assert [task["title"] for task in response.json()] == ["pendiente"]
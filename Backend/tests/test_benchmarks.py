@@ -0,0 +1,67 @@
+"""
+Pruebas para la suite de carga (generador de datos, escenarios y estadísticas)
+"""
+import pytest
+from sqlalchemy import create_engine, func, select
+from app.models import Project, Task, User
+from app.query_counter import QueryCounter
+from benchmarks.run_load import Recorder, compare, percentile, summarize
+from benchmarks.scenarios import SCENARIOS, VirtualUser
+from benchmarks.seed import seed
+
+class TestSeeder:
+    """Pruebas para el generador de datos"""
+
+    def test_seed_counts(self, tmp_path):
+        """Probar que se crean N usuarios × M proyectos × K tareas"""
+        engine = create_engine(f"sqlite:///{tmp_path}/seed.db")
+        device_ids = seed(engine, users=3, projects=2, tasks=4)
+        with engine.connect() as conn:
+            assert conn.scalar(select(func.count()).select_from(User)) == 3
+            assert conn.scalar(select(func.count()).select_from(Project)) == 6
+            assert conn.scalar(select(func.count()).select_from(Task)) == 24
+        assert len(set(device_ids)) == 3
+        engine.dispose()
+
+class TestScenarios:
+    """Pruebas de humo de los escenarios contra la app"""
+
+    @pytest.mark.parametrize("name", sorted(SCENARIOS))
+    def test_scenario_runs_without_errors(self, name, client, test_task):
+        """Probar que cada escenario completa sus peticiones con éxito"""
+        recorder = Recorder()
+        SCENARIOS[name](VirtualUser(client, "test_device_123", recorder))
+        assert recorder.latencies
+        assert not recorder.errors
+
+    def test_query_counter(self, client, test_user, db_session):
+        """Probar que el contador registra las consultas de una petición"""
+        with QueryCounter(db_session.get_bind().engine) as counter:
+            client.get("/lifeplanner/projects/", headers={"X-Device-ID": test_user.device_id})
+        assert counter.count >= 1
+
+class TestStatistics:
+    """Pruebas para percentiles y comparación con una referencia"""
+
+    def test_percentile(self):
+        """Probar percentiles con interpolación"""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 99) == pytest.approx(99.01)
+        assert percentile([], 95) == 0.0
+
+    def test_summarize(self):
+        """Probar el resumen en milisegundos y consultas por petición"""
+        summary = summarize([0.01, 0.02, 0.03, 0.04], errors=1, elapsed=2.0, queries=8)
+        assert summary["requests"] == 4
+        assert summary["rps"] == 2.0
+        assert summary["p50_ms"] == 25.0
+        assert summary["queries_per_request"] == 2.0
+
+    def test_compare_detects_regressions(self):
+        """Probar que se detectan caídas de req/s, subidas de p95 y consultas extra"""
+        baseline = {"scenarios": {"open_app": {"rps": 100, "p95_ms": 10, "queries_per_request": 2}}}
+        same = {"scenarios": {"open_app": {"rps": 95, "p95_ms": 11, "queries_per_request": 2}}}
+        worse = {"scenarios": {"open_app": {"rps": 50, "p95_ms": 30, "queries_per_request": 3}}}
+        assert compare(same, baseline, max_regression=15) == []
+        assert len(compare(worse, baseline, max_regression=15)) == 3
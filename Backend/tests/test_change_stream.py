@@ -0,0 +1,308 @@
+"""
+Pruebas de la difusión de cambios en tiempo real (/lifeplanner/stream)
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import types
+import pytest
+import app.change_stream as change_stream
+from app.change_stream import LocalBroker, RedisBroker, event_stream, format_sse
+from app.events import publish_change
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Broker local aislado y conexiones cortas para que el TestClient devuelva el cuerpo"""
+    broker = LocalBroker(replay=3)
+    monkeypatch.setattr(change_stream, "broker", broker)
+    monkeypatch.setattr(change_stream, "STREAM_MAX_SECONDS", 1.0)
+    monkeypatch.setattr(change_stream, "STREAM_HEARTBEAT_SECONDS", 0.2)
+    return broker
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "event" in fields:
+            events.append({"id": fields.get("id"), "event": fields["event"], **json.loads(fields["data"])})
+    return events
+
+def open_stream(client, broker, user_id: int, headers: dict = None, params: dict = None) -> dict:
+    """Abre el stream en otro hilo y espera a que quede suscrito"""
+    result = {}
+
+    def run():
+        result["response"] = client.get("/lifeplanner/stream", headers=headers, params=params)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while broker.subscriber_count(user_id) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    result["thread"] = thread
+    return result
+
+class TestLocalBroker:
+    """Pruebas del reparto en proceso"""
+
+    def test_events_reach_only_the_owner(self):
+        """Probar que cada conexión recibe solo los cambios de su usuario"""
+        broker = LocalBroker()
+
+        async def scenario():
+            mine = broker.subscribe(1)
+            other = broker.subscribe(2)
+            broker.publish(1, "task", "update")
+            event = await asyncio.wait_for(mine.get(), timeout=1)
+            assert other.queue.empty()
+            return event
+
+        event = asyncio.run(scenario())
+        assert (event["user_id"], event["entity"], event["action"]) == (1, "task", "update")
+
+    def test_publish_from_another_thread(self):
+        """Probar que un commit en un hilo del pool llega a la conexión del bucle de eventos"""
+        broker = LocalBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(7)
+            threading.Thread(target=broker.publish, args=(7, "project", "create")).start()
+            return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        assert asyncio.run(scenario())["action"] == "create"
+
+    def test_slow_client_gets_resync(self):
+        """Probar que si la cola se llena se descartan eventos y se pide recargar"""
+        broker = LocalBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            subscription.queue = asyncio.Queue(maxsize=1)
+            for _ in range(3):
+                broker.publish(1, "task", "update")
+            await asyncio.sleep(0)
+            first = await subscription.get()
+            second = await subscription.get()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first["event"] == "change"
+        assert second["event"] == "resync"
+
+    def test_replay_after_reconnect(self):
+        """Probar el reenvío de eventos perdidos y la recarga si ya no se conservan"""
+        broker = LocalBroker(replay=3)
+        broker.publish(1, "task", "create")
+        first_id = broker.missed_since(1, 0)[0]["id"]
+        broker.publish(1, "task", "update")
+        assert [event["action"] for event in broker.missed_since(1, first_id)] == ["update"]
+
+        for _ in range(3):
+            broker.publish(1, "task", "delete")
+        assert broker.missed_since(1, first_id) is None
+
+    def test_ids_increase(self):
+        """Probar que los ids de eventos son crecientes (válidos para Last-Event-ID)"""
+        broker = LocalBroker()
+        ids = [broker.next_id() for _ in range(100)]
+        assert ids == sorted(set(ids))
+
+    def test_history_of_idle_users_is_evicted(self):
+        """Probar que el historial de usuarios sin conexiones se descarta y que al reconectar se pide recargar"""
+        now = [0.0]
+        broker = LocalBroker(replay=3, replay_seconds=10, clock=lambda: now[0])
+        broker.publish(1, "task", "create")
+        old_id = broker.missed_since(1, 0)[0]["id"]
+
+        async def scenario():
+            broker.subscribe(2)
+            broker.publish(2, "task", "create")
+            now[0] = 11
+            broker.publish(3, "task", "create")
+
+        asyncio.run(scenario())
+        # El usuario 1 se descarta; el 2 sigue conectado y conserva su historial
+        assert broker.history_size() == 2
+        assert broker.missed_since(1, old_id - 1) is None
+        assert broker.missed_since(3, broker.next_id()) == []
+
+    def test_history_is_capped_by_users(self):
+        """Probar el límite de usuarios con historial"""
+        broker = LocalBroker(max_users=2)
+        for user_id in range(5):
+            broker.publish(user_id, "task", "create")
+        assert broker.history_size() == 2
+
+    def test_unsubscribe_on_stream_end(self):
+        """Probar que al terminar la conexión se da de baja la suscripción"""
+        broker = LocalBroker()
+
+        async def connected():
+            return False
+
+        async def scenario():
+            stream = event_stream(broker, 1, connected, heartbeat=0.05, max_seconds=0.12)
+            # Sin empezar el cuerpo (cliente que se va antes) no hay suscripción
+            assert broker.subscriber_count() == 0
+            return [chunk async for chunk in stream]
+
+        body = asyncio.run(scenario())
+        assert body[0].startswith("retry:")
+        assert body[1].startswith("id: ")
+        assert ": keep-alive\n\n" in body
+        assert broker.subscriber_count() == 0
+
+    def test_event_between_subscribe_and_replay_is_sent_once(self):
+        """Probar que un evento publicado mientras se lee el historial llega una sola vez"""
+        broker = LocalBroker()
+        broker.publish(1, "task", "create")
+        last_id = broker.missed_since(1, 0)[0]["id"]
+        missed_since = broker.missed_since
+
+        def publish_during_replay(user_id, event_id):
+            broker.publish(1, "task", "update")
+            return missed_since(user_id, event_id)
+
+        broker.missed_since = publish_during_replay
+
+        async def connected():
+            return False
+
+        async def scenario():
+            return [chunk async for chunk in event_stream(broker, 1, connected, last_event_id=str(last_id),
+                                                          heartbeat=0.05, max_seconds=0.12)]
+
+        events = parse_events("".join(asyncio.run(scenario())))
+        assert [event["action"] for event in events] == ["update"]
+
+class TestRedisBroker:
+    """Pruebas del reparto entre workers con un cliente Redis simulado"""
+
+    def test_events_published_in_one_worker_reach_another(self):
+        """Probar que lo publicado por un worker llega a las conexiones de otro"""
+        published = []
+
+        class FakeRedis:
+            def publish(self, channel, message):
+                published.append((channel, message))
+
+        worker_a = RedisBroker(FakeRedis())
+        worker_b = RedisBroker(FakeRedis())
+        worker_a.publish(3, "task", "update")
+        channel, message = published[0]
+        assert channel == change_stream.REDIS_CHANNEL
+
+        async def scenario():
+            subscription = worker_b.subscribe(3)
+            worker_b.deliver(json.loads(message))
+            return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        assert asyncio.run(scenario())["entity"] == "task"
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere fork (POSIX)")
+    def test_listener_restarts_in_forked_worker(self):
+        """Probar que un broker creado y arrancado en el maestro (preload_app) entrega eventos en el worker"""
+        message = json.dumps({"id": 1, "event": "change", "user_id": 3, "entity": "task", "action": "update"})
+        subscribed = threading.Event()
+
+        class FakePubSub:
+            def subscribe(self, channel):
+                pass
+
+            def listen(self):
+                yield {"type": "subscribe"}
+                # Como Redis: solo llega lo publicado después de suscribirse
+                if subscribed.wait(5):
+                    yield {"type": "message", "data": message}
+
+        class FakeRedis:
+            def pubsub(self):
+                return FakePubSub()
+
+        broker = RedisBroker(FakeRedis())
+        broker.start()  # el hilo queda en el maestro y no pasa al hijo
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                async def worker():
+                    subscription = broker.subscribe(3)
+                    subscribed.set()
+                    return await asyncio.wait_for(subscription.get(), timeout=5)
+
+                os.write(write_fd, asyncio.run(worker())["action"].encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd, "rb") as received:
+            assert received.read() == b"update"
+
+    def test_broker_is_not_started_on_import(self, monkeypatch):
+        """Probar que create_broker no arranca el hilo (se arranca en cada worker)"""
+        client = object()
+        fake_redis = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url: client))
+        monkeypatch.setitem(sys.modules, "redis", fake_redis)
+        broker = change_stream.create_broker("redis")
+        assert isinstance(broker, RedisBroker)
+        assert broker.client is client
+        assert broker._thread is None
+
+class TestStreamEndpoint:
+    """Pruebas del endpoint SSE"""
+
+    def test_format_sse(self):
+        """Probar el formato text/event-stream"""
+        text = format_sse({"id": 5, "event": "change", "user_id": 1, "entity": "task", "action": "update"})
+        assert text == 'id: 5\nevent: change\ndata: {"user_id":1,"entity":"task","action":"update"}\n\n'
+
+    def test_task_change_is_pushed(self, client, test_user, test_task, broker):
+        """Probar que un cambio hecho por la API llega al stream del mismo usuario"""
+        stream = open_stream(client, broker, test_user.id, headers={"X-Device-ID": "test_device_123"})
+        assert broker.subscriber_count(test_user.id) == 1
+
+        response = client.put(f"/lifeplanner/tasks/{test_task.id}/status", json={"status": "completada"},
+                              headers={"X-Device-ID": "test_device_123"})
+        assert response.status_code == 200
+        stream["thread"].join()
+
+        response = stream["response"]
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert "content-encoding" not in response.headers
+        events = parse_events(response.text)
+        assert [(e["entity"], e["action"]) for e in events] == [("task", "update")]
+        assert broker.subscriber_count() == 0
+
+    def test_other_users_changes_are_not_pushed(self, client, test_user, broker):
+        """Probar que un usuario no recibe los cambios de otro"""
+        stream = open_stream(client, broker, test_user.id, params={"device_id": "test_device_123"})
+        publish_change(test_user.id + 1000, "project", "create")
+        stream["thread"].join()
+        assert parse_events(stream["response"].text) == []
+
+    def test_last_event_id_replays_missed_events(self, client, test_user, broker):
+        """Probar que al reconectar se reenvían los eventos perdidos"""
+        publish_change(test_user.id, "project", "create")
+        last_id = broker.missed_since(test_user.id, 0)[0]["id"]
+        publish_change(test_user.id, "project", "update")
+
+        response = client.get("/lifeplanner/stream",
+                              headers={"X-Device-ID": "test_device_123", "Last-Event-ID": str(last_id)})
+        events = parse_events(response.text)
+        assert [e["action"] for e in events] == ["update"]
+
+    def test_expired_last_event_id_requests_resync(self, client, test_user, broker):
+        """Probar que si los eventos perdidos ya no se conservan se pide recargar"""
+        publish_change(test_user.id, "task", "create")
+        old_id = broker.missed_since(test_user.id, 0)[0]["id"]
+        for _ in range(3):
+            publish_change(test_user.id, "task", "update")
+
+        response = client.get("/lifeplanner/stream",
+                              headers={"X-Device-ID": "test_device_123", "Last-Event-ID": str(old_id)})
+        assert [e["event"] for e in parse_events(response.text)] == ["resync"]
@@ -0,0 +1,152 @@
+"""
+Pruebas para el ánimo del chibi según la carga de trabajo
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.cache import UserScopedCache
+from app.chibi_manager import ChibiManager, ChibiType
+from app.chibi_mood import mood_cache, workload_signals
+from app.models.task import Task
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture(autouse=True)
+def clear_mood_cache():
+    """Los ids de usuario se reutilizan entre pruebas (rollback): vaciar la caché"""
+    mood_cache.clear()
+    yield
+    mood_cache.clear()
+
+def _add_tasks(db_session, project, *specs):
+    for status, due_date, *updated_at in specs:
+        task = Task(title="t", status=status, priority="media", due_date=due_date, project_id=project.id)
+        if updated_at:
+            task.updated_at = updated_at[0]
+        db_session.add(task)
+    db_session.commit()
+
+def _signals(overdue=0, due_soon=0, completed_today=0, open=1):
+    return {"overdue": overdue, "due_soon": due_soon, "completed_today": completed_today, "open": open}
+
+class TestMoodRules:
+    """Pruebas para las reglas de ánimo de ChibiManager"""
+
+    @pytest.mark.parametrize("signals, expected", [
+        (_signals(overdue=3), ChibiType.TIRED_OVERWHELMED),
+        (_signals(overdue=1, completed_today=5), ChibiType.FOCUSED_STRESSED),
+        (_signals(due_soon=3), ChibiType.NERVOUS_UNCERTAIN),
+        (_signals(completed_today=3), ChibiType.ENERGIZED_MOTIVATED),
+        (_signals(completed_today=1), ChibiType.PROUD_ACCOMPLISHED),
+        (_signals(due_soon=1), ChibiType.FOCUSED_DETERMINED),
+        (_signals(open=0), ChibiType.RELAXED_BREAK),
+        (_signals(), ChibiType.HAPPY_CALM),
+    ])
+    def test_get_mood_chibi(self, signals, expected):
+        """Probar que cada combinación de señales da el estado esperado"""
+        assert ChibiManager.get_mood_chibi(signals) == expected
+
+class TestWorkloadSignals:
+    """Pruebas para la consulta agregada de carga de trabajo"""
+
+    def test_counts_in_one_query(self, db_session, test_project):
+        """Probar los conteos de vencidas, próximas, completadas hoy y abiertas"""
+        from sqlalchemy import event
+        naive_now = NOW.replace(tzinfo=None)
+        _add_tasks(
+            db_session, test_project,
+            ("pendiente", naive_now - timedelta(days=2)),
+            ("en_progreso", naive_now - timedelta(hours=1)),
+            ("pendiente", naive_now + timedelta(hours=3)),
+            ("pendiente", naive_now + timedelta(days=3)),
+            ("pendiente", None),
+            ("completada", naive_now - timedelta(days=5), naive_now - timedelta(days=4)),
+            ("completada", naive_now - timedelta(days=1), naive_now - timedelta(hours=1)),
+        )
+        user_id = test_project.user_id
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        engine = db_session.get_bind().engine
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            signals = workload_signals(db_session, user_id, NOW)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert len(statements) == 1
+        assert signals["overdue"] == 2
+        assert signals["due_soon"] == 1
+        assert signals["open"] == 5
+        assert signals["completed_today"] == 1
+
+    def test_other_users_are_ignored(self, db_session, test_project):
+        """Probar que solo cuentan las tareas del usuario"""
+        _add_tasks(db_session, test_project, ("pendiente", NOW.replace(tzinfo=None) - timedelta(days=1)))
+        assert workload_signals(db_session, test_project.user_id + 1, NOW)["overdue"] == 0
+
+class TestMoodRoute:
+    """Pruebas para GET /lifeplanner/chibis/mood"""
+
+    def test_mood_overwhelmed(self, client, db_session, test_user, test_project):
+        """Probar que con varias tareas vencidas el chibi está abrumado"""
+        past = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1)
+        _add_tasks(db_session, test_project, *[("pendiente", past)] * 3)
+        response = client.get("/lifeplanner/chibis/mood", headers={"X-Device-ID": test_user.device_id})
+        assert response.status_code == 200
+        mood = response.json()
+        assert mood["emotional_state"] == ChibiType.TIRED_OVERWHELMED.value
+        assert mood["signals"]["overdue"] == 3
+        assert mood["chibi_url"].startswith("/static/chibis/tired_overwhelmed")
+
+    def test_mood_invalidated_on_write(self, client, test_user, test_project):
+        """Probar que la caché se invalida al completar tareas desde la API"""
+        headers = {"X-Device-ID": test_user.device_id}
+        assert client.get("/lifeplanner/chibis/mood", headers=headers).json()["signals"]["completed_today"] == 0
+        task = client.post(
+            f"/lifeplanner/tasks/project/{test_project.id}",
+            json={"title": "Repasar", "status": "pendiente", "priority": "media"},
+            headers=headers,
+        ).json()
+        client.put(f"/lifeplanner/tasks/{task['id']}/status", json={"status": "completada"}, headers=headers)
+        mood = client.get("/lifeplanner/chibis/mood", headers=headers).json()
+        assert mood["signals"]["completed_today"] == 1
+        assert mood["emotional_state"] == ChibiType.PROUD_ACCOMPLISHED.value
+
+class TestUserScopedCache:
+    """Pruebas para la caché por usuario"""
+
+    def test_ttl_and_invalidation(self):
+        """Probar caducidad e invalidación por usuario"""
+        now = [0.0]
+        cache = UserScopedCache(ttl=10, clock=lambda: now[0])
+        cache.set(1, "a")
+        cache.set(2, "b")
+        assert cache.get(1) == "a"
+        cache.invalidate(1)
+        assert cache.get(1) is None
+        assert cache.get(2) == "b"
+        now[0] = 11
+        assert cache.get(2) is None
+
+    def test_stale_value_is_not_stored_after_invalidation(self):
+        """Probar que un valor calculado antes de una escritura no se guarda"""
+        cache = UserScopedCache(ttl=10)
+        def factory():
+            cache.invalidate(1)  # escritura concurrente mientras se calcula
+            return "viejo"
+        assert cache.get_or_set(1, factory) == "viejo"
+        assert cache.get(1) is None
+        assert cache.get_or_set(1, lambda: "nuevo") == "nuevo"
+        assert cache.get(1) == "nuevo"
+
+    def test_generations_do_not_grow_with_invalidated_users(self):
+        """Probar que el contador de invalidaciones solo vive mientras hay un cálculo en curso"""
+        cache = UserScopedCache(ttl=10)
+        for user_id in range(1000):
+            cache.get_or_set(user_id, lambda: "valor")
+            cache.invalidate(user_id)
+        assert cache._generations == {} and cache._inflight == {}
+
+        def factory():
+            assert cache._generations == {7: 0}
+            return "valor"
+        cache.get_or_set(7, factory)
+        assert cache._generations == {}
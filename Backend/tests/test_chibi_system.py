@@ -4,6 +4,23 @@ Pruebas unitarias para el sistema de chibis
 import pytest
 from fastapi.testclient import TestClient
 from app.chibi_manager import ChibiManager
+from app.chibi_assets import IMMUTABLE_CACHE_CONTROL, manifest as chibi_manifest
+from app import chibi_images
+from app.chibi_images import DiskLRUCache
+
+@pytest.fixture
+def built_manifest():
+    """Construir el manifiesto de chibis y limpiarlo al terminar"""
+    chibi_manifest.build()
+    yield chibi_manifest
+    chibi_manifest.clear()
+
+@pytest.fixture
+def variant_cache(tmp_path, monkeypatch):
+    """Caché de variantes de chibis en un directorio temporal"""
+    cache = DiskLRUCache(tmp_path / "chibis", max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(chibi_images, "variant_cache", cache)
+    return cache
 
 class TestChibiManager:
     """Pruebas para el ChibiManager"""
@@ -226,3 +243,293 @@ class TestChibiRoutes:
         assert isinstance(preview, dict)
         assert "projects" in preview
         assert "tasks" in preview
+
+    def test_get_chibi_atlas(self, client):
+        """Probar endpoint del atlas de chibis"""
+        response = client.get("/lifeplanner/chibis/atlas")
+        assert response.status_code == 200
+        atlas = response.json()
+        assert len(atlas["frames"]) == 15
+        assert set(atlas["frames"]["happy_calm"]) == {"x", "y", "w", "h"}
+        assert "etag" in response.headers
+        assert "max-age" in response.headers["cache-control"]
+    
+    def test_get_chibi_atlas_not_modified(self, client):
+        """Probar que el atlas responde 304 con un ETag vigente"""
+        etag = client.get("/lifeplanner/chibis/atlas").headers["etag"]
+        response = client.get("/lifeplanner/chibis/atlas", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+class TestChibiAssets:
+    """Pruebas para el manifiesto de chibis con huella de contenido"""
+    
+    def test_chibi_url_is_fingerprinted(self, built_manifest):
+        """Probar que con manifiesto la URL incluye el hash del contenido"""
+        content_hash = built_manifest.content_hash("happy_excited.png")
+        assert content_hash is not None
+        url = ChibiManager.get_chibi_url("happy_excited.png")
+        assert url == f"/static/chibis/happy_excited.{content_hash}.png"
+    
+    def test_fingerprinted_asset_is_immutable(self, client, built_manifest):
+        """Probar que la ruta con huella se sirve con caché inmutable"""
+        url = ChibiManager.get_chibi_url("happy_calm.png")
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    
+    def test_plain_and_stale_urls_are_not_immutable(self, client, built_manifest):
+        """Probar que la ruta sin huella o con huella vieja no se marca inmutable"""
+        plain = client.get("/static/chibis/happy_calm.png")
+        assert plain.status_code == 200
+        assert plain.headers.get("cache-control") != IMMUTABLE_CACHE_CONTROL
+        stale = client.get("/static/chibis/happy_calm.000000000000.png")
+        assert stale.status_code == 200
+        assert stale.headers.get("cache-control") != IMMUTABLE_CACHE_CONTROL
+    
+    def test_atlas_image_is_fingerprinted(self, client, built_manifest):
+        """Probar que la imagen del atlas se referencia con huella y es inmutable"""
+        atlas = client.get("/lifeplanner/chibis/atlas").json()
+        assert atlas["image_url"] == ChibiManager.get_chibi_url("atlas.png")
+        assert atlas["image_url"] != "/static/chibis/atlas.png"
+        image = client.get(atlas["image_url"])
+        assert image.status_code == 200
+        assert image.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+class TestChibiConfigTables:
+    """Pruebas para las tablas de mensajes y consejos"""
+    
+    def test_tables_are_read_only(self):
+        """Probar que las tablas no se pueden modificar y los métodos devuelven copias"""
+        from app.chibi_config import MOTIVATIONAL_MESSAGES, MotivationSystem
+        with pytest.raises(TypeError):
+            MOTIVATIONAL_MESSAGES["happy_excited"] = ()
+        messages = MotivationSystem.get_motivational_messages("happy_excited")
+        messages.append("extra")
+        assert "extra" not in MotivationSystem.get_motivational_messages("happy_excited")
+    
+    def test_study_tips_lookup(self):
+        """Probar búsqueda de consejos por valor, por enum y con valores desconocidos"""
+        from app.chibi_config import DEFAULT_STUDY_TIPS, SchoolSubject, StudySession
+        assert StudySession.get_study_tips_by_subject("matemáticas") == StudySession.get_study_tips_by_subject(SchoolSubject.MATH)
+        assert StudySession.get_study_tips_by_subject("matemáticas")[0] == "Hacer muchos ejercicios prácticos"
+        assert StudySession.get_study_tips_by_subject("alquimia") == list(DEFAULT_STUDY_TIPS)
+        assert StudySession.get_study_tips_by_subject(SchoolSubject.MUSIC) == list(DEFAULT_STUDY_TIPS)
+
+class TestChibiCatalog:
+    """Pruebas para los catálogos de chibis precalculados"""
+    
+    def test_catalog_is_serialized_once(self):
+        """Probar que el catálogo se reutiliza entre peticiones"""
+        from app import chibi_catalog
+        chibi_catalog.clear()
+        assert chibi_catalog.warm() == 4
+        assert chibi_catalog.get_payload("preview") is chibi_catalog.get_payload("preview")
+    
+    @pytest.mark.parametrize("endpoint", ["types", "emotional-states", "preview", "content"])
+    def test_catalog_not_modified(self, client, endpoint):
+        """Probar ETag/304 y Cache-Control en los catálogos"""
+        response = client.get(f"/lifeplanner/chibis/{endpoint}")
+        assert response.status_code == 200
+        assert "max-age" in response.headers["cache-control"]
+        cached = client.get(f"/lifeplanner/chibis/{endpoint}", headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304
+    
+    def test_preview_content(self, client):
+        """Probar que la vista previa mantiene todas las combinaciones"""
+        preview = client.get("/lifeplanner/chibis/preview").json()
+        assert len(preview["projects"]) == 12
+        assert len(preview["tasks"]) == 12
+        assert {"chibi_filename", "chibi_url", "status", "priority", "emotional_state", "emotional_description"} == set(preview["tasks"][0])
+        assert preview["projects"][3]["priority"] == "sin_prioridad"
+    
+    def test_content_matches_single_endpoints(self, client):
+        """Probar que el contenido en bloque coincide con los endpoints individuales"""
+        content = client.get("/lifeplanner/chibis/content").json()
+        messages = client.get("/lifeplanner/chibis/motivational-messages/happy_excited").json()["messages"]
+        assert content["motivational_messages"]["happy_excited"] == messages
+        tips = client.get("/lifeplanner/chibis/study-tips/matemáticas").json()["tips"]
+        assert content["study_tips"]["matemáticas"] == tips
+        assert content["study_tips"]["música"] == content["default_study_tips"]
+    
+    def test_preview_follows_manifest(self, client, built_manifest):
+        """Probar que la vista previa se recalcula al reconstruir el manifiesto"""
+        preview = client.get("/lifeplanner/chibis/preview").json()
+        entry = preview["tasks"][0]
+        assert entry["chibi_url"] == ChibiManager.get_chibi_url(entry["chibi_filename"])
+        assert entry["chibi_url"] != f"/static/chibis/{entry['chibi_filename']}"
+
+class TestDeterministicChibiContent:
+    """Pruebas para la frase del día y el estado aleatorio cacheables"""
+    
+    def test_daily_quote_is_stable_per_day(self, client):
+        """Probar que la frase del día no cambia entre peticiones y caduca a medianoche"""
+        from app.datetime_utils import utc_today
+        first = client.get("/lifeplanner/chibis/daily-quote")
+        second = client.get("/lifeplanner/chibis/daily-quote")
+        assert first.json() == second.json()
+        assert first.json()["date"] == utc_today().isoformat()
+        max_age = int(first.headers["cache-control"].split("max-age=")[1])
+        assert 0 < max_age <= 86400
+        assert first.headers["cache-control"].startswith("public")
+        cached = client.get("/lifeplanner/chibis/daily-quote", headers={"If-None-Match": first.headers["etag"]})
+        assert cached.status_code == 304
+    
+    def test_daily_quote_per_user_is_private(self, client):
+        """Probar la frase del día por usuario"""
+        response = client.get("/lifeplanner/chibis/daily-quote?per_user=true", headers={"X-Device-ID": "device_a"})
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("private")
+    
+    def test_daily_quote_depends_on_date_and_user(self):
+        """Probar que la frase es función determinista de la fecha y el usuario"""
+        from datetime import date, timedelta
+        from app.chibi_config import ChibiConfig
+        day = date(2026, 3, 1)
+        assert ChibiConfig.get_daily_quote(day) == ChibiConfig.get_daily_quote(day)
+        assert ChibiConfig.get_daily_quote(day) in ChibiConfig.DAILY_QUOTES
+        month = {ChibiConfig.get_daily_quote(day + timedelta(days=offset)) for offset in range(30)}
+        assert len(month) > 1
+        users = {ChibiConfig.get_daily_quote(day, f"device_{n}") for n in range(30)}
+        assert len(users) > 1
+    
+    def test_seconds_until_utc_midnight(self):
+        """Probar el cálculo de segundos hasta la medianoche UTC"""
+        from datetime import datetime, timezone, timedelta
+        from app.datetime_utils import seconds_until_utc_midnight
+        assert seconds_until_utc_midnight(datetime(2026, 3, 1, 23, 59, 0, tzinfo=timezone.utc)) == 60
+        assert seconds_until_utc_midnight(datetime(2026, 3, 1, 0, 0, tzinfo=timezone.utc)) == 86400
+        # 01:00 en UTC+2 son las 23:00 UTC del día anterior
+        plus_two = timezone(timedelta(hours=2))
+        assert seconds_until_utc_midnight(datetime(2026, 3, 2, 1, 0, tzinfo=plus_two)) == 3600
+    
+    def test_random_state_with_seed_is_cacheable(self, client):
+        """Probar que con semilla el estado se repite y es cacheable"""
+        first = client.get("/lifeplanner/chibis/random-emotional-state?seed=42")
+        second = client.get("/lifeplanner/chibis/random-emotional-state?seed=42")
+        assert first.json() == second.json()
+        assert first.json()["seed"] == 42
+        assert "max-age" in first.headers["cache-control"]
+    
+    def test_random_state_without_seed_returns_it(self, client):
+        """Probar que sin semilla se devuelve la usada y no se cachea"""
+        response = client.get("/lifeplanner/chibis/random-emotional-state")
+        assert response.headers["cache-control"] == "no-store"
+        state = response.json()
+        replay = client.get(f"/lifeplanner/chibis/random-emotional-state?seed={state['seed']}").json()
+        assert replay["emotional_state"] == state["emotional_state"]
+
+class TestChibiImages:
+    """Pruebas para las variantes redimensionadas de chibis"""
+    
+    def test_resized_webp_variant(self, client, variant_cache):
+        """Probar que se genera una miniatura webp del ancho pedido"""
+        from PIL import Image
+        from io import BytesIO
+        response = client.get("/lifeplanner/chibis/image/happy_calm?w=64&format=webp")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert "etag" in response.headers
+        image = Image.open(BytesIO(response.content))
+        assert image.format == "WEBP"
+        assert image.width == 64
+    
+    def test_variant_is_rendered_once(self, client, variant_cache, monkeypatch):
+        """Probar que la segunda petición se sirve desde disco sin volver a renderizar"""
+        calls = []
+        original = chibi_images.render_variant
+        monkeypatch.setattr(chibi_images, "render_variant", lambda *args: calls.append(args) or original(*args))
+        first = client.get("/lifeplanner/chibis/image/happy_calm?w=32")
+        second = client.get("/lifeplanner/chibis/image/happy_calm?w=32")
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert len(calls) == 1
+        assert len(list(variant_cache.directory.iterdir())) == 1
+    
+    def test_variant_not_modified(self, client, variant_cache):
+        """Probar que el ETag de la variante devuelve 304"""
+        etag = client.get("/lifeplanner/chibis/image/happy_calm?w=48").headers["etag"]
+        response = client.get("/lifeplanner/chibis/image/happy_calm?w=48", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        other = client.get("/lifeplanner/chibis/image/happy_calm?w=64", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+    
+    def test_variant_survives_concurrent_eviction(self, client, variant_cache, monkeypatch):
+        """Probar que si otra petición expulsa la variante recién escrita la respuesta no falla"""
+        original_put = variant_cache.put
+
+        def put_then_evict(key, data):
+            path = original_put(key, data)
+            path.unlink()
+            return path
+
+        monkeypatch.setattr(variant_cache, "put", put_then_evict)
+        response = client.get("/lifeplanner/chibis/image/happy_calm?w=40")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert variant_cache.read("no-existe") is None
+    
+    def test_invalid_image_params(self, client, variant_cache):
+        """Probar validación de tipo, ancho y formato"""
+        assert client.get("/lifeplanner/chibis/image/no_existe").status_code == 422
+        assert client.get("/lifeplanner/chibis/image/happy_calm?w=4").status_code == 422
+        assert client.get("/lifeplanner/chibis/image/happy_calm?format=gif").status_code == 422
+    
+    def test_disk_cache_evicts_least_recently_used(self, tmp_path):
+        """Probar que la caché expulsa primero el archivo con acceso más antiguo"""
+        import os
+        cache = DiskLRUCache(tmp_path, max_bytes=250)
+        cache.put("a", b"x" * 100)
+        cache.put("b", b"x" * 100)
+        os.utime(tmp_path / "a", (1, 1))
+        os.utime(tmp_path / "b", (2, 2))
+        assert cache.read("a") is not None  # "a" pasa a ser el más reciente
+        cache.put("c", b"x" * 100)
+        assert cache.read("b") is None
+        assert cache.read("a") == b"x" * 100
+        assert cache.read("c") is not None
+        assert cache.size() <= 250
+
+class TestChibiPlaceholders:
+    """Pruebas para el generador de placeholders"""
+    
+    def test_generates_sizes_and_formats(self, tmp_path):
+        """Probar que se generan todas las densidades y formatos pedidos en paralelo"""
+        from PIL import Image
+        import create_chibi_placeholders as placeholders
+        sizes = [placeholders.parse_size("1x"), placeholders.parse_size("2x")]
+        output = tmp_path / "chibis"
+        result = placeholders.generate_placeholders(str(output), sizes, ["png", "webp"], workers=2,
+                                                    spec_dir=str(tmp_path / "specs"))
+        assert len(result["created"]) == len(placeholders.EMOTIONAL_STATES) * 4
+        assert result["skipped"] == []
+        assert Image.open(output / "happy_calm.png").size == (256, 256)
+        assert Image.open(output / "happy_calm@2x.webp").size == (512, 512)
+    
+    def test_unchanged_specs_are_skipped(self, tmp_path, monkeypatch):
+        """Probar que solo se regeneran las imágenes cuya especificación cambió"""
+        import create_chibi_placeholders as placeholders
+        output, spec_dir = tmp_path / "chibis", str(tmp_path / "specs")
+        placeholders.generate_placeholders(str(output), workers=1, spec_dir=spec_dir)
+        again = placeholders.generate_placeholders(str(output), workers=1, spec_dir=spec_dir)
+        assert again["created"] == []
+        assert len(again["skipped"]) == len(placeholders.EMOTIONAL_STATES)
+        # Los hashes no quedan en el directorio que se sirve públicamente
+        assert [path.name for path in output.iterdir() if path.name.startswith(".")] == []
+        assert len(list((tmp_path / "specs").iterdir())) == 1
+        
+        (output / "happy_calm.png").unlink()
+        monkeypatch.setitem(placeholders.EMOTIONAL_STATES["relaxed_break"], "color", "#000000")
+        changed = placeholders.generate_placeholders(str(output), workers=1, spec_dir=spec_dir)
+        assert sorted(name for name, _ in changed["created"]) == ["happy_calm.png", "relaxed_break.png"]
+    
+    def test_parse_size(self):
+        """Probar interpretación de tamaños de la CLI"""
+        import argparse
+        import create_chibi_placeholders as placeholders
+        assert placeholders.parse_size("1x") == ("", 256)
+        assert placeholders.parse_size("3x") == ("@3x", 768)
+        assert placeholders.parse_size("128") == ("@128px", 128)
+        with pytest.raises(argparse.ArgumentTypeError):
+            placeholders.parse_size("0x")
@@ -0,0 +1,82 @@
+"""
+Pruebas unitarias para el middleware de compresión
+"""
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.testclient import TestClient
+from app.compression import CompressionMiddleware, negotiate_encoding
+
+@pytest.fixture
+def compression_client():
+    """Aplicación mínima con el middleware de compresión"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, offload_threshold=2000)
+
+    @app.get("/big")
+    def big():
+        return JSONResponse([{"id": i, "title": f"Tarea {i}"} for i in range(200)])
+
+    @app.get("/small")
+    def small():
+        return {"status": "ok"}
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("x" * 5000, media_type="application/octet-stream")
+
+    return TestClient(app)
+
+class TestNegotiation:
+    """Pruebas para la negociación de Accept-Encoding"""
+
+    def test_prefers_client_quality(self):
+        """Probar que gana la codificación con mayor q"""
+        assert negotiate_encoding("gzip;q=0.5, br;q=0.9", ["zstd", "br", "gzip"]) == "br"
+
+    def test_server_order_breaks_ties(self):
+        """Probar que a igual q decide el orden del servidor"""
+        assert negotiate_encoding("gzip, br", ["br", "gzip"]) == "br"
+
+    def test_rejects_q_zero_and_unknown(self):
+        """Probar que q=0 y codificaciones no soportadas se ignoran"""
+        assert negotiate_encoding("gzip;q=0, deflate", ["gzip"]) is None
+        assert negotiate_encoding("", ["gzip"]) is None
+
+    def test_wildcard(self):
+        """Probar el comodín *"""
+        assert negotiate_encoding("*", ["gzip"]) == "gzip"
+
+class TestCompressionMiddleware:
+    """Pruebas para CompressionMiddleware"""
+
+    def test_compresses_large_json(self, compression_client):
+        """Probar que las respuestas JSON grandes se comprimen con gzip"""
+        response = compression_client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()) == 200
+
+    def test_compressed_length_matches_body(self, compression_client):
+        """Probar que Content-Length corresponde al cuerpo comprimido"""
+        with compression_client.stream("GET", "/big", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+        assert int(response.headers["content-length"]) == len(raw)
+        assert gzip.decompress(raw).startswith(b"[")
+
+    def test_skips_small_responses(self, compression_client):
+        """Probar que por debajo del umbral no se comprime"""
+        response = compression_client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_skips_disallowed_content_type(self, compression_client):
+        """Probar que los tipos fuera de la lista no se comprimen"""
+        response = compression_client.get("/text", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_identity_when_not_accepted(self, compression_client):
+        """Probar que sin Accept-Encoding la respuesta va sin comprimir"""
+        response = compression_client.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
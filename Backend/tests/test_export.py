@@ -0,0 +1,76 @@
+"""
+Pruebas para la exportación en streaming de los datos del usuario
+"""
+import json
+import os
+import pytest
+from sqlalchemy import insert
+from app.models.task import Task
+from app.routes.data_route import iter_user_export
+
+def _rss_bytes():
+    """Memoria residente actual del proceso (solo Linux)"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+class TestExportRoutes:
+    """Pruebas para GET /lifeplanner/export"""
+
+    def test_export_ndjson(self, client, test_user, test_project, test_task):
+        """Probar exportación NDJSON con usuario, proyecto y tarea"""
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.get("/lifeplanner/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["type"] for r in records] == ["user", "project", "task"]
+        assert records[0]["id"] == test_user.id
+        assert records[1]["id"] == test_project.id
+        assert "tasks" not in records[1]
+        assert records[2]["id"] == test_task.id
+
+    def test_export_json(self, client, test_user, test_project, test_task):
+        """Probar exportación como documento JSON único"""
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.get("/lifeplanner/export?format=json", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user"]["id"] == test_user.id
+        assert [p["id"] for p in data["projects"]] == [test_project.id]
+        assert [t["id"] for t in data["tasks"]] == [test_task.id]
+
+    def test_export_only_own_data(self, client, test_user, test_project, test_task):
+        """Probar que otro usuario exporta una cuenta vacía"""
+        response = client.get("/lifeplanner/export?format=json", headers={"X-Device-ID": "otro_device_export"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["projects"] == []
+        assert data["tasks"] == []
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="Requiere /proc para medir RSS")
+def test_export_million_tasks_constant_memory(db_session, test_user, test_project):
+    """Probar que exportar 1M de tareas no hace crecer la memoria más allá del presupuesto"""
+    total_tasks = 1_000_000
+    batch = 50_000
+    for start in range(0, total_tasks, batch):
+        db_session.execute(insert(Task), [
+            {"title": f"Tarea {n}", "status": "pendiente", "priority": "media", "project_id": test_project.id}
+            for n in range(start, start + batch)
+        ])
+    db_session.commit()
+
+    budget = 64 * 1024 * 1024
+    exported_bytes = 0
+    baseline = None
+    peak = 0
+    for index, chunk in enumerate(iter_user_export(db_session, test_user.to_dict())):
+        exported_bytes += len(chunk)
+        if index == 10:
+            baseline = _rss_bytes()
+        elif baseline is not None and index % 100 == 0:
+            peak = max(peak, _rss_bytes())
+
+    # El volumen exportado supera con creces el presupuesto: no puede estar en memoria
+    assert exported_bytes > 4 * budget
+    assert peak - baseline < budget
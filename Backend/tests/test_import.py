@@ -0,0 +1,124 @@
+"""
+Pruebas para la importación masiva de proyectos y tareas
+"""
+import json
+from datetime import date, timedelta
+from app.events import subscribe, unsubscribe
+from app.models.project import Project
+from app.models.task import Task
+
+def _ndjson(rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+class TestImportRoutes:
+    """Pruebas para POST /lifeplanner/import"""
+
+    def test_import_ndjson_with_refs(self, client, db_session, test_user):
+        """Probar importación de proyectos y tareas enlazadas por ref"""
+        rows = [
+            {"type": "project", "ref": "p1", "title": "Exámenes", "status": "activo", "priority": "alta"},
+            {"type": "task", "project_ref": "p1", "title": "Repasar", "status": "pendiente", "priority": "media"},
+            {"type": "task", "project_ref": "p1", "title": "Resumir", "status": "en_progreso", "priority": "baja"},
+        ]
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.post("/lifeplanner/import", content=_ndjson(rows), headers=headers)
+        assert response.status_code == 200
+        result = response.json()
+        assert result["projects_created"] == 1
+        assert result["tasks_created"] == 2
+        assert result["errors"] == []
+
+        project = db_session.query(Project).filter(Project.user_id == test_user.id).one()
+        assert sorted(t.title for t in project.tasks) == ["Repasar", "Resumir"]
+
+    def test_import_reports_row_errors(self, client, test_user, test_project):
+        """Probar que las filas inválidas se informan por línea sin frenar las válidas"""
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        rows = [
+            {"type": "task", "project_id": test_project.id, "title": "Válida", "status": "pendiente", "priority": "media"},
+            {"type": "task", "project_id": test_project.id, "title": "Mal estado", "status": "hecha", "priority": "media"},
+            {"type": "task", "project_id": test_project.id, "title": "Pasada", "status": "pendiente", "priority": "media", "due_date": yesterday},
+            {"type": "task", "project_id": 999999, "title": "Ajena", "status": "pendiente", "priority": "media"},
+            {"type": "nota", "title": "?"},
+        ]
+        body = _ndjson(rows) + b"\n{no es json"
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.post("/lifeplanner/import", content=body, headers=headers)
+        assert response.status_code == 200
+        result = response.json()
+        assert result["tasks_created"] == 1
+        assert [error["line"] for error in result["errors"]] == [2, 3, 4, 5, 6]
+        assert result["errors"][0]["errors"][0].startswith("status")
+
+    def test_import_csv(self, client, db_session, test_user):
+        """Probar importación desde CSV con celdas vacías"""
+        body = (
+            "type,ref,project_ref,title,status,priority,description\n"
+            "project,a,,Lecturas,activo,,\n"
+            "task,,a,Capítulo 1,pendiente,media,\n"
+        ).encode()
+        headers = {"X-Device-ID": test_user.device_id, "Content-Type": "text/csv"}
+        response = client.post("/lifeplanner/import", content=body, headers=headers)
+        assert response.status_code == 200
+        result = response.json()
+        assert result["projects_created"] == 1
+        assert result["tasks_created"] == 1
+        task = db_session.query(Task).join(Project).filter(Project.user_id == test_user.id).one()
+        assert task.description is None
+
+    def test_import_empty_body(self, client, test_user):
+        """Probar que un cuerpo vacío devuelve 400"""
+        response = client.post("/lifeplanner/import", content=b"", headers={"X-Device-ID": test_user.device_id})
+        assert response.status_code == 400
+
+    def test_import_stops_on_database_error(self, client, db_session, test_user, test_project, monkeypatch):
+        """Probar que un lote rechazado por la base de datos devuelve 422 con lo ya confirmado"""
+        from functools import partial
+        from sqlalchemy.exc import IntegrityError
+        import app.routes.data_route as data_route
+        monkeypatch.setattr(data_route, "import_records", partial(data_route.import_records, batch_size=2))
+        original_execute = db_session.execute
+        task_inserts = []
+
+        def execute(statement, *args, **kwargs):
+            if getattr(getattr(statement, "table", None), "name", None) == "tasks":
+                task_inserts.append(statement)
+                if len(task_inserts) == 2:
+                    raise IntegrityError(str(statement), {}, Exception("UNIQUE constraint failed"))
+            return original_execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", execute)
+        rows = [
+            {"type": "task", "project_id": test_project.id, "title": f"t{index}", "status": "pendiente", "priority": "media"}
+            for index in range(5)
+        ]
+        response = client.post("/lifeplanner/import", content=_ndjson(rows), headers={"X-Device-ID": test_user.device_id})
+        assert response.status_code == 422
+        detail = response.json()["detail"]
+        assert detail["tasks_created"] == 2
+        assert detail["failed_lines"] == [3, 4]
+        assert detail["reason"] == "IntegrityError"
+
+    def test_import_publishes_change_only_when_something_was_created(self, client, db_session, test_user, test_project,
+                                                                     monkeypatch):
+        """Probar que el aviso de cambio se publica tras importar filas, y no si no se creó nada o falla UTF-8"""
+        headers = {"X-Device-ID": test_user.device_id}
+        user_id, project_id = test_user.id, test_project.id
+        received = []
+        listener = subscribe(lambda *args: received.append(args))
+        try:
+            invalid = [{"type": "task", "project_id": project_id, "title": "Mal", "status": "hecha", "priority": "media"}]
+            assert client.post("/lifeplanner/import", content=_ndjson(invalid), headers=headers).json()["tasks_created"] == 0
+            assert received == []
+
+            valid = [{"type": "task", "project_id": project_id, "title": "Bien", "status": "pendiente", "priority": "media"}]
+            assert client.post("/lifeplanner/import", content=_ndjson(valid), headers=headers).status_code == 200
+            assert received == [(user_id, "task", "import")]
+
+            # El error de codificación revierte la sesión, que aquí comparte transacción con las fixtures
+            monkeypatch.setattr(db_session, "rollback", lambda: None)
+            response = client.post("/lifeplanner/import", content=b"\xff\xfe no es utf-8", headers=headers)
+            assert response.status_code == 400
+        finally:
+            unsubscribe(listener)
+        assert received == [(user_id, "task", "import")]
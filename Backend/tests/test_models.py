@@ -2,7 +2,8 @@
 Pruebas unitarias para los modelos
 """
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from app.datetime_utils import normalize_datetime
 from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
@@ -209,4 +210,49 @@ class TestTaskModel:
         """Probar relaciones de la tarea"""
         assert test_task.project is not None
         assert test_task.project.id == test_project.id
+    
+    def test_task_due_date_normalized(self, test_project):
+        """Probar que due_date se normaliza a UTC con zona horaria"""
+        task = Task(title="Tarea", project_id=test_project.id)
+        task.due_date = "2030-05-01T10:00:00Z"
+        assert task.due_date == datetime(2030, 5, 1, 10, tzinfo=timezone.utc)
+        task.due_date = datetime(2030, 5, 1, 10)
+        assert task.due_date.tzinfo is timezone.utc
+        with pytest.raises(ValueError):
+            task.due_date = "mañana"
 
+class TestDatetimeNormalization:
+    """Pruebas para normalize_datetime"""
+    
+    def test_aware_datetime_fast_path(self):
+        """Probar que un datetime en UTC se devuelve sin copiar y otra zona se pasa a UTC"""
+        value = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        assert normalize_datetime(value) is value
+        local = datetime(2030, 1, 1, tzinfo=timezone(timedelta(hours=-5)))
+        assert normalize_datetime(local) == datetime(2030, 1, 1, 5, 0, tzinfo=timezone.utc)
+        assert normalize_datetime(local).tzinfo is timezone.utc
+    
+    def test_naive_values_assume_utc(self):
+        """Probar que las fechas sin zona se interpretan en UTC"""
+        assert normalize_datetime(datetime(2030, 1, 1)).tzinfo is timezone.utc
+        assert normalize_datetime("2030-01-01T08:30:00") == datetime(2030, 1, 1, 8, 30, tzinfo=timezone.utc)
+    
+    def test_offsets_and_z_suffix(self):
+        """Probar strings con Z y con desplazamiento"""
+        assert normalize_datetime("2030-01-01T08:30:00Z").utcoffset() == timedelta(0)
+        assert normalize_datetime("2030-01-01T08:30:00-03:00") == datetime(2030, 1, 1, 11, 30, tzinfo=timezone.utc)
+        assert normalize_datetime("2030-01-01T08:30:00-03:00").utcoffset() == timedelta(0)
+    
+    def test_invalid_values(self):
+        """Probar que valores inválidos lanzan ValueError"""
+        assert normalize_datetime(None) is None
+        with pytest.raises(ValueError):
+            normalize_datetime("no es fecha")
+        with pytest.raises(ValueError):
+            normalize_datetime(12345)
+    
+    def test_project_invalid_deadline_becomes_none(self, test_user):
+        """Probar que el modelo Project descarta deadlines ilegibles"""
+        project = Project(title="Proyecto", status="activo", user_id=test_user.id)
+        project.deadline = "fecha rota"
+        assert project.deadline is None
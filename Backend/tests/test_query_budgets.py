@@ -0,0 +1,62 @@
+"""
+Presupuestos de consultas SQL por endpoint
+Cada endpoint tiene un máximo de sentencias por petición (peor caso: caché de usuarios
+vacía). Se comprueba con cuentas de 1 y de 5 proyectos × 5 tareas: si un cambio introduce
+una carga perezosa por fila (N+1), la cuenta grande supera el presupuesto.
+
+Al optimizar un endpoint, baja su presupuesto aquí para fijar la mejora.
+"""
+import pytest
+from tests.factories import seed_account
+
+# Dos consultas de get_current_user con la caché de usuarios fría (búsqueda + recarga);
+# las escrituras suman otra al releer el usuario caducado tras el commit
+BUDGETS = {
+    ("GET", "/lifeplanner/projects/"): 3,
+    ("GET", "/lifeplanner/projects/{project_id}"): 3,
+    ("GET", "/lifeplanner/projects/{project_id}/tasks"): 4,
+    ("GET", "/lifeplanner/tasks/"): 3,
+    ("GET", "/lifeplanner/tasks/{task_id}"): 3,
+    ("POST", "/lifeplanner/projects/"): 6,
+    ("PUT", "/lifeplanner/projects/{project_id}"): 7,
+    ("PATCH", "/lifeplanner/projects/{project_id}"): 7,
+    # +1: borrado de sus tareas archivadas
+    ("DELETE", "/lifeplanner/projects/{project_id}"): 8,
+    ("POST", "/lifeplanner/tasks/project/{project_id}"): 6,
+    ("PUT", "/lifeplanner/tasks/{task_id}"): 6,
+    ("PUT", "/lifeplanner/tasks/{task_id}/status"): 6,
+    ("PATCH", "/lifeplanner/tasks/{task_id}/priority"): 6,
+    ("DELETE", "/lifeplanner/tasks/{task_id}"): 5,
+}
+
+BODIES = {
+    ("POST", "/lifeplanner/projects/"): {"title": "Nuevo", "status": "activo"},
+    ("PUT", "/lifeplanner/projects/{project_id}"): {"title": "Editado", "status": "activo"},
+    ("PATCH", "/lifeplanner/projects/{project_id}"): {"title": "Parcheado"},
+    ("POST", "/lifeplanner/tasks/project/{project_id}"): {"title": "Nueva", "status": "pendiente", "priority": "media"},
+    ("PUT", "/lifeplanner/tasks/{task_id}"): {"title": "Editada"},
+    ("PUT", "/lifeplanner/tasks/{task_id}/status"): {"status": "completada"},
+    ("PATCH", "/lifeplanner/tasks/{task_id}/priority"): {"priority": "alta"},
+}
+
+class TestQueryBudgets:
+    """Consultas por petición de lectura y escritura dentro de su presupuesto"""
+
+    @pytest.mark.parametrize("size", [1, 5], ids=["pequeña", "grande"])
+    @pytest.mark.parametrize("endpoint", list(BUDGETS), ids=lambda e: " ".join(e))
+    def test_endpoint_within_budget(self, endpoint, size, client, db_session, test_user, query_budget):
+        """Probar que el endpoint no supera su presupuesto con cuentas de distinto tamaño"""
+        method, path = endpoint
+        account = seed_account(db_session, test_user, projects=size, tasks=size)
+        ids = {"project_id": account["project_ids"][-1], "task_id": account["task_ids"][-1]}
+        headers = {"X-Device-ID": test_user.device_id}
+
+        with query_budget(BUDGETS[endpoint]):
+            response = client.request(method, path.format(**ids), json=BODIES.get(endpoint), headers=headers)
+        assert response.status_code < 400
+
+    def test_budget_failure_lists_statements(self, client, test_user, query_budget):
+        """Probar que al superar el presupuesto el error enumera las sentencias"""
+        with pytest.raises(AssertionError, match=r"(?s)presupuesto: 0.*1\. SELECT"):
+            with query_budget(0):
+                client.get("/lifeplanner/projects/", headers={"X-Device-ID": test_user.device_id})
@@ -0,0 +1,154 @@
+"""
+Pruebas del enrutado de lecturas a la réplica
+Usan dos archivos SQLite (primario y réplica) y SQLiteReplicator como replicación: la
+réplica solo ve los cambios tras sync(), igual que una réplica con retraso.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import db as database
+from app import read_routing
+from app.db import Base, get_db
+from app.main import app
+from app.models.project import Project
+from app.models.user import User
+from app.read_routing import StickyReads, get_read_db, is_replica_session, replica_enabled
+from app.sqlite_replica import SQLiteReplicator, sqlite_path
+from app.user_cache import LocalRedis, user_cache
+
+DEVICE = "device_replica"
+
+class Replica:
+    """Primario y réplica en archivos SQLite, con reloj controlable para la ventana"""
+
+    def __init__(self, tmp_path, monkeypatch):
+        self.primary = create_engine(f"sqlite:///{tmp_path}/primary.db", connect_args={"check_same_thread": False})
+        self.replica = create_engine(f"sqlite:///{tmp_path}/replica.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=self.primary)
+        self.replicator = SQLiteReplicator(sqlite_path(self.primary), sqlite_path(self.replica))
+        self.PrimarySession = sessionmaker(autoflush=False, bind=self.primary)
+        self.now = 0.0
+        self.sticky = StickyReads(LocalRedis(clock=lambda: self.now), window=5)
+
+        monkeypatch.setattr(database, "engine", self.primary)
+        monkeypatch.setattr(database, "read_engine", self.replica)
+        monkeypatch.setattr(database, "SessionLocal", self.PrimarySession)
+        monkeypatch.setattr(database, "ReadSessionLocal",
+                            sessionmaker(autoflush=False, bind=self.replica, info={"replica": True}))
+        monkeypatch.setattr(read_routing, "sticky_reads", self.sticky)
+
+    def add_project(self, title: str, device_id: str = DEVICE):
+        with self.PrimarySession() as db:
+            user = db.query(User).filter(User.device_id == device_id).first()
+            if user is None:
+                user = User(username=f"user_{device_id}", device_id=device_id)
+                db.add(user)
+                db.flush()
+            db.add(Project(title=title, status="activo", user_id=user.id))
+            db.commit()
+            return user.id
+
+    def close(self):
+        self.primary.dispose()
+        self.replica.dispose()
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    setup = Replica(tmp_path, monkeypatch)
+    yield setup
+    setup.close()
+
+@pytest.fixture
+def replica_client(replica):
+    """Cliente que usa get_db → primario y el get_read_db real (sin sobrescribir)"""
+    def override_get_db():
+        db = replica.PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def titles(client, device_id: str = DEVICE):
+    response = client.get("/lifeplanner/projects/", headers={"X-Device-ID": device_id})
+    assert response.status_code == 200
+    return sorted(project["title"] for project in response.json())
+
+class TestReadRouting:
+    """Pruebas de lecturas a réplica y read-your-writes"""
+
+    def test_reads_are_served_by_replica(self, replica, replica_client):
+        """Probar que sin escrituras recientes las lecturas ven la réplica (con retraso)"""
+        replica.add_project("Replicado")
+        replica.replicator.sync()
+        replica.add_project("Aún no replicado")
+
+        assert titles(replica_client) == ["Replicado"]
+        replica.replicator.sync()
+        assert titles(replica_client) == ["Aún no replicado", "Replicado"]
+
+    def test_read_your_writes_window(self, replica, replica_client):
+        """Probar que tras escribir el dispositivo lee del primario durante la ventana"""
+        replica.add_project("Inicial")
+        replica.replicator.sync()
+
+        created = replica_client.post("/lifeplanner/projects/", json={"title": "Recién creado", "status": "activo"},
+                                      headers={"X-Device-ID": DEVICE})
+        assert created.status_code == 201
+        assert titles(replica_client) == ["Inicial", "Recién creado"]
+
+        # Pasada la ventana vuelve a la réplica, que aún no tiene el proyecto
+        replica.now += 6
+        assert titles(replica_client) == ["Inicial"]
+
+    def test_stickiness_is_per_device(self, replica, replica_client):
+        """Probar que la escritura de un dispositivo no desvía las lecturas de otro"""
+        replica.add_project("Otro", device_id="otro_device")
+        replica.replicator.sync()
+        replica_client.post("/lifeplanner/projects/", json={"title": "Nuevo", "status": "activo"},
+                            headers={"X-Device-ID": DEVICE})
+        replica.add_project("Sin replicar", device_id="otro_device")
+        assert titles(replica_client, "otro_device") == ["Otro"]
+
+    def test_failed_write_is_not_sticky(self, replica, replica_client):
+        """Probar que una escritura rechazada no marca el dispositivo"""
+        response = replica_client.put("/lifeplanner/tasks/999/status", json={"status": "completada"},
+                                      headers={"X-Device-ID": DEVICE})
+        assert response.status_code == 404
+        assert not replica.sticky.is_sticky(DEVICE)
+
+    def test_replica_reads_do_not_fill_user_cache(self, replica, replica_client):
+        """Probar que un usuario leído de la réplica no se guarda en la caché"""
+        user_id = replica.add_project("Inicial")
+        replica.replicator.sync()
+        assert replica_client.get(f"/lifeplanner/users/{user_id}").status_code == 200
+        assert user_cache._read(user_cache._id_key(user_id), user_id) is None
+
+    def test_user_update_without_device_is_sticky(self, replica, replica_client):
+        """Probar que tras PUT /users/{id} (sin X-Device-ID) la lectura del usuario va al primario"""
+        user_id = replica.add_project("Inicial")
+        replica.replicator.sync()
+        response = replica_client.put(f"/lifeplanner/users/{user_id}", json={"username": "renombrado"})
+        assert response.status_code == 200
+        assert replica_client.get(f"/lifeplanner/users/{user_id}").json()["username"] == "renombrado"
+
+        replica.now += 6
+        assert not replica.sticky.is_user_sticky(user_id)
+
+    def test_warns_without_shared_backend(self, replica, caplog):
+        """Probar el aviso de arranque cuando hay réplica y la marca vive en memoria"""
+        assert not read_routing.warn_if_not_shared()
+        assert "DATABASE_READ_URL sin almacén compartido" in caplog.text
+        replica.sticky.client = object()  # cualquier cliente que no sea LocalRedis
+        assert read_routing.warn_if_not_shared()
+
+    def test_get_read_db_without_replica(self):
+        """Probar que sin DATABASE_READ_URL las lecturas usan el primario"""
+        assert not replica_enabled()
+        db = next(get_read_db(device_id=None))
+        assert not is_replica_session(db)
+        db.close()
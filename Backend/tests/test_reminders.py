@@ -0,0 +1,295 @@
+"""
+Pruebas del planificador de recordatorios de fechas límite
+"""
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from app.models.project import Project
+from app.models.scheduler_state import SchedulerState, SentReminder
+from app.models.task import Task
+from app.reminders import (
+    QueueSink, ReminderScheduler, StreamSink, WebhookSink, create_sink,
+)
+
+START = datetime(2026, 3, 10, 12, 0)
+
+class FakeNow:
+    def __init__(self, now: datetime = START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def now():
+    return FakeNow()
+
+@pytest.fixture
+def sink():
+    return QueueSink()
+
+@pytest.fixture
+def make_scheduler(db_session, now, sink):
+    """Planificador con aviso una hora antes, ventana de 6 h y sesiones de la prueba"""
+    def build(**overrides):
+        options = dict(
+            sink=sink, now=now, lead=timedelta(hours=1), horizon=timedelta(hours=6),
+            session_factory=sessionmaker(bind=db_session.get_bind()),
+        )
+        options.update(overrides)
+        return ReminderScheduler(**options)
+    return build
+
+def _add_task(db_session, project, title, due_date, status="pendiente"):
+    task = Task(title=title, status=status, priority="media", due_date=due_date, project_id=project.id)
+    db_session.add(task)
+    db_session.commit()
+    return task
+
+def _drain(sink):
+    items = []
+    while not sink.queue.empty():
+        items.append(sink.queue.get_nowait())
+    return [(r.entity, r.kind, r.title) for r in items]
+
+def _advance(scheduler, db_session, now, until):
+    """Avanza el reloj y emite como lo haría el hilo de fondo"""
+    now.now = until
+    if now.now >= scheduler.loaded_until:
+        scheduler.refill(db_session)
+    scheduler.reschedule_dirty(db_session)
+    return scheduler.run_due(db_session)
+
+class TestReminderScheduler:
+    """Pruebas de carga, emisión y persistencia de los recordatorios"""
+
+    def test_emits_upcoming_and_due(self, db_session, test_project, make_scheduler, now, sink):
+        """Probar los avisos una hora antes y al vencer, en orden y solo cuando toca"""
+        _add_task(db_session, test_project, "informe", START + timedelta(hours=2))
+        _add_task(db_session, test_project, "hecha", START + timedelta(hours=2), status="completada")
+        scheduler = make_scheduler()
+        assert scheduler.refill(db_session) == 2
+        assert scheduler.seconds_until_next() == 3600
+
+        assert _advance(scheduler, db_session, now, START + timedelta(minutes=59)) == 0
+        assert _advance(scheduler, db_session, now, START + timedelta(hours=1)) == 1
+        assert _drain(sink) == [("task", "upcoming", "informe")]
+        assert _advance(scheduler, db_session, now, START + timedelta(hours=2, minutes=5)) == 1
+        assert _drain(sink) == [("task", "due", "informe")]
+        assert db_session.get(SchedulerState, "deadline_reminders").watermark == START + timedelta(hours=2, minutes=5)
+
+    def test_project_deadlines(self, db_session, test_user, make_scheduler, now, sink):
+        """Probar que los proyectos no terminados también generan recordatorios"""
+        for title, status in (("abierto", "activo"), ("cerrado", "terminado")):
+            db_session.add(Project(title=title, status=status, user_id=test_user.id, deadline=START + timedelta(hours=3)))
+        db_session.commit()
+        scheduler = make_scheduler()
+        scheduler.refill(db_session)
+        _advance(scheduler, db_session, now, START + timedelta(hours=3))
+        assert _drain(sink) == [("project", "upcoming", "abierto"), ("project", "due", "abierto")]
+
+    def test_loads_next_window(self, db_session, test_project, make_scheduler, now, sink):
+        """Probar que lo que queda fuera de la ventana se carga al agotarse"""
+        _add_task(db_session, test_project, "lejana", START + timedelta(hours=10))
+        scheduler = make_scheduler()
+        assert scheduler.refill(db_session) == 0
+        assert scheduler.seconds_until_next() == 6 * 3600
+        _advance(scheduler, db_session, now, START + timedelta(hours=6))
+        _advance(scheduler, db_session, now, START + timedelta(hours=9))
+        assert _drain(sink) == [("task", "upcoming", "lejana")]
+
+    def test_restart_resumes_from_watermark(self, db_session, test_project, make_scheduler, now, sink):
+        """Probar que al reiniciar no se repite lo emitido y sí lo vencido mientras estaba apagado"""
+        _add_task(db_session, test_project, "a", START + timedelta(hours=1, minutes=30))
+        _add_task(db_session, test_project, "b", START + timedelta(hours=3))
+        first = make_scheduler()
+        first.refill(db_session)
+        _advance(first, db_session, now, START + timedelta(minutes=30))
+        assert _drain(sink) == [("task", "upcoming", "a")]
+
+        # Apagado durante dos horas
+        now.now = START + timedelta(hours=2, minutes=30)
+        second = make_scheduler()
+        second.refill(db_session)
+        assert second.watermark == START + timedelta(minutes=30)
+        second.run_due(db_session)
+        assert _drain(sink) == [("task", "due", "a"), ("task", "upcoming", "b")]
+
+    def test_restart_query_skips_old_tasks(self, db_session, make_scheduler):
+        """Probar que la carga recorre solo el índice parcial de fechas posteriores a la marca"""
+        scheduler = make_scheduler()
+        scheduler.load_watermark(db_session)
+        from sqlalchemy.dialects import sqlite
+        from sqlalchemy import select
+        stmt = (
+            select(Task.id).where(text("tasks.status <> 'completada'"))
+            .where(Task.due_date > START, Task.due_date <= START + timedelta(hours=7))
+        )
+        sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        plan = " ".join(row[3] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        assert "ix_tasks_open_due" in plan
+
+    def test_user_changes_reschedule(self, db_session, test_user, test_project, make_scheduler, now, sink):
+        """Probar que completar, mover o crear tareas actualiza el montículo"""
+        done = _add_task(db_session, test_project, "se completa", START + timedelta(hours=2))
+        moved = _add_task(db_session, test_project, "se pospone", START + timedelta(hours=2))
+        scheduler = make_scheduler()
+        scheduler.refill(db_session)
+
+        done.status = "completada"
+        moved.due_date = START + timedelta(hours=5)
+        db_session.commit()
+        _add_task(db_session, test_project, "nueva", START + timedelta(minutes=90))
+        scheduler.mark_user(test_user.id, "task", "update")
+
+        _advance(scheduler, db_session, now, START + timedelta(hours=1))
+        assert _drain(sink) == [("task", "upcoming", "nueva")]
+        _advance(scheduler, db_session, now, START + timedelta(hours=5))
+        assert _drain(sink) == [("task", "due", "nueva"), ("task", "upcoming", "se pospone"), ("task", "due", "se pospone")]
+
+    def test_changes_without_event_are_checked_before_emitting(self, db_session, test_project, make_scheduler, now, sink):
+        """Probar que lo completado desde otro worker (sin aviso local) no se emite"""
+        task = _add_task(db_session, test_project, "otro worker", START + timedelta(hours=2))
+        scheduler = make_scheduler()
+        scheduler.refill(db_session)
+        task.status = "completada"
+        db_session.commit()
+        _advance(scheduler, db_session, now, START + timedelta(hours=2))
+        assert _drain(sink) == []
+
+    def test_only_one_worker_emits(self, db_session, test_project, make_scheduler, now, sink):
+        """Probar que con dos workers cada recordatorio se emite una sola vez"""
+        _add_task(db_session, test_project, "compartida", START + timedelta(hours=2))
+        other_sink = QueueSink()
+        worker_a = make_scheduler()
+        worker_b = make_scheduler(sink=other_sink)
+        worker_a.refill(db_session)
+        worker_b.refill(db_session)
+
+        now.now = START + timedelta(hours=1)
+        assert worker_a.run_due(db_session) == 1
+        assert worker_b.run_due(db_session) == 0
+        assert _drain(sink) + _drain(other_sink) == [("task", "upcoming", "compartida")]
+
+    def test_worker_behind_shared_watermark_still_emits(self, db_session, test_user, test_project, make_scheduler,
+                                                         now, sink):
+        """Probar que un aviso que solo conoce un worker se emite aunque otro ya avanzó la marca"""
+        _add_task(db_session, test_project, "compartida", START + timedelta(minutes=90))
+        other_sink = QueueSink()
+        worker_a = make_scheduler()
+        worker_b = make_scheduler(sink=other_sink)
+        worker_a.refill(db_session)
+        worker_b.refill(db_session)
+
+        # La tarea nueva se crea en el worker B (solo él recibe el aviso de app.events)
+        _add_task(db_session, test_project, "nueva", START + timedelta(minutes=100))
+        worker_b.mark_user(test_user.id, "task", "create")
+        now.now = START + timedelta(minutes=45)
+        assert worker_a.run_due(db_session) == 1
+        assert db_session.get(SchedulerState, "deadline_reminders", populate_existing=True).watermark == now.now
+
+        # B recarga las dos tareas del usuario: "compartida" ya la reclamó A
+        worker_b.reschedule_dirty(db_session)
+        assert worker_b.run_due(db_session) == 1
+        assert _drain(sink) == [("task", "upcoming", "compartida")]
+        assert _drain(other_sink) == [("task", "upcoming", "nueva")]
+
+    def test_new_due_date_is_claimed_again(self, db_session, test_user, test_project, make_scheduler, now, sink):
+        """Probar que al posponer una tarea ya avisada se vuelve a avisar de la nueva fecha"""
+        task = _add_task(db_session, test_project, "pospuesta", START + timedelta(minutes=30))
+        scheduler = make_scheduler(lead=timedelta(0))
+        scheduler.refill(db_session)
+        _advance(scheduler, db_session, now, START + timedelta(minutes=30))
+        task.due_date = START + timedelta(hours=1)
+        db_session.commit()
+        scheduler.mark_user(test_user.id, "task", "update")
+        _advance(scheduler, db_session, now, START + timedelta(hours=1))
+        assert _drain(sink) == [("task", "upcoming", "pospuesta"), ("task", "due", "pospuesta")] * 2
+        assert db_session.query(SentReminder).count() == 4
+
+    def test_old_claims_are_purged(self, db_session, test_project, make_scheduler, now):
+        """Probar que los reclamos de fechas muy anteriores a la marca se borran al cargar otra ventana"""
+        _add_task(db_session, test_project, "vieja", START + timedelta(hours=1))
+        scheduler = make_scheduler()
+        scheduler.refill(db_session)
+        _advance(scheduler, db_session, now, START + timedelta(hours=1))
+        assert db_session.query(SentReminder).count() == 1
+        # La purga va con la carga de cada ventana, con la marca de la vuelta anterior
+        _advance(scheduler, db_session, now, START + timedelta(hours=14))
+        _advance(scheduler, db_session, now, START + timedelta(hours=20))
+        assert db_session.query(SentReminder).count() == 0
+
+    def test_background_thread_wakes_for_next_reminder(self, db_session, test_project, sink):
+        """Probar el hilo de fondo con el reloj real"""
+        _add_task(db_session, test_project, "ya", datetime.utcnow() + timedelta(seconds=0.3))
+        scheduler = ReminderScheduler(sink, session_factory=sessionmaker(bind=db_session.get_bind()),
+                                      lead=timedelta(0), horizon=timedelta(hours=1))
+        scheduler.start()
+        try:
+            reminders = [sink.queue.get(timeout=5), sink.queue.get(timeout=5)]
+        finally:
+            scheduler.stop()
+        assert {r.kind for r in reminders} == {"upcoming", "due"}
+
+class TestReminderSinks:
+    """Pruebas de los destinos de los recordatorios"""
+
+    def _reminder(self):
+        from app.reminders import Reminder
+        return Reminder("task", 1, "due", 7, "informe", START, START)
+
+    def test_webhook_posts_json(self):
+        """Probar que el webhook recibe el recordatorio como JSON"""
+        sent = []
+
+        class Response:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+        def opener(request, timeout):
+            sent.append(request)
+            return Response()
+
+        WebhookSink("http://hooks.local/reminders", opener=opener)(self._reminder())
+        assert sent[0].get_method() == "POST"
+        body = json.loads(sent[0].data)
+        assert body["user_id"] == 7
+        assert body["due_at"] == "2026-03-10T12:00:00+00:00"
+
+    def test_stream_sink_reaches_user_connections(self, monkeypatch):
+        """Probar que el recordatorio llega como evento "reminder" al stream del usuario"""
+        import app.change_stream as change_stream
+        broker = change_stream.LocalBroker()
+        monkeypatch.setattr(change_stream, "broker", broker)
+        StreamSink()(self._reminder())
+        events = broker.missed_since(7, 0)
+        assert events[0]["event"] == "reminder"
+        assert events[0]["title"] == "informe"
+
+    def test_stream_sink_goes_through_redis(self, monkeypatch):
+        """Probar que con el broker de Redis el recordatorio se publica en el canal (para todos los workers)"""
+        import app.change_stream as change_stream
+        published = []
+
+        class FakeRedis:
+            def publish(self, channel, message):
+                published.append((channel, json.loads(message)))
+
+        monkeypatch.setattr(change_stream, "broker", change_stream.RedisBroker(FakeRedis()))
+        StreamSink()(self._reminder())
+        channel, event = published[0]
+        assert channel == change_stream.REDIS_CHANNEL
+        assert (event["event"], event["user_id"], event["title"]) == ("reminder", 7, "informe")
+
+    def test_create_sink(self, monkeypatch):
+        """Probar la selección del destino por variable de entorno"""
+        monkeypatch.setenv("REMINDER_WEBHOOK_URL", "http://hooks.local/reminders")
+        assert isinstance(create_sink("webhook"), WebhookSink)
+        assert isinstance(create_sink("queue"), QueueSink)
+        monkeypatch.delenv("REMINDER_WEBHOOK_URL")
+        assert not isinstance(create_sink("webhook"), WebhookSink)
@@ -7,18 +7,103 @@ from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
 
+@pytest.fixture
+def admin_headers(monkeypatch):
+    """Token de administración configurado y la cabecera que lo envía"""
+    monkeypatch.setenv("ADMIN_TOKEN", "secreto")
+    return {"X-Admin-Token": "secreto"}
+
 class TestUserRoutes:
     """Pruebas para las rutas de usuario"""
     
-    def test_get_users(self, client, test_user):
+    def test_get_users(self, client, test_user, admin_headers):
         """Probar obtener lista de usuarios"""
-        response = client.get("/lifeplanner/users/")
+        response = client.get("/lifeplanner/users/", headers=admin_headers)
         assert response.status_code == 200
         users = response.json()
         assert isinstance(users, list)
         assert len(users) == 1
         assert users[0]["username"] == test_user.username
     
+    def _seed_users(self, db_session, count):
+        from datetime import datetime, timedelta
+        users = [
+            User(username=f"alumna_{i:02d}", device_id=f"device_{i:02d}",
+                 created_at=datetime(2026, 1, 1) + timedelta(days=i))
+            for i in range(count)
+        ]
+        db_session.add_all(users)
+        db_session.commit()
+        return users
+    
+    def test_get_users_requires_admin_token(self, client, test_user, monkeypatch):
+        """Probar que el listado (con device_id) exige el token de administración"""
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        assert client.get("/lifeplanner/users/").status_code == 404
+        monkeypatch.setenv("ADMIN_TOKEN", "secreto")
+        assert client.get("/lifeplanner/users/").status_code == 403
+        assert client.get("/lifeplanner/users/?username_prefix=te", headers={"X-Admin-Token": "otro"}).status_code == 403
+    
+    def test_get_users_keyset_pagination(self, client, db_session, admin_headers):
+        """Probar paginación por cursor sobre users.id"""
+        self._seed_users(db_session, 5)
+        first = client.get("/lifeplanner/users/?limit=2", headers=admin_headers)
+        assert first.status_code == 200
+        assert len(first.json()) == 2
+        cursor = first.headers["x-next-cursor"]
+        assert cursor == str(first.json()[-1]["id"])
+        assert 'rel="next"' in first.headers["link"]
+        
+        seen = [u["id"] for u in first.json()]
+        while cursor:
+            page = client.get(f"/lifeplanner/users/?limit=2&after_id={cursor}", headers=admin_headers)
+            seen += [u["id"] for u in page.json()]
+            cursor = page.headers.get("x-next-cursor")
+        assert len(seen) == 5
+        assert seen == sorted(seen)
+    
+    def test_get_users_filters(self, client, db_session, admin_headers):
+        """Probar filtros por rango de alta y prefijo de username"""
+        self._seed_users(db_session, 5)
+        db_session.add(User(username="al%comodin", device_id="device_like"))
+        db_session.commit()
+        response = client.get("/lifeplanner/users/?created_from=2026-01-02T00:00:00&created_to=2026-01-04T00:00:00",
+                              headers=admin_headers)
+        assert [u["username"] for u in response.json()] == ["alumna_01", "alumna_02"]
+        response = client.get("/lifeplanner/users/?username_prefix=alumna_0", headers=admin_headers)
+        assert len(response.json()) == 5
+        # % y _ se tratan literalmente
+        response = client.get("/lifeplanner/users/?username_prefix=al%25", headers=admin_headers)
+        assert [u["username"] for u in response.json()] == ["al%comodin"]
+        assert client.get("/lifeplanner/users/?limit=5000", headers=admin_headers).status_code == 422
+    
+    def test_export_users_streaming(self, client, db_session, monkeypatch):
+        """Probar exportación de usuarios en NDJSON y CSV"""
+        import json
+        monkeypatch.setenv("ADMIN_TOKEN", "secreto")
+        headers = {"X-Admin-Token": "secreto"}
+        self._seed_users(db_session, 3)
+        response = client.get("/lifeplanner/users/export?username_prefix=alumna", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["username"] for r in records] == ["alumna_00", "alumna_01", "alumna_02"]
+        assert records[0]["created_at"] == "2026-01-01T00:00:00"
+        assert "device_id" not in records[0]
+        
+        response = client.get("/lifeplanner/users/export?format=csv&username_prefix=alumna", headers=headers)
+        lines = response.text.splitlines()
+        assert lines[0] == "id,username,email,created_at,updated_at"
+        assert len(lines) == 4
+    
+    def test_export_users_requires_admin_token(self, client, monkeypatch):
+        """Probar que la exportación exige el token de administración"""
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        assert client.get("/lifeplanner/users/export").status_code == 404
+        monkeypatch.setenv("ADMIN_TOKEN", "secreto")
+        assert client.get("/lifeplanner/users/export").status_code == 403
+        assert client.get("/lifeplanner/users/export", headers={"X-Admin-Token": "otro"}).status_code == 403
+    
     def test_get_user_by_id(self, client, test_user):
         """Probar obtener usuario por ID"""
         response = client.get(f"/lifeplanner/users/{test_user.id}")
@@ -155,6 +240,16 @@ class TestProjectRoutes:
         assert len(tasks) == 1
         assert tasks[0]["id"] == test_task.id
 
+    def test_get_project_tasks_sparse_fields(self, client, test_user, test_project, test_task):
+        """Probar proyección de campos en las tareas de un proyecto"""
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.get(f"/lifeplanner/projects/{test_project.id}/tasks?fields=id,chibi_url", headers=headers)
+        assert response.status_code == 200
+        tasks = response.json()
+        assert len(tasks) == 1
+        assert set(tasks[0]) == {"id", "chibi_url"}
+        assert tasks[0]["chibi_url"] == test_task.get_chibi_url()
+
 class TestTaskRoutes:
     """Pruebas para las rutas de tarea"""
     
@@ -185,6 +280,26 @@ class TestTaskRoutes:
         assert len(tasks) == 1
         assert tasks[0]["id"] == test_task.id
     
+    def test_get_tasks_sparse_fields(self, client, test_user, test_task):
+        """Probar que fields= devuelve solo las columnas pedidas"""
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.get("/lifeplanner/tasks/?fields=id,title,status,due_date", headers=headers)
+        assert response.status_code == 200
+        tasks = response.json()
+        assert len(tasks) == 1
+        assert tasks[0] == {
+            "id": test_task.id,
+            "title": test_task.title,
+            "status": test_task.status,
+            "due_date": None
+        }
+    
+    def test_get_tasks_invalid_field(self, client, test_user, test_task):
+        """Probar que un campo desconocido en fields= devuelve 400"""
+        headers = {"X-Device-ID": test_user.device_id}
+        response = client.get("/lifeplanner/tasks/?fields=id,password", headers=headers)
+        assert response.status_code == 400
+    
     def test_get_task_by_id(self, client, test_user, test_task):
         """Probar obtener tarea por ID"""
         headers = {"X-Device-ID": test_user.device_id}
@@ -0,0 +1,103 @@
+"""
+Pruebas para el dimensionado de workers y pools de app.serve
+"""
+import pytest
+from app.db import engine_options
+from app.serve import (
+    MAX_WORKERS, WORKER_CLASS, build_options, compute_workers, configure_pool,
+    cpu_count, memory_limit_bytes, pool_settings, post_fork,
+)
+
+MB = 1024 * 1024
+
+class TestWorkerSizing:
+    """Pruebas para el cálculo de workers a partir de CPU y memoria"""
+
+    def test_compute_workers(self):
+        """Probar 2×CPU+1 limitado por memoria y por el máximo"""
+        assert compute_workers(2, None) == 5
+        assert compute_workers(2, 512 * MB, worker_memory_mb=160) == 3
+        assert compute_workers(4, 64 * MB) == 1
+        assert compute_workers(64, None) == MAX_WORKERS
+
+    def test_cgroup_v2_limits(self, tmp_path):
+        """Probar que se respetan la cuota de CPU y el límite de memoria del contenedor"""
+        (tmp_path / "cpu.max").write_text("150000 100000\n")
+        (tmp_path / "memory.max").write_text(str(512 * MB))
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text("MemTotal:       16384000 kB\n")
+        assert cpu_count(tmp_path) <= 2
+        assert memory_limit_bytes(tmp_path, meminfo) == 512 * MB
+
+    def test_unlimited_cgroup_uses_host_memory(self, tmp_path):
+        """Probar que sin límite de cgroup se usa la memoria total del host"""
+        (tmp_path / "memory.max").write_text("max\n")
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text("MemTotal:       2048 kB\n")
+        assert memory_limit_bytes(tmp_path, meminfo) == 2048 * 1024
+        assert cpu_count(tmp_path) >= 1
+
+    def test_build_options(self):
+        """Probar la configuración de gunicorn desde el entorno"""
+        options = build_options({"WEB_CONCURRENCY": "3", "PORT": "9000", "GUNICORN_KEEPALIVE": "90"})
+        assert options["workers"] == 3
+        assert options["bind"] == "0.0.0.0:9000"
+        assert options["worker_class"] == WORKER_CLASS
+        assert options["preload_app"] is True
+        assert options["keepalive"] == 90
+        assert options["graceful_timeout"] < options["timeout"]
+
+class TestPoolSizing:
+    """Pruebas para el reparto de conexiones entre workers"""
+
+    @pytest.mark.parametrize("workers", [1, 3, 5, 16])
+    def test_pools_fit_connection_budget(self, workers):
+        """Probar que la suma de pools de todos los workers cabe en el límite"""
+        settings = pool_settings(workers, max_connections=40)
+        assert settings["pool_size"] >= 1
+        assert workers * (settings["pool_size"] + settings["max_overflow"]) <= max(40, 2 * workers)
+
+    def test_configure_pool_keeps_explicit_values(self):
+        """Probar que DB_POOL_SIZE explícito no se sobrescribe"""
+        environ = {"DB_MAX_CONNECTIONS": "20", "DB_POOL_SIZE": "7"}
+        configure_pool(4, environ)
+        assert environ["DB_POOL_SIZE"] == "7"
+        assert environ["DB_MAX_OVERFLOW"] == "2"
+
+    def test_engine_options_read_pool_env(self, monkeypatch):
+        """Probar que el motor de PostgreSQL usa el pool configurado y SQLite no"""
+        monkeypatch.setenv("DB_POOL_SIZE", "3")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "1")
+        options = engine_options("postgresql://u:p@localhost/db")
+        assert (options["pool_size"], options["max_overflow"]) == (3, 1)
+        assert options["pool_pre_ping"] is True
+        assert "pool_size" not in engine_options("sqlite:///./x.db")
+
+class TestPostFork:
+    """Pruebas del descarte de conexiones heredadas tras el fork"""
+
+    class FakeEngine:
+        def __init__(self):
+            self.disposed = []
+
+        def dispose(self, close=True):
+            self.disposed.append(close)
+
+    def test_disposes_primary_and_replica(self, monkeypatch):
+        """Probar que con réplica se descartan las conexiones de los dos motores, sin cerrarlas en el maestro"""
+        import app.db as database
+        primary, replica = self.FakeEngine(), self.FakeEngine()
+        monkeypatch.setattr(database, "engine", primary)
+        monkeypatch.setattr(database, "read_engine", replica)
+        post_fork(None, None)
+        assert primary.disposed == [False]
+        assert replica.disposed == [False]
+
+    def test_single_engine_is_disposed_once(self, monkeypatch):
+        """Probar que sin réplica el motor compartido se descarta una sola vez"""
+        import app.db as database
+        shared = self.FakeEngine()
+        monkeypatch.setattr(database, "engine", shared)
+        monkeypatch.setattr(database, "read_engine", shared)
+        post_fork(None, None)
+        assert shared.disposed == [False]
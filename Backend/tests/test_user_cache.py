@@ -0,0 +1,167 @@
+"""
+Pruebas de consistencia de la caché de usuarios
+Se ejecutan contra el sustituto en proceso y, si hay REDIS_URL y el paquete redis, también
+contra un servidor Redis real.
+"""
+import os
+import pytest
+from sqlalchemy import event
+from app.models.project import Project
+from app.models.user import User
+from app.user_cache import LocalRedis, UserCache, user_cache
+
+def _redis_client():
+    try:
+        import redis
+    except ImportError:
+        return None
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    client = redis.Redis.from_url(url)
+    try:
+        client.ping()
+    except Exception:
+        return None
+    return client
+
+@pytest.fixture(params=["local", "redis"])
+def cache(request, monkeypatch):
+    """Caché de usuarios sobre cada almacén disponible, instalada como la global"""
+    if request.param == "redis":
+        client = _redis_client()
+        if client is None:
+            pytest.skip("Redis no disponible (define REDIS_URL)")
+    else:
+        client = LocalRedis()
+    client.flushdb()
+    cache = UserCache(client, ttl=60, prefix="test-user")
+    monkeypatch.setattr(user_cache, "client", client)
+    monkeypatch.setattr(user_cache, "prefix", "test-user")
+    yield cache
+    client.flushdb()
+
+@pytest.fixture
+def count_queries(db_session):
+    """Cuenta las sentencias SQL ejecutadas por la sesión de pruebas"""
+    statements = []
+    engine = db_session.get_bind().engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    yield statements
+    event.remove(engine, "before_cursor_execute", listener)
+
+class TestUserCacheConsistency:
+    """Pruebas de lectura, invalidación y carreras de la caché de usuarios"""
+
+    def test_read_through_by_id_and_device(self, cache, db_session, test_user, count_queries):
+        """Probar que la segunda lectura no consulta la base de datos"""
+        user_id, device_id = test_user.id, test_user.device_id
+        db_session.expunge_all()
+        assert cache.get_by_id(db_session, user_id).username == "test_user"
+        count_queries.clear()
+        db_session.expunge_all()
+        cached = cache.get_by_id(db_session, user_id)
+        by_device = cache.get_by_device_id(db_session, device_id)
+        assert count_queries == []
+        assert cached is by_device
+        assert cached.username == "test_user"
+        assert cached in db_session
+
+    def test_attached_user_loads_relationships(self, cache, db_session, test_project):
+        """Probar que el usuario rehidratado carga sus relaciones de forma perezosa"""
+        user_id = test_project.user_id
+        cache.get_by_id(db_session, user_id)
+        db_session.expunge_all()
+        user = cache.get_by_id(db_session, user_id)
+        assert [project.title for project in user.projects] == ["Proyecto de Prueba"]
+
+    def test_update_invalidates_id_and_device_entries(self, cache, client, db_session, test_user):
+        """Probar que al actualizar vía API ninguna entrada devuelve datos viejos"""
+        user_id, device_id = test_user.id, test_user.device_id
+        assert client.get(f"/lifeplanner/users/{user_id}").json()["username"] == "test_user"
+        assert client.get(f"/lifeplanner/users/device/{device_id}").status_code == 200
+        
+        client.put(f"/lifeplanner/users/{user_id}", json={"username": "renombrada", "device_id": "device_nuevo"})
+        db_session.expunge_all()
+        assert client.get(f"/lifeplanner/users/{user_id}").json()["username"] == "renombrada"
+        assert cache.get_by_device_id(db_session, device_id) is None
+        assert cache.get_by_device_id(db_session, "device_nuevo").username == "renombrada"
+
+    def test_delete_invalidates(self, cache, client, db_session, test_user):
+        """Probar que un usuario borrado deja de servirse desde la caché"""
+        user_id = test_user.id
+        assert client.get(f"/lifeplanner/users/{user_id}").status_code == 200
+        assert client.delete(f"/lifeplanner/users/{user_id}").status_code == 200
+        db_session.expunge_all()
+        assert client.get(f"/lifeplanner/users/{user_id}").status_code == 404
+
+    def test_stale_read_is_never_served(self, cache, db_session, test_user):
+        """Probar que un valor leído antes de una escritura concurrente no se sirve"""
+        user_id = test_user.id
+        version = cache.version(user_id)
+        stale = User(id=user_id, username="viejo", device_id=test_user.device_id,
+                     created_at=test_user.created_at, updated_at=test_user.updated_at)
+        cache.invalidate(user_id)  # escritura confirmada mientras se leía
+        cache.store(stale, version)
+        db_session.expunge_all()
+        assert cache.get_by_id(db_session, user_id).username == "test_user"
+
+    def test_workers_share_invalidations(self, cache, db_session, test_user):
+        """Probar que dos workers sobre el mismo almacén ven la misma versión"""
+        other_worker = UserCache(cache.client, ttl=60, prefix=cache.prefix)
+        user_id = test_user.id
+        cache.get_by_id(db_session, user_id)
+        assert other_worker._read(other_worker._id_key(user_id), user_id) is not None
+        other_worker.invalidate(user_id)
+        assert cache._read(cache._id_key(user_id), user_id) is None
+
+    def test_get_current_user_uses_cache(self, cache, client, test_user, count_queries):
+        """Probar que get_current_user no vuelve a leer el usuario en cada petición"""
+        headers = {"X-Device-ID": test_user.device_id}
+        client.get("/lifeplanner/projects/", headers=headers)
+        count_queries.clear()
+        client.get("/lifeplanner/projects/", headers=headers)
+        assert not any("FROM users" in statement for statement in count_queries)
+
+class TestLocalRedis:
+    """Pruebas para el sustituto en proceso de Redis"""
+
+    def test_expiry_and_incr(self):
+        """Probar caducidad, incr y mget"""
+        now = [0.0]
+        client = LocalRedis(clock=lambda: now[0])
+        client.set("a", "1", ex=10)
+        assert client.incr("a") == 2
+        assert client.incr("nuevo") == 1
+        assert client.mget(["a", "nuevo", "falta"]) == [b"2", b"1", None]
+        now[0] = 11
+        assert client.get("a") is None
+        assert client.get("nuevo") == b"1"
+
+    def test_writes_purge_expired_keys(self):
+        """Probar que las claves caducadas que nadie vuelve a leer se borran al escribir"""
+        now = [0.0]
+        client = LocalRedis(clock=lambda: now[0])
+        for index in range(50):
+            client.set(f"device:{index}", "x", ex=10)
+        now[0] = 61
+        client.set("nuevo", "x", ex=10)
+        assert len(client) == 1
+
+    def test_bounded_lru(self):
+        """Probar que al superar max_keys se expulsa la clave usada hace más tiempo"""
+        client = LocalRedis(max_keys=3)
+        for key in ("a", "b", "c"):
+            client.set(key, key)
+        assert client.get("a") == b"a"  # "a" pasa a ser la más reciente
+        client.incr("d")
+        assert len(client) == 3
+        assert client.get("b") is None
+        assert client.mget(["a", "c", "d"]) == [b"a", b"c", b"1"]
+
+    def test_disabled_cache_reads_database(self, db_session, test_user):
+        """Probar que sin almacén la caché consulta siempre la base de datos"""
+        disabled = UserCache(None)
+        assert disabled.get_by_device_id(db_session, test_user.device_id).id == test_user.id
+        disabled.invalidate(test_user.id)
@@ -0,0 +1,129 @@
+"""
+Pruebas del buffer de escritura diferida de estados de tareas
+"""
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.models.task import Task
+from app.query_counter import QueryCounter
+from app.routes import project_route, task_route
+from app.write_buffer import StatusWriteBuffer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def status_buffer(db_session, clock, monkeypatch):
+    """Buffer activo con ventana de 5 s, reloj controlable y sesiones de la prueba"""
+    buffer = StatusWriteBuffer(window=5, clock=clock, session_factory=sessionmaker(bind=db_session.get_bind()))
+    monkeypatch.setattr(task_route, "status_buffer", buffer)
+    monkeypatch.setattr(project_route, "status_buffer", buffer)
+    return buffer
+
+def stored_status(db_session, task_id: int) -> str:
+    db_session.expire_all()
+    return db_session.get(Task, task_id).status
+
+def toggle(client, task_id: int, status: str, device_id: str = "test_device_123"):
+    response = client.put(f"/lifeplanner/tasks/{task_id}/status", json={"status": status},
+                          headers={"X-Device-ID": device_id})
+    assert response.status_code == 200
+    assert response.json()["status"] == status
+    return response
+
+class TestStatusWriteBuffer:
+    """Pruebas de agrupación, volcado y durabilidad de los cambios de estado"""
+
+    def test_toggles_coalesce_into_one_update(self, client, db_session, test_task, status_buffer, clock):
+        """Probar que varios cambios en la ventana terminan en un solo UPDATE con el último estado"""
+        task_id = test_task.id
+        with QueryCounter(db_session.get_bind().engine) as counter:
+            for status in ("en_progreso", "completada", "en_progreso", "completada"):
+                toggle(client, task_id, status)
+        assert not any(sql.startswith("UPDATE") for sql in counter.statements)
+        assert stored_status(db_session, task_id) == "pendiente"
+
+        clock.now += 5
+        with QueryCounter(db_session.get_bind().engine) as counter:
+            assert status_buffer.flush_due(db_session) == 1
+        assert [sql for sql in counter.statements if sql.startswith("UPDATE")] == [
+            "UPDATE tasks SET status=?, updated_at=CURRENT_TIMESTAMP WHERE tasks.id = ?"
+        ]
+        assert stored_status(db_session, task_id) == "completada"
+
+        metrics = status_buffer.metrics()
+        assert metrics["updates_received"] == 4
+        assert metrics["commits"] == 1
+        assert metrics["commits_saved"] == 3
+        assert metrics["pending"] == 0
+
+    def test_entries_wait_for_window(self, client, db_session, test_task, status_buffer, clock):
+        """Probar que flush_due no escribe antes de que termine la ventana"""
+        toggle(client, test_task.id, "completada")
+        clock.now += 4
+        assert status_buffer.flush_due(db_session) == 0
+        assert status_buffer.pending_status(test_task.id) == "completada"
+
+    def test_read_by_same_user_flushes_first(self, client, db_session, test_task, status_buffer):
+        """Probar que una lectura del mismo usuario ve el estado pendiente ya escrito"""
+        toggle(client, test_task.id, "completada")
+        response = client.get("/lifeplanner/projects/", headers={"X-Device-ID": "test_device_123"})
+        assert response.json()[0]["tasks"][0]["status"] == "completada"
+        assert stored_status(db_session, test_task.id) == "completada"
+        assert status_buffer.metrics()["pending"] == 0
+
+    def test_later_write_is_not_overwritten(self, client, db_session, test_task, status_buffer, clock):
+        """Probar que otra escritura de la tarea vuelca antes y no la pisa un estado viejo"""
+        toggle(client, test_task.id, "completada")
+        response = client.put(f"/lifeplanner/tasks/{test_task.id}", json={"status": "en_progreso"},
+                              headers={"X-Device-ID": "test_device_123"})
+        assert response.status_code == 200
+        clock.now += 10
+        status_buffer.flush_all(db_session)
+        assert stored_status(db_session, test_task.id) == "en_progreso"
+
+    def test_stop_flushes_pending(self, client, db_session, test_task, status_buffer):
+        """Probar que al apagar se escribe todo lo pendiente"""
+        toggle(client, test_task.id, "en_progreso")
+        assert status_buffer.stop() == 1
+        assert stored_status(db_session, test_task.id) == "en_progreso"
+
+    def test_failed_flush_keeps_entries(self, status_buffer):
+        """Probar que si el volcado falla las entradas vuelven al buffer"""
+        class BrokenSession:
+            def execute(self, *args):
+                raise RuntimeError("base de datos caída")
+
+            def rollback(self):
+                pass
+
+        status_buffer.enqueue(1, 10, "completada")
+        with pytest.raises(RuntimeError):
+            status_buffer.flush_all(BrokenSession())
+        assert status_buffer.pending_status(10) == "completada"
+
+    def test_missing_task_does_not_block_batch(self, db_session, test_task, status_buffer):
+        """Probar que una tarea borrada o archivada antes del volcado no impide escribir las demás"""
+        status_buffer.enqueue(1, test_task.id, "completada")
+        status_buffer.enqueue(2, 999999, "en_progreso")
+        assert status_buffer.flush_all(db_session) == 2
+        assert stored_status(db_session, test_task.id) == "completada"
+        assert status_buffer.metrics()["pending"] == 0
+
+    def test_disabled_buffer_commits_immediately(self, client, db_session, test_task):
+        """Probar que sin ventana cada cambio se confirma en la petición"""
+        toggle(client, test_task.id, "completada")
+        assert stored_status(db_session, test_task.id) == "completada"
+
+    def test_metrics_endpoint(self, client, status_buffer):
+        """Probar el endpoint de métricas del buffer"""
+        response = client.get("/lifeplanner/tasks/status-buffer/metrics")
+        assert response.status_code == 200
+        assert response.json()["enabled"] is True
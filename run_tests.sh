@@ -30,7 +30,7 @@ show_result $? "Dependencias del backend instaladas"
 
 # 2. Ejecutar pruebas del backend
 echo -e "\n${BLUE}🔧 Ejecutando pruebas del backend...${NC}"
-python -m pytest tests/ -v --cov=app --cov-report=term-missing --cov-report=html
+python -m pytest tests/ -n auto -v --cov=app --cov-report=term-missing --cov-report=html
 show_result $? "Pruebas del backend completadas"
 
 # 3. Instalar dependencias de pruebas del frontend